@@ -0,0 +1,186 @@
+"""Add stored search_vector columns with per-search-space text search config
+
+Keyword search used to call to_tsvector('english', content) on every query and
+ts_rank_cd re-parsed the text of each matching row. This migration stores the
+tsvector on documents and chunks, maintained by triggers that use the owning
+search space's text_search_config.
+
+The columns are plain (trigger-maintained) rather than GENERATED because a
+generated column cannot read the search space's configuration, and adding one
+rewrites the table under an exclusive lock. The backfill runs in committed
+batches and the GIN indexes are built concurrently so the upgrade stays online.
+
+Revision ID: 38
+Revises: 37
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "38"
+down_revision: str | None = "37"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+# Mirrors SEARCH_VECTOR_TRIGGER_STATEMENTS in app/db.py
+TRIGGER_STATEMENTS = [
+    """
+    CREATE OR REPLACE FUNCTION documents_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := to_tsvector(
+            COALESCE(
+                (SELECT text_search_config FROM searchspaces WHERE id = NEW.search_space_id),
+                'english'
+            )::regconfig,
+            NEW.content
+        );
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE TRIGGER documents_search_vector
+    BEFORE INSERT OR UPDATE OF content, search_space_id ON documents
+    FOR EACH ROW EXECUTE FUNCTION documents_search_vector_update()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION chunks_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := to_tsvector(
+            COALESCE(
+                (
+                    SELECT s.text_search_config
+                    FROM documents d JOIN searchspaces s ON s.id = d.search_space_id
+                    WHERE d.id = NEW.document_id
+                ),
+                'english'
+            )::regconfig,
+            NEW.content
+        );
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE TRIGGER chunks_search_vector
+    BEFORE INSERT OR UPDATE OF content, document_id ON chunks
+    FOR EACH ROW EXECUTE FUNCTION chunks_search_vector_update()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION searchspaces_text_search_config_update() RETURNS trigger AS $$
+    BEGIN
+        UPDATE documents
+        SET search_vector = to_tsvector(NEW.text_search_config::regconfig, content)
+        WHERE search_space_id = NEW.id;
+        UPDATE chunks
+        SET search_vector = to_tsvector(NEW.text_search_config::regconfig, chunks.content)
+        FROM documents
+        WHERE chunks.document_id = documents.id AND documents.search_space_id = NEW.id;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE TRIGGER searchspaces_text_search_config
+    AFTER UPDATE OF text_search_config ON searchspaces
+    FOR EACH ROW
+    WHEN (OLD.text_search_config IS DISTINCT FROM NEW.text_search_config)
+    EXECUTE FUNCTION searchspaces_text_search_config_update()
+    """,
+]
+
+BACKFILL_STATEMENTS = {
+    "documents": """
+        UPDATE documents d
+        SET search_vector = to_tsvector(s.text_search_config::regconfig, d.content)
+        FROM searchspaces s
+        WHERE s.id = d.search_space_id
+          AND d.id > :start_id AND d.id <= :end_id
+          AND d.search_vector IS NULL
+    """,
+    "chunks": """
+        UPDATE chunks c
+        SET search_vector = to_tsvector(s.text_search_config::regconfig, c.content)
+        FROM documents d JOIN searchspaces s ON s.id = d.search_space_id
+        WHERE d.id = c.document_id
+          AND c.id > :start_id AND c.id <= :end_id
+          AND c.search_vector IS NULL
+    """,
+}
+
+
+def _backfill(table: str) -> None:
+    """Backfill search_vector in id ranges, committing after every batch."""
+    bind = op.get_bind()
+    max_id = bind.execute(sa.text(f"SELECT COALESCE(MAX(id), 0) FROM {table}")).scalar()
+
+    start_id = 0
+    while start_id < max_id:
+        end_id = start_id + BACKFILL_BATCH_SIZE
+        bind.execute(
+            sa.text(BACKFILL_STATEMENTS[table]),
+            {"start_id": start_id, "end_id": end_id},
+        )
+        start_id = end_id
+
+
+def upgrade() -> None:
+    """Add search_vector columns, triggers, backfill and GIN indexes."""
+    op.execute("""
+        ALTER TABLE searchspaces
+        ADD COLUMN IF NOT EXISTS text_search_config VARCHAR(64) NOT NULL DEFAULT 'english'
+    """)
+    op.execute("ALTER TABLE documents ADD COLUMN IF NOT EXISTS search_vector TSVECTOR")
+    op.execute("ALTER TABLE chunks ADD COLUMN IF NOT EXISTS search_vector TSVECTOR")
+
+    # New and updated rows are covered by the triggers from here on
+    for statement in TRIGGER_STATEMENTS:
+        op.execute(statement)
+
+    with op.get_context().autocommit_block():
+        _backfill("documents")
+        _backfill("chunks")
+
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS document_search_vector_index "
+            "ON documents USING gin (search_vector)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS chucks_search_vector_index "
+            "ON chunks USING gin (search_vector)"
+        )
+
+        # The expression indexes are no longer used by any query
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS document_search_index")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS chucks_search_index")
+
+
+def downgrade() -> None:
+    """Restore the expression indexes and drop search_vector columns."""
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS document_search_index "
+        "ON documents USING gin (to_tsvector('english', content))"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS chucks_search_index "
+        "ON chunks USING gin (to_tsvector('english', content))"
+    )
+
+    op.execute("DROP TRIGGER IF EXISTS searchspaces_text_search_config ON searchspaces")
+    op.execute("DROP TRIGGER IF EXISTS chunks_search_vector ON chunks")
+    op.execute("DROP TRIGGER IF EXISTS documents_search_vector ON documents")
+    op.execute("DROP FUNCTION IF EXISTS searchspaces_text_search_config_update()")
+    op.execute("DROP FUNCTION IF EXISTS chunks_search_vector_update()")
+    op.execute("DROP FUNCTION IF EXISTS documents_search_vector_update()")
+
+    op.execute("DROP INDEX IF EXISTS chucks_search_vector_index")
+    op.execute("DROP INDEX IF EXISTS document_search_vector_index")
+    op.execute("ALTER TABLE chunks DROP COLUMN IF EXISTS search_vector")
+    op.execute("ALTER TABLE documents DROP COLUMN IF EXISTS search_vector")
+    op.execute("ALTER TABLE searchspaces DROP COLUMN IF EXISTS text_search_config")
@@ -0,0 +1,155 @@
+"""Denormalize search_space_id and document_type onto chunks
+
+Chunk retrieval joined chunks -> documents -> searchspaces only to filter on
+the search space, its owner and the document type. This migration copies
+search_space_id and document_type onto chunks, keeps them in sync with
+triggers, and adds a composite B-tree index plus one partial HNSW index per
+document type so the planner can combine the filter with the ANN scan.
+
+The backfill runs in committed batches and the indexes are built concurrently
+so the upgrade stays online.
+
+Revision ID: 39
+Revises: 38
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "39"
+down_revision: str | None = "38"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+DOCUMENT_TYPES = [
+    "EXTENSION",
+    "CRAWLED_URL",
+    "FILE",
+    "SLACK_CONNECTOR",
+    "NOTION_CONNECTOR",
+    "YOUTUBE_VIDEO",
+    "GITHUB_CONNECTOR",
+    "LINEAR_CONNECTOR",
+    "DISCORD_CONNECTOR",
+    "JIRA_CONNECTOR",
+    "CONFLUENCE_CONNECTOR",
+    "CLICKUP_CONNECTOR",
+    "GOOGLE_CALENDAR_CONNECTOR",
+    "GOOGLE_GMAIL_CONNECTOR",
+    "AIRTABLE_CONNECTOR",
+    "LUMA_CONNECTOR",
+    "ELASTICSEARCH_CONNECTOR",
+]
+
+# Mirrors CHUNK_DOCUMENT_FIELDS_TRIGGER_STATEMENTS in app/db.py
+TRIGGER_STATEMENTS = [
+    """
+    CREATE OR REPLACE FUNCTION chunks_document_fields_update() RETURNS trigger AS $$
+    BEGIN
+        SELECT d.search_space_id, d.document_type
+        INTO NEW.search_space_id, NEW.document_type
+        FROM documents d
+        WHERE d.id = NEW.document_id;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE TRIGGER chunks_document_fields
+    BEFORE INSERT OR UPDATE OF document_id, search_space_id, document_type ON chunks
+    FOR EACH ROW EXECUTE FUNCTION chunks_document_fields_update()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION documents_chunk_fields_update() RETURNS trigger AS $$
+    BEGIN
+        UPDATE chunks
+        SET search_space_id = NEW.search_space_id, document_type = NEW.document_type
+        WHERE document_id = NEW.id;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE TRIGGER documents_chunk_fields
+    AFTER UPDATE OF search_space_id, document_type ON documents
+    FOR EACH ROW
+    WHEN (
+        OLD.search_space_id IS DISTINCT FROM NEW.search_space_id
+        OR OLD.document_type IS DISTINCT FROM NEW.document_type
+    )
+    EXECUTE FUNCTION documents_chunk_fields_update()
+    """,
+]
+
+BACKFILL_STATEMENT = """
+    UPDATE chunks c
+    SET search_space_id = d.search_space_id, document_type = d.document_type
+    FROM documents d
+    WHERE d.id = c.document_id
+      AND c.id > :start_id AND c.id <= :end_id
+      AND c.search_space_id IS NULL
+"""
+
+
+def _backfill() -> None:
+    """Backfill the denormalized columns in id ranges, committing after every batch."""
+    bind = op.get_bind()
+    max_id = bind.execute(sa.text("SELECT COALESCE(MAX(id), 0) FROM chunks")).scalar()
+
+    start_id = 0
+    while start_id < max_id:
+        end_id = start_id + BACKFILL_BATCH_SIZE
+        bind.execute(
+            sa.text(BACKFILL_STATEMENT), {"start_id": start_id, "end_id": end_id}
+        )
+        start_id = end_id
+
+
+def upgrade() -> None:
+    """Add chunk filter columns, triggers, backfill and indexes."""
+    op.execute(
+        "ALTER TABLE chunks ADD COLUMN IF NOT EXISTS search_space_id INTEGER "
+        "REFERENCES searchspaces(id) ON DELETE CASCADE"
+    )
+    op.execute("ALTER TABLE chunks ADD COLUMN IF NOT EXISTS document_type documenttype")
+
+    # New and updated rows are covered by the triggers from here on
+    for statement in TRIGGER_STATEMENTS:
+        op.execute(statement)
+
+    with op.get_context().autocommit_block():
+        _backfill()
+
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS "
+            "chunks_search_space_document_type_index "
+            "ON chunks (search_space_id, document_type)"
+        )
+        for document_type in DOCUMENT_TYPES:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS "
+                f"chunks_vector_{document_type.lower()}_index "
+                f"ON chunks USING hnsw (embedding public.vector_cosine_ops) "
+                f"WHERE document_type = '{document_type}'"
+            )
+
+
+def downgrade() -> None:
+    """Drop chunk filter indexes, triggers and columns."""
+    for document_type in DOCUMENT_TYPES:
+        op.execute(f"DROP INDEX IF EXISTS chunks_vector_{document_type.lower()}_index")
+    op.execute("DROP INDEX IF EXISTS chunks_search_space_document_type_index")
+
+    op.execute("DROP TRIGGER IF EXISTS documents_chunk_fields ON documents")
+    op.execute("DROP TRIGGER IF EXISTS chunks_document_fields ON chunks")
+    op.execute("DROP FUNCTION IF EXISTS documents_chunk_fields_update()")
+    op.execute("DROP FUNCTION IF EXISTS chunks_document_fields_update()")
+
+    op.execute("ALTER TABLE chunks DROP COLUMN IF EXISTS document_type")
+    op.execute("ALTER TABLE chunks DROP COLUMN IF EXISTS search_space_id")
@@ -0,0 +1,34 @@
+"""Add an index on chunks.document_id
+
+Hierarchical retrieval restricts the chunk search to the chunks of a shortlist
+of documents; this index lets those chunks be fetched without a full scan.
+The index is built concurrently so the upgrade stays online.
+
+Revision ID: 40
+Revises: 39
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "40"
+down_revision: str | None = "39"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Create the chunks.document_id index."""
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS chunks_document_id_index "
+            "ON chunks (document_id)"
+        )
+
+
+def downgrade() -> None:
+    """Drop the chunks.document_id index."""
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS chunks_document_id_index")
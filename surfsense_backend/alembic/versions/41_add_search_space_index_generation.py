@@ -0,0 +1,79 @@
+"""Add searchspaces.index_generation for search result caching
+
+Search results are cached keyed on the search space's index generation.
+Statement-level triggers on documents and chunks bump the counter on every
+insert, update or delete, so a cached result can never outlive a write.
+
+Revision ID: 41
+Revises: 40
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "41"
+down_revision: str | None = "40"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+TRIGGER_EVENTS = [
+    ("INSERT", "NEW TABLE AS new_rows"),
+    ("UPDATE", "OLD TABLE AS old_rows NEW TABLE AS new_rows"),
+    ("DELETE", "OLD TABLE AS old_rows"),
+]
+
+# Mirrors INDEX_GENERATION_TRIGGER_STATEMENTS in app/db.py
+FUNCTION_STATEMENT = """
+    CREATE OR REPLACE FUNCTION searchspaces_index_generation_bump() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            UPDATE searchspaces SET index_generation = index_generation + 1
+            WHERE id IN (SELECT search_space_id FROM new_rows);
+        ELSIF TG_OP = 'DELETE' THEN
+            UPDATE searchspaces SET index_generation = index_generation + 1
+            WHERE id IN (SELECT search_space_id FROM old_rows);
+        ELSE
+            UPDATE searchspaces SET index_generation = index_generation + 1
+            WHERE id IN (
+                SELECT search_space_id FROM new_rows
+                UNION
+                SELECT search_space_id FROM old_rows
+            );
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    """Add the index_generation column and the triggers that bump it."""
+    # A constant default is a metadata-only change (no table rewrite)
+    op.execute(
+        "ALTER TABLE searchspaces "
+        "ADD COLUMN IF NOT EXISTS index_generation BIGINT NOT NULL DEFAULT 0"
+    )
+    op.execute(FUNCTION_STATEMENT)
+
+    for table in ("documents", "chunks"):
+        for event, transition_tables in TRIGGER_EVENTS:
+            op.execute(
+                f"CREATE OR REPLACE TRIGGER {table}_index_generation_{event.lower()} "
+                f"AFTER {event} ON {table} "
+                f"REFERENCING {transition_tables} "
+                f"FOR EACH STATEMENT EXECUTE FUNCTION searchspaces_index_generation_bump()"
+            )
+
+
+def downgrade() -> None:
+    """Drop the triggers and the index_generation column."""
+    for table in ("documents", "chunks"):
+        for event, _ in TRIGGER_EVENTS:
+            op.execute(
+                f"DROP TRIGGER IF EXISTS {table}_index_generation_{event.lower()} "
+                f"ON {table}"
+            )
+    op.execute("DROP FUNCTION IF EXISTS searchspaces_index_generation_bump()")
+    op.execute("ALTER TABLE searchspaces DROP COLUMN IF EXISTS index_generation")
@@ -0,0 +1,87 @@
+"""Add ordinal positions and character offsets to chunks
+
+Chunks had no position within their document, so retrieval could only give
+context by including whole documents. This migration adds chunks.position
+(0-based ordinal within the document) and chunks.start_offset (character
+offset in the chunked content), plus a (document_id, position) index that
+lets a hit be expanded to its neighboring chunks in one indexed query.
+
+Existing chunks get positions from their id order, which is the order they
+were created in. Their character offsets are unknown and stay NULL. The
+backfill runs in committed batches of documents and the index is built
+concurrently so the upgrade stays online. The composite index replaces
+chunks_document_id_index, which it covers.
+
+Revision ID: 42
+Revises: 41
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "42"
+down_revision: str | None = "41"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+BACKFILL_STATEMENT = """
+    UPDATE chunks c
+    SET position = ordered.position
+    FROM (
+        SELECT id, row_number() OVER (PARTITION BY document_id ORDER BY id) - 1 AS position
+        FROM chunks
+        WHERE document_id > :start_id AND document_id <= :end_id
+    ) ordered
+    WHERE c.id = ordered.id
+      AND c.position IS NULL
+"""
+
+
+def _backfill() -> None:
+    """Backfill positions in document id ranges, committing after every batch."""
+    bind = op.get_bind()
+    max_id = bind.execute(
+        sa.text("SELECT COALESCE(MAX(document_id), 0) FROM chunks")
+    ).scalar()
+
+    start_id = 0
+    while start_id < max_id:
+        end_id = start_id + BACKFILL_BATCH_SIZE
+        bind.execute(
+            sa.text(BACKFILL_STATEMENT), {"start_id": start_id, "end_id": end_id}
+        )
+        start_id = end_id
+
+
+def upgrade() -> None:
+    """Add chunk position columns, backfill positions and index them."""
+    op.execute("ALTER TABLE chunks ADD COLUMN IF NOT EXISTS position INTEGER")
+    op.execute("ALTER TABLE chunks ADD COLUMN IF NOT EXISTS start_offset INTEGER")
+
+    with op.get_context().autocommit_block():
+        _backfill()
+
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS chunks_document_position_index "
+            "ON chunks (document_id, position)"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS chunks_document_id_index")
+
+
+def downgrade() -> None:
+    """Restore the chunks.document_id index and drop the position columns."""
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS chunks_document_id_index "
+            "ON chunks (document_id)"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS chunks_document_position_index")
+
+    op.execute("ALTER TABLE chunks DROP COLUMN IF EXISTS start_offset")
+    op.execute("ALTER TABLE chunks DROP COLUMN IF EXISTS position")
@@ -0,0 +1,49 @@
+"""Add embedding_cache table
+
+Chunk embeddings are stored by (embedding model, SHA-256 of the chunk text) so
+that re-indexing an edited document only embeds the chunks whose text changed.
+The embedding column has no fixed dimension, since entries of different
+embedding models share the table.
+
+Revision ID: 43
+Revises: 42
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "43"
+down_revision: str | None = "42"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Create the embedding_cache table."""
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS embedding_cache (
+            id SERIAL PRIMARY KEY,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            model VARCHAR NOT NULL,
+            content_hash VARCHAR(64) NOT NULL,
+            embedding vector NOT NULL,
+            CONSTRAINT uq_embedding_cache_model_content_hash
+                UNIQUE (model, content_hash)
+        )
+        """
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_embedding_cache_id ON embedding_cache (id)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_embedding_cache_created_at "
+        "ON embedding_cache (created_at)"
+    )
+
+
+def downgrade() -> None:
+    """Drop the embedding_cache table."""
+    op.execute("DROP TABLE IF EXISTS embedding_cache")
@@ -0,0 +1,31 @@
+"""Add token_counts to documents and chunks
+
+Token counts are stored per tokenizer family (JSONB, e.g. {"cl100k_base": 512})
+and computed when rows are written. Existing rows are left NULL; fill them in
+with scripts/backfill_token_counts.py.
+
+Revision ID: 44
+Revises: 43
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "44"
+down_revision: str | None = "43"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Add the nullable token_counts columns (no table rewrite)."""
+    op.execute("ALTER TABLE documents ADD COLUMN IF NOT EXISTS token_counts JSONB")
+    op.execute("ALTER TABLE chunks ADD COLUMN IF NOT EXISTS token_counts JSONB")
+
+
+def downgrade() -> None:
+    """Drop the token_counts columns."""
+    op.execute("ALTER TABLE chunks DROP COLUMN IF EXISTS token_counts")
+    op.execute("ALTER TABLE documents DROP COLUMN IF EXISTS token_counts")
@@ -0,0 +1,46 @@
+"""Add summary_cache table
+
+LLM document summaries are stored by (LLM model, SHA-256 of the summarization
+prompt input) so re-indexing or re-uploading identical content skips the LLM
+call. The created_at index serves age-based eviction.
+
+Revision ID: 45
+Revises: 44
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "45"
+down_revision: str | None = "44"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Create the summary_cache table."""
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS summary_cache (
+            id SERIAL PRIMARY KEY,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            model VARCHAR NOT NULL,
+            input_hash VARCHAR(64) NOT NULL,
+            summary TEXT NOT NULL,
+            CONSTRAINT uq_summary_cache_model_input_hash
+                UNIQUE (model, input_hash)
+        )
+        """
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_summary_cache_id ON summary_cache (id)")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_summary_cache_created_at "
+        "ON summary_cache (created_at)"
+    )
+
+
+def downgrade() -> None:
+    """Drop the summary_cache table."""
+    op.execute("DROP TABLE IF EXISTS summary_cache")
@@ -0,0 +1,105 @@
+"""Record index writes in search_space_index_writes instead of locking searchspaces
+
+The index generation triggers of migration 41 ran an UPDATE of the search
+space row inside every statement that wrote documents or chunks. The row lock
+was held until the writer committed, so concurrent indexers of one search
+space waited on each other (and could deadlock). The triggers now append a row
+per written search space to search_space_index_writes. A search space's index
+generation is its index_generation plus its rows there, and a Celery beat task
+periodically folds the rows into index_generation.
+
+Revision ID: 46
+Revises: 45
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "46"
+down_revision: str | None = "45"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Mirrors INDEX_GENERATION_TRIGGER_STATEMENTS in app/db.py; the triggers of
+# migration 41 call this function and stay as they are
+FUNCTION_STATEMENT = """
+    CREATE OR REPLACE FUNCTION searchspaces_index_generation_bump() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO search_space_index_writes (search_space_id)
+            SELECT DISTINCT search_space_id FROM new_rows;
+        ELSIF TG_OP = 'DELETE' THEN
+            INSERT INTO search_space_index_writes (search_space_id)
+            SELECT DISTINCT search_space_id FROM old_rows;
+        ELSE
+            INSERT INTO search_space_index_writes (search_space_id)
+            SELECT search_space_id FROM new_rows
+            UNION
+            SELECT search_space_id FROM old_rows;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+"""
+
+# The function of migration 41
+PREVIOUS_FUNCTION_STATEMENT = """
+    CREATE OR REPLACE FUNCTION searchspaces_index_generation_bump() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            UPDATE searchspaces SET index_generation = index_generation + 1
+            WHERE id IN (SELECT search_space_id FROM new_rows);
+        ELSIF TG_OP = 'DELETE' THEN
+            UPDATE searchspaces SET index_generation = index_generation + 1
+            WHERE id IN (SELECT search_space_id FROM old_rows);
+        ELSE
+            UPDATE searchspaces SET index_generation = index_generation + 1
+            WHERE id IN (
+                SELECT search_space_id FROM new_rows
+                UNION
+                SELECT search_space_id FROM old_rows
+            );
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    """Create search_space_index_writes and make the triggers append to it."""
+    # No foreign key: inserts must not lock the search space row, and the
+    # triggers also fire while a search space delete cascades to its documents
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS search_space_index_writes (
+            id BIGSERIAL PRIMARY KEY,
+            search_space_id INTEGER NOT NULL
+        )
+        """
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_search_space_index_writes_search_space_id "
+        "ON search_space_index_writes (search_space_id)"
+    )
+    op.execute(FUNCTION_STATEMENT)
+
+
+def downgrade() -> None:
+    """Fold the recorded writes into index_generation and restore the UPDATE triggers."""
+    op.execute(PREVIOUS_FUNCTION_STATEMENT)
+    op.execute(
+        """
+        UPDATE searchspaces
+        SET index_generation = index_generation + counts.writes
+        FROM (
+            SELECT search_space_id, count(*) AS writes
+            FROM search_space_index_writes
+            GROUP BY search_space_id
+        ) AS counts
+        WHERE searchspaces.id = counts.search_space_id
+        """
+    )
+    op.execute("DROP TABLE IF EXISTS search_space_index_writes")
@@ -0,0 +1,82 @@
+"""Add searchspaces.llm_config_version for cross-process LLM instance caching
+
+Every process caches resolved LLM instances keyed on the search space's LLM
+config version. Statement-level triggers on llm_configs and
+user_search_space_preferences bump it on every insert, update or delete, so a
+changed, deleted or re-keyed config is never served from any process's cache.
+
+Revision ID: 47
+Revises: 46
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "47"
+down_revision: str | None = "46"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+TABLES = ("llm_configs", "user_search_space_preferences")
+
+TRIGGER_EVENTS = [
+    ("INSERT", "NEW TABLE AS new_rows"),
+    ("UPDATE", "OLD TABLE AS old_rows NEW TABLE AS new_rows"),
+    ("DELETE", "OLD TABLE AS old_rows"),
+]
+
+# Mirrors LLM_CONFIG_VERSION_TRIGGER_STATEMENTS in app/db.py
+FUNCTION_STATEMENT = """
+    CREATE OR REPLACE FUNCTION searchspaces_llm_config_version_bump() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            UPDATE searchspaces SET llm_config_version = llm_config_version + 1
+            WHERE id IN (SELECT search_space_id FROM new_rows);
+        ELSIF TG_OP = 'DELETE' THEN
+            UPDATE searchspaces SET llm_config_version = llm_config_version + 1
+            WHERE id IN (SELECT search_space_id FROM old_rows);
+        ELSE
+            UPDATE searchspaces SET llm_config_version = llm_config_version + 1
+            WHERE id IN (
+                SELECT search_space_id FROM new_rows
+                UNION
+                SELECT search_space_id FROM old_rows
+            );
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    """Add the llm_config_version column and the triggers that bump it."""
+    # A constant default is a metadata-only change (no table rewrite)
+    op.execute(
+        "ALTER TABLE searchspaces "
+        "ADD COLUMN IF NOT EXISTS llm_config_version BIGINT NOT NULL DEFAULT 0"
+    )
+    op.execute(FUNCTION_STATEMENT)
+
+    for table in TABLES:
+        for event, transition_tables in TRIGGER_EVENTS:
+            op.execute(
+                f"CREATE OR REPLACE TRIGGER {table}_llm_config_version_{event.lower()} "
+                f"AFTER {event} ON {table} "
+                f"REFERENCING {transition_tables} "
+                f"FOR EACH STATEMENT EXECUTE FUNCTION searchspaces_llm_config_version_bump()"
+            )
+
+
+def downgrade() -> None:
+    """Drop the triggers and the llm_config_version column."""
+    for table in TABLES:
+        for event, _ in TRIGGER_EVENTS:
+            op.execute(
+                f"DROP TRIGGER IF EXISTS {table}_llm_config_version_{event.lower()} "
+                f"ON {table}"
+            )
+    op.execute("DROP FUNCTION IF EXISTS searchspaces_llm_config_version_bump()")
+    op.execute("ALTER TABLE searchspaces DROP COLUMN IF EXISTS llm_config_version")
@@ -0,0 +1,46 @@
+"""Drop the whole-table HNSW index on chunks
+
+Every chunk search of the application filters on one document type, and
+those searches are served by the per-document-type partial HNSW indexes of
+migration 39. The whole-table index on chunks.embedding was only used by
+unfiltered searches, yet it was as large as all partial indexes together and
+was written on every chunk insert. The compressed-mode variants built by
+scripts/vector_storage.py are dropped as well.
+
+Revision ID: 48
+Revises: 47
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "48"
+down_revision: str | None = "47"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Full, halfvec and binary storage modes (see app/retriver/vector_storage.py)
+CHUNK_VECTOR_INDEXES = [
+    "chucks_vector_index",
+    "chunks_halfvec_vector_index",
+    "chunks_binary_vector_index",
+]
+
+
+def upgrade() -> None:
+    """Drop the whole-table chunk HNSW indexes without blocking writes."""
+    with op.get_context().autocommit_block():
+        for index_name in CHUNK_VECTOR_INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}")
+
+
+def downgrade() -> None:
+    """Rebuild the full-precision whole-table chunk HNSW index."""
+    # Compressed-mode indexes can be rebuilt with scripts/vector_storage.py
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS chucks_vector_index "
+            "ON chunks USING hnsw (embedding public.vector_cosine_ops)"
+        )
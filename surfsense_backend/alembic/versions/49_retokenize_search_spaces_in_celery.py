@@ -0,0 +1,59 @@
+"""Re-tokenize search spaces in a Celery task instead of a trigger
+
+The searchspaces_text_search_config trigger of migration 38 recomputed
+search_vector for every document and chunk of a search space inside the
+transaction that changed its text_search_config, so the PUT request ran for
+as long as re-tokenizing the whole space took and held its row locks. The
+update now only changes the configuration, and the route enqueues the
+retokenize_search_space task, which re-tokenizes in committed batches.
+
+Revision ID: 49
+Revises: 48
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "49"
+down_revision: str | None = "48"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# The trigger of migration 38
+PREVIOUS_TRIGGER_STATEMENTS = [
+    """
+    CREATE OR REPLACE FUNCTION searchspaces_text_search_config_update() RETURNS trigger AS $$
+    BEGIN
+        UPDATE documents
+        SET search_vector = to_tsvector(NEW.text_search_config::regconfig, content)
+        WHERE search_space_id = NEW.id;
+        UPDATE chunks
+        SET search_vector = to_tsvector(NEW.text_search_config::regconfig, chunks.content)
+        FROM documents
+        WHERE chunks.document_id = documents.id AND documents.search_space_id = NEW.id;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE TRIGGER searchspaces_text_search_config
+    AFTER UPDATE OF text_search_config ON searchspaces
+    FOR EACH ROW
+    WHEN (OLD.text_search_config IS DISTINCT FROM NEW.text_search_config)
+    EXECUTE FUNCTION searchspaces_text_search_config_update()
+    """,
+]
+
+
+def upgrade() -> None:
+    """Drop the synchronous re-tokenization trigger."""
+    op.execute("DROP TRIGGER IF EXISTS searchspaces_text_search_config ON searchspaces")
+    op.execute("DROP FUNCTION IF EXISTS searchspaces_text_search_config_update()")
+
+
+def downgrade() -> None:
+    """Restore the synchronous re-tokenization trigger."""
+    for statement in PREVIOUS_TRIGGER_STATEMENTS:
+        op.execute(statement)
@@ -13,6 +13,7 @@ class SearchMode(Enum):
 
     CHUNKS = "CHUNKS"
     DOCUMENTS = "DOCUMENTS"
+    HIERARCHICAL = "HIERARCHICAL"
 
 
 @dataclass(kw_only=True)
@@ -28,6 +29,8 @@ class Configuration:
     document_ids_to_add_in_context: list[int]
     language: str | None = None
     top_k: int = 10
+    ef_search: int | None = None
+    context_window: int | None = None
 
     @classmethod
     def from_runnable_config(
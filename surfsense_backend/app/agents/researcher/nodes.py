@@ -11,7 +11,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 # Additional imports for document fetching
 from sqlalchemy.future import select
 
-from app.db import Document, SearchSpace
+from app.db import Document, DocumentType, SearchSpace
 from app.services.connector_service import ConnectorService
 from app.services.query_service import QueryService
 
@@ -126,47 +126,54 @@ async def fetch_documents_by_ids(
         documents_by_type = {}
         formatted_documents = []
 
-        for doc in documents:
-            # Fetch associated chunks for this document (similar to DocumentHybridSearchRetriever)
+        documents_by_id = {doc.id: doc for doc in documents}
+        if documents_by_id:
+            # Fetch the chunks of all selected documents in one query (similar to
+            # DocumentHybridSearchRetriever), streamed in document/chunk order
             from app.db import Chunk
 
-            chunks_query = (
-                select(Chunk).where(Chunk.document_id == doc.id).order_by(Chunk.id)
+            chunks_result = await db_session.stream(
+                select(Chunk.id, Chunk.document_id, Chunk.content, Chunk.token_counts)
+                .where(Chunk.document_id.in_(list(documents_by_id)))
+                .order_by(
+                    Chunk.document_id, Chunk.position.asc().nulls_last(), Chunk.id
+                )
             )
-            chunks_result = await db_session.execute(chunks_query)
-            chunks = chunks_result.scalars().all()
 
             # Return individual chunks instead of concatenated content
-            if chunks:
-                for chunk in chunks:
-                    # Format each chunk to match connector service return format
-                    formatted_chunk = {
-                        "chunk_id": chunk.id,
-                        "content": chunk.content,  # Use individual chunk content
-                        "score": 0.5,  # High score since user explicitly selected these
-                        "document": {
-                            "id": chunk.id,
-                            "title": doc.title,
-                            "document_type": (
-                                doc.document_type.value
-                                if doc.document_type
-                                else "UNKNOWN"
-                            ),
-                            "metadata": doc.document_metadata or {},
-                        },
-                        "source": doc.document_type.value
-                        if doc.document_type
-                        else "UNKNOWN",
-                    }
-                    formatted_documents.append(formatted_chunk)
+            async for (
+                chunk_id,
+                document_id,
+                chunk_content,
+                token_counts,
+            ) in chunks_result:
+                doc = documents_by_id[document_id]
+
+                # Format each chunk to match connector service return format
+                formatted_chunk = {
+                    "chunk_id": chunk_id,
+                    "content": chunk_content,  # Use individual chunk content
+                    "token_counts": token_counts,
+                    "score": 0.5,  # High score since user explicitly selected these
+                    "document": {
+                        "id": chunk_id,
+                        "title": doc.title,
+                        "document_type": (
+                            doc.document_type.value if doc.document_type else "UNKNOWN"
+                        ),
+                        "metadata": doc.document_metadata or {},
+                    },
+                    "source": doc.document_type.value
+                    if doc.document_type
+                    else "UNKNOWN",
+                }
+                formatted_documents.append(formatted_chunk)
 
-                    # Group by document type for source objects
-                    doc_type = (
-                        doc.document_type.value if doc.document_type else "UNKNOWN"
-                    )
-                    if doc_type not in documents_by_type:
-                        documents_by_type[doc_type] = []
-                    documents_by_type[doc_type].append(doc)
+                # Group by document type for source objects
+                doc_type = doc.document_type.value if doc.document_type else "UNKNOWN"
+                if doc_type not in documents_by_type:
+                    documents_by_type[doc_type] = []
+                documents_by_type[doc_type].append(doc)
 
         # Create source objects for each document type (similar to ConnectorService)
         source_objects = []
@@ -584,6 +591,33 @@ async def fetch_relevant_documents(
     all_raw_documents = []  # Store all raw documents
     all_sources = []  # Store all sources
 
+    # Search all selected local connectors for all research questions in a
+    # single round-trip (with one batched embedding call); the per-connector
+    # calls below pick up these results
+    local_document_types = [
+        connector
+        for connector in connectors_to_search
+        if connector in DocumentType.__members__
+    ]
+    if local_document_types and (
+        len(local_document_types) > 1 or len(research_questions) > 1
+    ):
+        try:
+            # In a savepoint, so a failed statement does not abort the
+            # transaction the fallback searches run in
+            async with db_session.begin_nested():
+                await connector_service.prefetch_local_search(
+                    user_queries=research_questions,
+                    user_id=user_id,
+                    search_space_id=search_space_id,
+                    document_types=local_document_types,
+                    top_k=top_k,
+                    search_mode=search_mode,
+                )
+        except Exception:
+            # Fall back to searching each connector separately
+            logging.error("Error in prefetch_local_search: %s", traceback.format_exc())
+
     for i, user_query in enumerate(research_questions):
         # Stream question being researched
         if streaming_service and writer:
@@ -1404,12 +1438,15 @@ async def handle_qna_workflow(
 
         # Create connector service using state db_session
         connector_service = ConnectorService(
-            state.db_session, user_id=configuration.user_id
+            state.db_session,
+            user_id=configuration.user_id,
+            ef_search=configuration.ef_search,
+            context_window=configuration.context_window,
         )
         await connector_service.initialize_counter()
 
-        # Use the reformulated query as a single research question
-        research_questions = [reformulated_query, user_query]
+        # Search with both the reformulated and the original query (once if equal)
+        research_questions = list(dict.fromkeys([reformulated_query, user_query]))
 
         relevant_documents = await fetch_relevant_documents(
             research_questions=research_questions,
@@ -1,9 +1,14 @@
+import bisect
+import functools
+import itertools
 from typing import Any, NamedTuple
 
 from langchain.schema import AIMessage, HumanMessage, SystemMessage
 from langchain_core.messages import BaseMessage
 from litellm import get_model_info, token_counter
 
+from app.services.tokenizer_service import get_tokenizer
+
 
 class DocumentTokenInfo(NamedTuple):
     """Information about a document and its token cost."""
@@ -110,19 +115,42 @@ def format_documents_section(
     </documents>"""
 
 
+@functools.lru_cache(maxsize=256)
+def _citation_overhead_tokens(model: str, document_type: str) -> int:
+    """Tokens format_document_for_citation adds around a document's content."""
+    skeleton = format_document_for_citation(
+        # A long source id so the estimate never undercounts
+        {
+            "content": "",
+            "chunk_id": 10**12,
+            "document": {"document_type": document_type},
+        }
+    )
+    return get_tokenizer(model).count_message_tokens(skeleton)
+
+
 def calculate_document_token_costs(
     documents: list[dict[str, Any]], model: str
 ) -> list[DocumentTokenInfo]:
-    """Pre-calculate token costs for each document."""
+    """
+    Pre-calculate token costs for each document.
+
+    Documents carrying stored token_counts for the model's tokenizer family
+    (computed at ingest) are not tokenized; only the citation wrapper is added.
+    """
     document_token_info = []
+    tokenizer = get_tokenizer(model)
 
     for i, doc in enumerate(documents):
         formatted_doc = format_document_for_citation(doc)
 
-        # Calculate token count for this document
-        token_count = token_counter(
-            messages=[{"role": "user", "content": formatted_doc}], model=model
-        )
+        stored_count = (doc.get("token_counts") or {}).get(tokenizer.family)
+        if stored_count is not None:
+            document_type = doc.get("document", {}).get("document_type", "CRAWLED_URL")
+            token_count = stored_count + _citation_overhead_tokens(model, document_type)
+        else:
+            # Not counted at ingest (e.g. web search results)
+            token_count = tokenizer.count_message_tokens(formatted_doc)
 
         document_token_info.append(
             DocumentTokenInfo(
@@ -139,25 +167,15 @@ def calculate_document_token_costs(
 def find_optimal_documents_with_binary_search(
     document_tokens: list[DocumentTokenInfo], available_tokens: int
 ) -> list[DocumentTokenInfo]:
-    """Use binary search to find the maximum number of documents that fit within token limit."""
+    """Find the maximum number of leading documents that fit within the token limit."""
     if not document_tokens or available_tokens <= 0:
         return []
 
-    left, right = 0, len(document_tokens)
-    optimal_docs = []
-
-    while left <= right:
-        mid = (left + right) // 2
-        current_docs = document_tokens[:mid]
-        current_token_sum = sum(doc_info.token_count for doc_info in current_docs)
-
-        if current_token_sum <= available_tokens:
-            optimal_docs = current_docs
-            left = mid + 1
-        else:
-            right = mid - 1
-
-    return optimal_docs
+    # Prefix sums are non-decreasing, so the cut is a single bisection
+    cumulative_tokens = list(
+        itertools.accumulate(doc_info.token_count for doc_info in document_tokens)
+    )
+    return document_tokens[: bisect.bisect_right(cumulative_tokens, available_tokens)]
 
 
 def get_model_context_window(model_name: str) -> int:
@@ -1,3 +1,4 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import Depends, FastAPI, HTTPException, status
@@ -9,13 +10,18 @@ from app.config import config
 from app.db import User, create_db_and_tables, get_async_session
 from app.routes import router as crud_router
 from app.schemas import UserCreate, UserRead, UserUpdate
+from app.services.runtime_stats import start_runtime_stats_logging
 from app.users import SECRET, auth_backend, current_active_user, fastapi_users
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Waits for the embedding server (if used) off the event loop
+    await asyncio.to_thread(config.load_embedding_server_info)
     # Not needed if you setup a migration system like Alembic
     await create_db_and_tables()
+    config.log_startup_report("API")
+    start_runtime_stats_logging("API")
     yield
 
 
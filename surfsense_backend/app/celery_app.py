@@ -4,6 +4,7 @@ import os
 
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import beat_init, worker_init, worker_process_init, worker_ready
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -63,6 +64,8 @@ celery_app = Celery(
         "app.tasks.celery_tasks.podcast_tasks",
         "app.tasks.celery_tasks.connector_tasks",
         "app.tasks.celery_tasks.schedule_checker_task",
+        "app.tasks.celery_tasks.maintenance_tasks",
+        "app.tasks.celery_tasks.search_space_tasks",
     ],
 )
 
@@ -105,4 +108,47 @@ celery_app.conf.beat_schedule = {
             "expires": 30,  # Task expires after 30 seconds if not picked up
         },
     },
+    "evict-summary-cache": {
+        "task": "evict_summary_cache",
+        "schedule": crontab(minute=30, hour=3),  # Daily, outside working hours
+    },
+    "compact-index-writes": {
+        "task": "compact_index_writes",
+        # Hourly keeps the per-space write counts read by searches small
+        "schedule": crontab(minute=15),
+    },
 }
+
+
+@worker_ready.connect
+def log_worker_startup(**kwargs):
+    """Log config import time, loaded heavy members and memory of the worker."""
+    from app.config import config
+
+    config.log_startup_report("Celery worker")
+
+
+@worker_process_init.connect
+def start_worker_stats_logging(**kwargs):
+    """Periodically log the embedding executor and cache counters of each worker process."""
+    from app.services.runtime_stats import start_runtime_stats_logging
+
+    start_runtime_stats_logging("Celery worker")
+
+
+# In the main process before the pool forks (worker_process_init has a short
+# timeout), so every child inherits the fetched info
+@worker_init.connect
+def load_embedding_server_info(**kwargs):
+    """Fetch the embedding server's model info before any task runs."""
+    from app.config import config
+
+    config.load_embedding_server_info()
+
+
+@beat_init.connect
+def log_beat_startup(**kwargs):
+    """Log config import time, loaded heavy members and memory of Celery beat."""
+    from app.config import config
+
+    config.log_startup_report("Celery beat")
@@ -1,67 +1,18 @@
+import functools
+import logging
 import os
 import shutil
+import threading
+import time
 from pathlib import Path
 from typing import Any
 
 import yaml
-from chonkie import AutoEmbeddings, CodeChunker, RecursiveChunker
-from chonkie.embeddings.azure_openai import AzureOpenAIEmbeddings
-from chonkie.embeddings.registry import EmbeddingsRegistry
 from dotenv import load_dotenv
-from rerankers import Reranker
-
-
-# Monkey patch AzureOpenAIEmbeddings to fix parameter order issue
-# This is a temporary workaround until the upstream chonkie library is fixed
-class FixedAzureOpenAIEmbeddings(AzureOpenAIEmbeddings):
-    """Wrapper around AzureOpenAIEmbeddings with fixed parameter order."""
-
-    def __init__(
-        self,
-        model: str = "text-embedding-3-small",
-        azure_endpoint: str | None = None,
-        tokenizer: Any | None = None,
-        dimension: int | None = None,
-        azure_api_key: str | None = None,
-        api_version: str = "2024-10-21",
-        deployment: str | None = None,
-        max_retries: int = 3,
-        timeout: float = 60.0,
-        batch_size: int = 128,
-        **kwargs: dict[str, Any],
-    ):
-        """Initialize with model as first parameter to avoid conflicts."""
-        # Call parent's __init__ by explicitly passing azure_endpoint as first arg
-        # to maintain compatibility with the original signature
-        super().__init__(
-            azure_endpoint=azure_endpoint or os.getenv("AZURE_OPENAI_ENDPOINT", ""),
-            model=model,
-            tokenizer=tokenizer,
-            dimension=dimension,
-            azure_api_key=azure_api_key,
-            api_version=api_version,
-            deployment=deployment,
-            max_retries=max_retries,
-            timeout=timeout,
-            batch_size=batch_size,
-            **kwargs,
-        )
 
+_IMPORT_STARTED_AT = time.perf_counter()
 
-# TODO: Fix this in chonkie upstream
-# Register our fixed Azure OpenAI embeddings with pattern
-# This automatically infers the following arguments from their corresponding environment variables if they are not provided:
-# - `api_key` from `AZURE_OPENAI_API_KEY`
-# - `organization` from `OPENAI_ORG_ID`
-# - `project` from `OPENAI_PROJECT_ID`
-# - `azure_ad_token` from `AZURE_OPENAI_AD_TOKEN`
-# - `api_version` from `OPENAI_API_VERSION`
-# - `azure_endpoint` from `AZURE_OPENAI_ENDPOINT`
-EmbeddingsRegistry.register_provider("azure_openai", FixedAzureOpenAIEmbeddings)
-EmbeddingsRegistry.register_pattern(r"^text-embedding-", FixedAzureOpenAIEmbeddings)
-EmbeddingsRegistry.register_model("text-embedding-ada-002", FixedAzureOpenAIEmbeddings)
-EmbeddingsRegistry.register_model("text-embedding-3-small", FixedAzureOpenAIEmbeddings)
-EmbeddingsRegistry.register_model("text-embedding-3-large", FixedAzureOpenAIEmbeddings)
+logger = logging.getLogger(__name__)
 
 
 # Get the base directory of the project
@@ -81,6 +32,64 @@ def is_ffmpeg_installed():
     return shutil.which("ffmpeg") is not None
 
 
+@functools.cache
+def ensure_ffmpeg_installed() -> None:
+    """
+    Make sure ffmpeg is available, installing the static build if needed.
+
+    Called by the code paths that run ffmpeg (e.g. the podcaster) rather than
+    when the config is imported, so processes that never run it skip the check.
+
+    Raises:
+        ValueError: If ffmpeg is still unavailable afterwards
+    """
+    if not is_ffmpeg_installed():
+        import static_ffmpeg
+
+        # ffmpeg installed on first call to add_paths(), threadsafe.
+        static_ffmpeg.add_paths()
+        # check if ffmpeg is installed again
+        if not is_ffmpeg_installed():
+            raise ValueError(
+                "FFmpeg is not installed on the system. Please install it to use the Surfsense Podcaster."
+            )
+
+
+# Lazy member name -> seconds it took to build, in load order
+_member_load_seconds: dict[str, float] = {}
+# Reentrant: members are built from other members (chunkers use the model)
+_member_lock = threading.RLock()
+
+
+def lazy_member(method):
+    """
+    Declare a Config member that is built on first access and then cached.
+
+    Heavy members (embedding model, chunkers, reranker) are only built by the
+    processes that use them; Alembic, Celery beat and the schedule checker
+    never pay for them. Build times are recorded for startup_report().
+    Assigning the attribute (e.g. in tests or benchmarks) replaces the value.
+    """
+
+    name = method.__name__
+
+    @functools.wraps(method)
+    def load(self):
+        # Serialized so concurrent first accesses (e.g. from the embedding
+        # worker threads) build the member once
+        with _member_lock:
+            if name in self.__dict__:
+                return self.__dict__[name]
+            started = time.perf_counter()
+            value = method(self)
+            _member_load_seconds[name] = time.perf_counter() - started
+            self.__dict__[name] = value
+        logger.info("Loaded config.%s in %.2fs", name, _member_load_seconds[name])
+        return value
+
+    return functools.cached_property(load)
+
+
 def load_global_llm_configs():
     """
     Load global LLM configurations from YAML file.
@@ -112,18 +121,6 @@ def load_global_llm_configs():
 
 
 class Config:
-    # Check if ffmpeg is installed
-    if not is_ffmpeg_installed():
-        import static_ffmpeg
-
-        # ffmpeg installed on first call to add_paths(), threadsafe.
-        static_ffmpeg.add_paths()
-        # check if ffmpeg is installed again
-        if not is_ffmpeg_installed():
-            raise ValueError(
-                "FFmpeg is not installed on the system. Please install it to use the Surfsense Podcaster."
-            )
-
     # Database
     DATABASE_URL = os.getenv("DATABASE_URL")
 
@@ -164,35 +161,168 @@ class Config:
     AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
     AZURE_OPENAI_API_KEY = os.getenv("AZURE_OPENAI_API_KEY")
 
-    # Pass Azure credentials to embeddings when using Azure OpenAI
-    embedding_kwargs = {}
-    if AZURE_OPENAI_ENDPOINT:
-        embedding_kwargs["azure_endpoint"] = AZURE_OPENAI_ENDPOINT
-    if AZURE_OPENAI_API_KEY:
-        embedding_kwargs["azure_api_key"] = AZURE_OPENAI_API_KEY
+    # "local" loads the model in this process; "server" sends every embedding
+    # call to the shared embedding server (see app/services/embedding_server.py)
+    EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "local").lower()
+    EMBEDDING_SERVER_URL = os.getenv("EMBEDDING_SERVER_URL", "http://127.0.0.1:8002")
+    # Optional: lets table and vector index setup run without loading the
+    # embedding model
+    EMBEDDING_DIMENSION = (
+        int(os.getenv("EMBEDDING_DIMENSION"))
+        if os.getenv("EMBEDDING_DIMENSION")
+        else None
+    )
+
+    @lazy_member
+    def embedding_model_instance(self):
+        if self.EMBEDDING_BACKEND == "server":
+            from app.services.embedding_server import RemoteEmbeddings
+
+            return RemoteEmbeddings(
+                self.EMBEDDING_SERVER_URL,
+                model=self.EMBEDDING_MODEL,
+                dimension=self.EMBEDDING_DIMENSION,
+            )
+
+        # Pass Azure credentials to embeddings when using Azure OpenAI
+        embedding_kwargs = {}
+        if self.AZURE_OPENAI_ENDPOINT:
+            embedding_kwargs["azure_endpoint"] = self.AZURE_OPENAI_ENDPOINT
+        if self.AZURE_OPENAI_API_KEY:
+            embedding_kwargs["azure_api_key"] = self.AZURE_OPENAI_API_KEY
+
+        from chonkie import AutoEmbeddings
+
+        from app.config.azure_embeddings import register_azure_embeddings
 
-    embedding_model_instance = AutoEmbeddings.get_embeddings(
-        EMBEDDING_MODEL,
-        **embedding_kwargs,
+        register_azure_embeddings()
+        model = AutoEmbeddings.get_embeddings(
+            self.EMBEDDING_MODEL,
+            **embedding_kwargs,
+        )
+        if self.EMBEDDING_DIMENSION and model.dimension != self.EMBEDDING_DIMENSION:
+            raise ValueError(
+                f"EMBEDDING_DIMENSION is {self.EMBEDDING_DIMENSION}, but Model: "
+                f"{self.EMBEDDING_MODEL} has {model.dimension} dimensions"
+            )
+        return model
+
+    def load_embedding_server_info(self) -> None:
+        """
+        With EMBEDDING_BACKEND=server, fetch the served model's dimension and
+        maximum sequence length, waiting for the server to start.
+
+        Blocking; the API runs it in a thread in its lifespan and Celery in
+        worker_init, so embedding_dimension and chunker_instance never
+        wait for the server on an event loop.
+        """
+        if self.EMBEDDING_BACKEND == "server":
+            self.embedding_model_instance.load_info()
+
+    @lazy_member
+    def embedding_dimension(self) -> int:
+        dimension = self.EMBEDDING_DIMENSION or self.embedding_model_instance.dimension
+        # Validation Checks
+        # Check embedding dimension
+        if dimension > 2000:
+            raise ValueError(
+                f"Embedding dimension for Model: {self.EMBEDDING_MODEL} "
+                f"has {dimension} dimensions, which "
+                f"exceeds the maximum of 2000 allowed by PGVector."
+            )
+        return dimension
+
+    # Texts per embed_batch call when embedding document chunks
+    EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+    # Embedding worker threads and request queue (see app/services/embedding_service.py)
+    EMBEDDING_EXECUTOR_WORKERS = int(os.getenv("EMBEDDING_EXECUTOR_WORKERS", "1"))
+    EMBEDDING_QUEUE_SIZE = int(os.getenv("EMBEDDING_QUEUE_SIZE", "256"))
+    EMBEDDING_MAX_WAIT_MS = float(os.getenv("EMBEDDING_MAX_WAIT_MS", "5"))
+    # Reuse stored chunk embeddings by (model, text hash) when re-indexing
+    EMBEDDING_CACHE_ENABLED = (
+        os.getenv("EMBEDDING_CACHE_ENABLED", "TRUE").upper() == "TRUE"
     )
-    chunker_instance = RecursiveChunker(
-        chunk_size=getattr(embedding_model_instance, "max_seq_length", 512)
+    # Concurrent LLM calls when summarizing a large document in chunks
+    # (see DoclingService.process_large_document_summary)
+    DOCUMENT_SUMMARY_CONCURRENCY = int(os.getenv("DOCUMENT_SUMMARY_CONCURRENCY", "4"))
+    # Resolved per-user ChatLiteLLM instances (see app/services/llm_service.py)
+    LLM_INSTANCE_CACHE_SIZE = int(os.getenv("LLM_INSTANCE_CACHE_SIZE", "1024"))
+    LLM_INSTANCE_CACHE_TTL_SECONDS = float(
+        os.getenv("LLM_INSTANCE_CACHE_TTL_SECONDS", "300")
     )
-    code_chunker_instance = CodeChunker(
-        chunk_size=getattr(embedding_model_instance, "max_seq_length", 512)
+    # Persistent LLM summary cache (see app/services/summary_cache.py)
+    SUMMARY_CACHE_ENABLED = os.getenv("SUMMARY_CACHE_ENABLED", "TRUE").upper() == "TRUE"
+    SUMMARY_CACHE_MAX_AGE_DAYS = float(os.getenv("SUMMARY_CACHE_MAX_AGE_DAYS", "90"))
+    SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", "100000"))
+    # Query embedding cache shared by the retrievers (see app/services/embedding_service.py)
+    QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "1024"))
+    QUERY_EMBEDDING_CACHE_TTL_SECONDS = float(
+        os.getenv("QUERY_EMBEDDING_CACHE_TTL_SECONDS", "3600")
+    )
+    # HNSW scan tuning applied per retrieval (see app/retriver/vector_search_settings.py)
+    HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "40"))
+    # off, strict_order or relaxed_order (requires pgvector >= 0.8.0)
+    HNSW_ITERATIVE_SCAN = os.getenv("HNSW_ITERATIVE_SCAN", "relaxed_order")
+    HNSW_MAX_SCAN_TUPLES = int(os.getenv("HNSW_MAX_SCAN_TUPLES", "20000"))
+    # full, halfvec or binary HNSW indexes (see app/retriver/vector_storage.py)
+    VECTOR_STORAGE_MODE = os.getenv("VECTOR_STORAGE_MODE", "full").lower()
+    VECTOR_RESCORE_FACTOR = int(os.getenv("VECTOR_RESCORE_FACTOR", "4"))
+    # Documents shortlisted by summary embedding in HIERARCHICAL search mode
+    HIERARCHICAL_DOCUMENT_TOP_N = int(os.getenv("HIERARCHICAL_DOCUMENT_TOP_N", "20"))
+    # Models whose tokenizer families get stored token counts for chunks and
+    # documents at ingest (see app/services/tokenizer_service.py)
+    TOKEN_COUNT_MODELS = [
+        model_name.strip()
+        for model_name in os.getenv("TOKEN_COUNT_MODELS", "gpt-4o-mini").split(",")
+        if model_name.strip()
+    ]
+    # Neighboring chunks added on each side of a chunk hit (0 disables expansion)
+    CHUNK_CONTEXT_WINDOW = int(os.getenv("CHUNK_CONTEXT_WINDOW", "0"))
+    # Local hybrid search result cache (see app/services/search_result_cache.py)
+    SEARCH_RESULT_CACHE_SIZE = int(os.getenv("SEARCH_RESULT_CACHE_SIZE", "512"))
+    SEARCH_RESULT_CACHE_TTL_SECONDS = float(
+        os.getenv("SEARCH_RESULT_CACHE_TTL_SECONDS", "600")
+    )
+    # Optional shared tier, e.g. redis://localhost:6379/1 (empty disables it)
+    SEARCH_RESULT_CACHE_REDIS_URL = os.getenv("SEARCH_RESULT_CACHE_REDIS_URL") or None
+    # Period of the embedding executor and cache counters log line of every API
+    # and Celery worker process (see app/services/runtime_stats.py; 0 disables it)
+    RUNTIME_STATS_LOG_INTERVAL_SECONDS = float(
+        os.getenv("RUNTIME_STATS_LOG_INTERVAL_SECONDS", "300")
     )
 
+    @lazy_member
+    def chunker_instance(self):
+        from chonkie import RecursiveChunker
+
+        return RecursiveChunker(
+            chunk_size=getattr(self.embedding_model_instance, "max_seq_length", 512)
+        )
+
+    @lazy_member
+    def code_chunker_instance(self):
+        from chonkie import CodeChunker
+
+        return CodeChunker(
+            chunk_size=getattr(self.embedding_model_instance, "max_seq_length", 512)
+        )
+
     # Reranker's Configuration | Pinecode, Cohere etc. Read more at https://github.com/AnswerDotAI/rerankers?tab=readme-ov-file#usage
     RERANKERS_ENABLED = os.getenv("RERANKERS_ENABLED", "FALSE").upper() == "TRUE"
-    if RERANKERS_ENABLED:
-        RERANKERS_MODEL_NAME = os.getenv("RERANKERS_MODEL_NAME")
-        RERANKERS_MODEL_TYPE = os.getenv("RERANKERS_MODEL_TYPE")
-        reranker_instance = Reranker(
-            model_name=RERANKERS_MODEL_NAME,
-            model_type=RERANKERS_MODEL_TYPE,
+    RERANKERS_MODEL_NAME = os.getenv("RERANKERS_MODEL_NAME")
+    RERANKERS_MODEL_TYPE = os.getenv("RERANKERS_MODEL_TYPE")
+
+    @lazy_member
+    def reranker_instance(self):
+        if not self.RERANKERS_ENABLED:
+            return None
+
+        from rerankers import Reranker
+
+        return Reranker(
+            model_name=self.RERANKERS_MODEL_NAME,
+            model_type=self.RERANKERS_MODEL_TYPE,
         )
-    else:
-        reranker_instance = None
 
     # OAuth JWT
     SECRET_KEY = os.getenv("SECRET_KEY")
@@ -221,27 +351,55 @@ class Config:
     STT_SERVICE_API_BASE = os.getenv("STT_SERVICE_API_BASE")
     STT_SERVICE_API_KEY = os.getenv("STT_SERVICE_API_KEY")
 
-    # Validation Checks
-    # Check embedding dimension
-    if (
-        hasattr(embedding_model_instance, "dimension")
-        and embedding_model_instance.dimension > 2000
-    ):
-        raise ValueError(
-            f"Embedding dimension for Model: {EMBEDDING_MODEL} "
-            f"has {embedding_model_instance.dimension} dimensions, which "
-            f"exceeds the maximum of 2000 allowed by PGVector."
-        )
-
     @classmethod
     def get_settings(cls):
         """Get all settings as a dictionary."""
         return {
             key: value
             for key, value in cls.__dict__.items()
-            if not key.startswith("_") and not callable(value)
+            if not key.startswith("_")
+            and not callable(value)
+            and not isinstance(value, functools.cached_property)
         }
 
+    def startup_report(self) -> dict[str, Any]:
+        """
+        Report how long importing the config took and which heavy members this
+        process has built so far, with their build times and the peak RSS.
+        """
+        lazy_members = [
+            key
+            for key, value in type(self).__dict__.items()
+            if isinstance(value, functools.cached_property)
+        ]
+        return {
+            "config_import_seconds": round(_CONFIG_IMPORT_SECONDS, 3),
+            "loaded_members": {
+                name: round(seconds, 3)
+                for name, seconds in _member_load_seconds.items()
+            },
+            "deferred_members": [
+                name for name in lazy_members if name not in self.__dict__
+            ],
+            "max_rss_mb": _max_rss_mb(),
+        }
+
+    def log_startup_report(self, process_name: str) -> None:
+        """Log startup_report() for this process."""
+        logger.info("%s startup: %s", process_name, self.startup_report())
+
+
+def _max_rss_mb() -> float | None:
+    """Peak RSS of this process in MB, or None where resource is unavailable (Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is in kilobytes on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
 
 # Create a config instance
 config = Config()
+
+_CONFIG_IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED_AT
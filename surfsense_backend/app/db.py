@@ -1,3 +1,4 @@
+import logging
 from collections.abc import AsyncGenerator
 from datetime import UTC, datetime
 from enum import Enum
@@ -18,22 +19,47 @@ from sqlalchemy import (
     String,
     Text,
     UniqueConstraint,
+    event,
+    inspect,
     text,
 )
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR, UUID
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import DeclarativeBase, Mapped, declared_attr, relationship
+from sqlalchemy.orm import (
+    DeclarativeBase,
+    Mapped,
+    declared_attr,
+    deferred,
+    relationship,
+)
 
 from app.config import config
 from app.retriver.chunks_hybrid_search import ChucksHybridSearchRetriever
 from app.retriver.documents_hybrid_search import DocumentHybridSearchRetriever
+from app.retriver.vector_storage import get_vector_storage_mode, vector_index_statements
 
 if config.AUTH_TYPE == "GOOGLE":
     from fastapi_users.db import SQLAlchemyBaseOAuthAccountTableUUID
 
+logger = logging.getLogger(__name__)
+
 DATABASE_URL = config.DATABASE_URL
 
 
+class EmbeddingVector(Vector):
+    """
+    Vector column sized to the embedding model.
+
+    The dimension is resolved when table DDL is emitted rather than at import,
+    so importing the models does not load the embedding model.
+    """
+
+    cache_ok = True
+
+    def get_col_spec(self, **kw) -> str:
+        return f"VECTOR({config.embedding_dimension})"
+
+
 class DocumentType(str, Enum):
     EXTENSION = "EXTENSION"
     CRAWLED_URL = "CRAWLED_URL"
@@ -177,14 +203,24 @@ class Document(BaseModel, TimestampMixin):
     content = Column(Text, nullable=False)
     content_hash = Column(String, nullable=False, index=True, unique=True)
     unique_identifier_hash = Column(String, nullable=True, index=True, unique=True)
-    embedding = Column(Vector(config.embedding_model_instance.dimension))
+    embedding = Column(EmbeddingVector())
+    # Maintained by the documents_search_vector trigger using the search space's
+    # text search configuration, so keyword search never re-parses content
+    search_vector = deferred(Column(TSVECTOR, nullable=True))
+    # Token count of content per tokenizer family, e.g. {"cl100k_base": 512},
+    # set at ingest (see count_content_tokens below)
+    token_counts = Column(JSONB, nullable=True)
 
     search_space_id = Column(
         Integer, ForeignKey("searchspaces.id", ondelete="CASCADE"), nullable=False
     )
     search_space = relationship("SearchSpace", back_populates="documents")
+    # In document order; chunks written before positions were stored go last
     chunks = relationship(
-        "Chunk", back_populates="document", cascade="all, delete-orphan"
+        "Chunk",
+        back_populates="document",
+        cascade="all, delete-orphan",
+        order_by=lambda: (Chunk.position.asc().nulls_last(), Chunk.id),
     )
 
 
@@ -192,13 +228,119 @@ class Chunk(BaseModel, TimestampMixin):
     __tablename__ = "chunks"
 
     content = Column(Text, nullable=False)
-    embedding = Column(Vector(config.embedding_model_instance.dimension))
+    embedding = Column(EmbeddingVector())
+    # Maintained by the chunks_search_vector trigger (see setup_triggers)
+    search_vector = deferred(Column(TSVECTOR, nullable=True))
 
     document_id = Column(
         Integer, ForeignKey("documents.id", ondelete="CASCADE"), nullable=False
     )
     document = relationship("Document", back_populates="chunks")
 
+    # Denormalized from the parent document by the chunks_document_fields trigger
+    # (see setup_triggers) so retrieval can filter chunks without joining documents
+    search_space_id = Column(
+        Integer, ForeignKey("searchspaces.id", ondelete="CASCADE"), nullable=True
+    )
+    document_type = Column(SQLAlchemyEnum(DocumentType), nullable=True)
+
+    # Sort key of the chunk within its document (sparse, see CHUNK_POSITION_GAP
+    # in app/utils/document_converters.py) and the character offset where it
+    # starts in the chunked content (NULL for chunks created before offsets
+    # were recorded). Used to expand search hits to neighboring chunks.
+    position = Column(Integer, nullable=True)
+    start_offset = Column(Integer, nullable=True)
+
+    # Token count of content per tokenizer family (see count_content_tokens)
+    token_counts = Column(JSONB, nullable=True)
+
+
+@event.listens_for(Document, "before_insert")
+@event.listens_for(Document, "before_update")
+@event.listens_for(Chunk, "before_insert")
+def count_content_tokens(mapper, connection, target):
+    """
+    Store the token counts of new or changed content at flush time.
+
+    Counts are kept per tokenizer family of TOKEN_COUNT_MODELS, so prompt
+    packing reads them instead of tokenizing retrieved text on every request.
+
+    Ingest code computes them off the event loop (compute_token_counts in
+    app.utils.document_converters) and sets token_counts itself; this is only
+    a safety net for writers that do not, since it tokenizes during the flush.
+    Updates that leave the content alone (e.g. a title edit) never tokenize,
+    even for rows without counts. Those rows, and failures (e.g. a tokenizer
+    that cannot be downloaded), are left empty for
+    scripts/backfill_token_counts.py to fill in.
+    """
+    state = inspect(target)
+    if state.attrs.token_counts.history.has_changes():
+        # Set by the writer along with the content
+        return
+    if state.persistent and not state.attrs.content.history.has_changes():
+        return
+
+    from app.services.tokenizer_service import count_tokens_by_family
+
+    try:
+        target.token_counts = count_tokens_by_family(target.content or "")
+    except Exception as e:
+        logger.warning(f"Could not count tokens of {mapper.class_.__name__}: {e!s}")
+        target.token_counts = None
+
+
+class EmbeddingCacheEntry(BaseModel, TimestampMixin):
+    """Chunk embedding keyed by embedding model and SHA-256 of the chunk text."""
+
+    __tablename__ = "embedding_cache"
+    __table_args__ = (
+        UniqueConstraint(
+            "model",
+            "content_hash",
+            name="uq_embedding_cache_model_content_hash",
+        ),
+    )
+
+    model = Column(String, nullable=False)
+    content_hash = Column(String(64), nullable=False)
+    # No fixed dimension: entries of different embedding models share the table
+    embedding = Column(Vector(), nullable=False)
+
+
+class SummaryCacheEntry(BaseModel, TimestampMixin):
+    """LLM summary keyed by LLM model and SHA-256 of the summarization prompt input."""
+
+    __tablename__ = "summary_cache"
+    __table_args__ = (
+        UniqueConstraint(
+            "model",
+            "input_hash",
+            name="uq_summary_cache_model_input_hash",
+        ),
+    )
+
+    model = Column(String, nullable=False)
+    input_hash = Column(String(64), nullable=False)
+    summary = Column(Text, nullable=False)
+
+
+class SearchSpaceIndexWrite(Base):
+    """
+    One row per statement that wrote documents or chunks of a search space.
+
+    The index generation triggers append these rows instead of updating the
+    searchspaces row, so concurrent indexers never wait on a row lock. A space's
+    index generation is its index_generation plus its number of rows here; the
+    compact_index_writes beat task folds the rows into index_generation.
+    """
+
+    __tablename__ = "search_space_index_writes"
+
+    id = Column(BigInteger, primary_key=True)
+    # No foreign key: the rows must not lock the search space row, and the
+    # triggers also fire while a search space delete cascades to its documents
+    search_space_id = Column(Integer, nullable=False, index=True)
+
 
 class Podcast(BaseModel, TimestampMixin):
     __tablename__ = "podcasts"
@@ -229,6 +371,15 @@ class SearchSpace(BaseModel, TimestampMixin):
     qna_custom_instructions = Column(
         Text, nullable=True, default=""
     )  # User's custom instructions
+    text_search_config = Column(
+        String(64), nullable=False, default="english", server_default="english"
+    )  # PostgreSQL text search configuration used for keyword search
+    index_generation = Column(
+        BigInteger, nullable=False, default=0, server_default="0"
+    )  # Writes folded in from search_space_index_writes (see SearchSpaceIndexWrite)
+    llm_config_version = Column(
+        BigInteger, nullable=False, default=0, server_default="0"
+    )  # Bumped by triggers on every change to this space's LLM configs or preferences
     user_id = Column(
         UUID(as_uuid=True), ForeignKey("user.id", ondelete="CASCADE"), nullable=False
     )
@@ -434,34 +585,233 @@ async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
 async def setup_indexes():
     async with engine.begin() as conn:
         # Create indexes
+        # HNSW indexes for the configured vector storage mode (full, halfvec or
+        # binary): the documents index and the per-document-type partial chunk
+        # indexes
+        for _, statement in vector_index_statements(
+            get_vector_storage_mode(),
+            config.embedding_dimension,
+            [document_type.value for document_type in DocumentType],
+        ):
+            await conn.execute(text(statement))
         # Document Summary Indexes
         await conn.execute(
             text(
-                "CREATE INDEX IF NOT EXISTS document_vector_index ON documents USING hnsw (embedding public.vector_cosine_ops)"
+                "CREATE INDEX IF NOT EXISTS document_search_vector_index ON documents USING gin (search_vector)"
             )
         )
+        # Document Chuck Indexes
         await conn.execute(
             text(
-                "CREATE INDEX IF NOT EXISTS document_search_index ON documents USING gin (to_tsvector('english', content))"
+                "CREATE INDEX IF NOT EXISTS chucks_search_vector_index ON chunks USING gin (search_vector)"
             )
         )
-        # Document Chuck Indexes
         await conn.execute(
             text(
-                "CREATE INDEX IF NOT EXISTS chucks_vector_index ON chunks USING hnsw (embedding public.vector_cosine_ops)"
+                "CREATE INDEX IF NOT EXISTS chunks_search_space_document_type_index ON chunks (search_space_id, document_type)"
             )
         )
         await conn.execute(
             text(
-                "CREATE INDEX IF NOT EXISTS chucks_search_index ON chunks USING gin (to_tsvector('english', content))"
+                "CREATE INDEX IF NOT EXISTS chunks_document_position_index ON chunks (document_id, position)"
             )
         )
 
 
+# Keep documents.search_vector and chunks.search_vector in sync with content and
+# with the owning search space's text_search_config. Mirrored in migration 38.
+# A change of text_search_config itself is applied to existing rows by the
+# retokenize_search_space Celery task (see migration 49).
+SEARCH_VECTOR_TRIGGER_STATEMENTS = [
+    """
+    CREATE OR REPLACE FUNCTION documents_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := to_tsvector(
+            COALESCE(
+                (SELECT text_search_config FROM searchspaces WHERE id = NEW.search_space_id),
+                'english'
+            )::regconfig,
+            NEW.content
+        );
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE TRIGGER documents_search_vector
+    BEFORE INSERT OR UPDATE OF content, search_space_id ON documents
+    FOR EACH ROW EXECUTE FUNCTION documents_search_vector_update()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION chunks_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := to_tsvector(
+            COALESCE(
+                (
+                    SELECT s.text_search_config
+                    FROM documents d JOIN searchspaces s ON s.id = d.search_space_id
+                    WHERE d.id = NEW.document_id
+                ),
+                'english'
+            )::regconfig,
+            NEW.content
+        );
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE TRIGGER chunks_search_vector
+    BEFORE INSERT OR UPDATE OF content, document_id ON chunks
+    FOR EACH ROW EXECUTE FUNCTION chunks_search_vector_update()
+    """,
+]
+
+
+# Keep chunks.search_space_id and chunks.document_type equal to the parent
+# document's values. Mirrored in migration 39.
+CHUNK_DOCUMENT_FIELDS_TRIGGER_STATEMENTS = [
+    """
+    CREATE OR REPLACE FUNCTION chunks_document_fields_update() RETURNS trigger AS $$
+    BEGIN
+        SELECT d.search_space_id, d.document_type
+        INTO NEW.search_space_id, NEW.document_type
+        FROM documents d
+        WHERE d.id = NEW.document_id;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE TRIGGER chunks_document_fields
+    BEFORE INSERT OR UPDATE OF document_id, search_space_id, document_type ON chunks
+    FOR EACH ROW EXECUTE FUNCTION chunks_document_fields_update()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION documents_chunk_fields_update() RETURNS trigger AS $$
+    BEGIN
+        UPDATE chunks
+        SET search_space_id = NEW.search_space_id, document_type = NEW.document_type
+        WHERE document_id = NEW.id;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE TRIGGER documents_chunk_fields
+    AFTER UPDATE OF search_space_id, document_type ON documents
+    FOR EACH ROW
+    WHEN (
+        OLD.search_space_id IS DISTINCT FROM NEW.search_space_id
+        OR OLD.document_type IS DISTINCT FROM NEW.document_type
+    )
+    EXECUTE FUNCTION documents_chunk_fields_update()
+    """,
+]
+
+
+# Record one search_space_index_writes row per statement that writes documents
+# or chunks of a space, so search result caches keyed on the index generation
+# never go stale. Appending rows takes no lock on the searchspaces row, which
+# an UPDATE would hold until the writer commits. Mirrored in migration 46.
+INDEX_GENERATION_TRIGGER_STATEMENTS = [
+    """
+    CREATE OR REPLACE FUNCTION searchspaces_index_generation_bump() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO search_space_index_writes (search_space_id)
+            SELECT DISTINCT search_space_id FROM new_rows;
+        ELSIF TG_OP = 'DELETE' THEN
+            INSERT INTO search_space_index_writes (search_space_id)
+            SELECT DISTINCT search_space_id FROM old_rows;
+        ELSE
+            INSERT INTO search_space_index_writes (search_space_id)
+            SELECT search_space_id FROM new_rows
+            UNION
+            SELECT search_space_id FROM old_rows;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    *(
+        f"""
+    CREATE OR REPLACE TRIGGER {table}_index_generation_{event.lower()}
+    AFTER {event} ON {table}
+    REFERENCING {transition_tables}
+    FOR EACH STATEMENT EXECUTE FUNCTION searchspaces_index_generation_bump()
+    """
+        for table in ("documents", "chunks")
+        for event, transition_tables in (
+            ("INSERT", "NEW TABLE AS new_rows"),
+            ("UPDATE", "OLD TABLE AS old_rows NEW TABLE AS new_rows"),
+            ("DELETE", "OLD TABLE AS old_rows"),
+        )
+    ),
+]
+
+
+# Bump searchspaces.llm_config_version once per statement that writes LLM
+# configs or LLM preferences of the space. Every process keys its cached LLM
+# instances on the version, so a changed, deleted or re-keyed config is never
+# served from a cache. These writes are rare user actions, so the short row
+# lock they take on the search space does not contend with indexing.
+# Mirrored in migration 47.
+LLM_CONFIG_VERSION_TRIGGER_STATEMENTS = [
+    """
+    CREATE OR REPLACE FUNCTION searchspaces_llm_config_version_bump() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            UPDATE searchspaces SET llm_config_version = llm_config_version + 1
+            WHERE id IN (SELECT search_space_id FROM new_rows);
+        ELSIF TG_OP = 'DELETE' THEN
+            UPDATE searchspaces SET llm_config_version = llm_config_version + 1
+            WHERE id IN (SELECT search_space_id FROM old_rows);
+        ELSE
+            UPDATE searchspaces SET llm_config_version = llm_config_version + 1
+            WHERE id IN (
+                SELECT search_space_id FROM new_rows
+                UNION
+                SELECT search_space_id FROM old_rows
+            );
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    *(
+        f"""
+    CREATE OR REPLACE TRIGGER {table}_llm_config_version_{event.lower()}
+    AFTER {event} ON {table}
+    REFERENCING {transition_tables}
+    FOR EACH STATEMENT EXECUTE FUNCTION searchspaces_llm_config_version_bump()
+    """
+        for table in ("llm_configs", "user_search_space_preferences")
+        for event, transition_tables in (
+            ("INSERT", "NEW TABLE AS new_rows"),
+            ("UPDATE", "OLD TABLE AS old_rows NEW TABLE AS new_rows"),
+            ("DELETE", "OLD TABLE AS old_rows"),
+        )
+    ),
+]
+
+
+async def setup_triggers():
+    async with engine.begin() as conn:
+        for statement in (
+            SEARCH_VECTOR_TRIGGER_STATEMENTS
+            + CHUNK_DOCUMENT_FIELDS_TRIGGER_STATEMENTS
+            + INDEX_GENERATION_TRIGGER_STATEMENTS
+            + LLM_CONFIG_VERSION_TRIGGER_STATEMENTS
+        ):
+            await conn.execute(text(statement))
+
+
 async def create_db_and_tables():
     async with engine.begin() as conn:
         await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
         await conn.run_sync(Base.metadata.create_all)
+    await setup_triggers()
     await setup_indexes()
 
 
@@ -8,12 +8,117 @@ class ChucksHybridSearchRetriever:
         """
         self.db_session = db_session
 
+    @staticmethod
+    def _text_search_config(search_space_id: int | None):
+        """
+        Build the text search configuration expression for keyword queries.
+
+        The configuration is read from the search space with a scalar subquery
+        that is evaluated once per statement, so the GIN index on search_vector
+        stays usable.
+
+        Args:
+            search_space_id: Optional search space ID whose configuration to use
+
+        Returns:
+            SQL expression of type regconfig
+        """
+        from sqlalchemy import cast, literal, select
+        from sqlalchemy.dialects.postgresql import REGCONFIG
+
+        from app.db import SearchSpace
+
+        if search_space_id is None:
+            return cast(literal("english"), REGCONFIG)
+
+        return cast(
+            select(SearchSpace.text_search_config)
+            .where(SearchSpace.id == search_space_id)
+            .correlate(None)
+            .scalar_subquery(),
+            REGCONFIG,
+        )
+
+    @staticmethod
+    def _chunk_filter_conditions(
+        user_id: str,
+        search_space_id: int | None = None,
+        document_type=None,
+    ) -> list:
+        """
+        Build chunk filter conditions on the denormalized chunk columns.
+
+        Chunks carry search_space_id and document_type (kept in sync with the
+        parent document by triggers), so filtering needs no join to documents.
+        The document type is rendered inline rather than as a bind parameter so
+        the partial HNSW index for that type still matches under cached plans.
+
+        Args:
+            user_id: The ID of the user whose search spaces may be searched
+            search_space_id: Optional search space ID to filter results
+            document_type: Optional DocumentType to filter results
+
+        Returns:
+            List of SQLAlchemy conditions
+        """
+        from sqlalchemy import bindparam, select
+
+        from app.db import Chunk, SearchSpace
+
+        conditions = [
+            Chunk.search_space_id.in_(
+                select(SearchSpace.id).where(SearchSpace.user_id == user_id)
+            )
+        ]
+
+        if search_space_id is not None:
+            conditions.append(Chunk.search_space_id == search_space_id)
+
+        if document_type is not None:
+            conditions.append(
+                Chunk.document_type
+                == bindparam(
+                    None,
+                    document_type,
+                    type_=Chunk.document_type.type,
+                    literal_execute=True,
+                )
+            )
+
+        return conditions
+
+    @staticmethod
+    def _result_columns() -> list:
+        """
+        Columns selected for chunk results.
+
+        Only what _serialize_chunk needs is projected, so the parent document's
+        full content and embedding are never transferred or loaded into ORM
+        objects. Queries using these columns must join Document on
+        Chunk.document_id.
+
+        Returns:
+            List of labelled SQLAlchemy columns
+        """
+        from app.db import Chunk, Document
+
+        return [
+            Chunk.id.label("chunk_id"),
+            Chunk.content,
+            Chunk.token_counts,
+            Document.id.label("document_id"),
+            Document.title,
+            Document.document_type,
+            Document.document_metadata,
+        ]
+
     async def vector_search(
         self,
         query_text: str,
         top_k: int,
         user_id: str,
         search_space_id: int | None = None,
+        document_type: str | None = None,
     ) -> list:
         """
         Perform vector similarity search on chunks.
@@ -23,6 +128,7 @@ class ChucksHybridSearchRetriever:
             top_k: Number of results to return
             user_id: The ID of the user performing the search
             search_space_id: Optional search space ID to filter results
+            document_type: Optional document type to filter results (e.g., "FILE")
 
         Returns:
             List of chunks sorted by vector similarity
@@ -30,32 +136,35 @@ class ChucksHybridSearchRetriever:
         from sqlalchemy import select
         from sqlalchemy.orm import joinedload
 
-        from app.config import config
-        from app.db import Chunk, Document, SearchSpace
+        from app.db import Chunk, Document
+        from app.retriver.vector_search_settings import (
+            apply_vector_search_settings,
+            candidate_fill_stats,
+        )
+        from app.services.embedding_service import embed_query
 
-        # Get embedding for the query
-        embedding_model = config.embedding_model_instance
-        query_embedding = embedding_model.embed(query_text)
+        # Get embedding for the query (shared cache across retrievers/connectors)
+        query_embedding = await embed_query(query_text)
 
-        # Build the base query with user ownership check
+        # Build the base query with user ownership and search space filters
         query = (
             select(Chunk)
             .options(joinedload(Chunk.document).joinedload(Document.search_space))
-            .join(Document, Chunk.document_id == Document.id)
-            .join(SearchSpace, Document.search_space_id == SearchSpace.id)
-            .where(SearchSpace.user_id == user_id)
+            .where(
+                *self._chunk_filter_conditions(user_id, search_space_id, document_type)
+            )
         )
 
-        # Add search space filter if provided
-        if search_space_id is not None:
-            query = query.where(Document.search_space_id == search_space_id)
-
         # Add vector similarity ordering
         query = query.order_by(Chunk.embedding.op("<=>")(query_embedding)).limit(top_k)
 
+        # Tune the HNSW scan for this request
+        search_settings = await apply_vector_search_settings(self.db_session, top_k)
+
         # Execute the query
         result = await self.db_session.execute(query)
         chunks = result.scalars().all()
+        candidate_fill_stats.record(search_settings, top_k, len(chunks))
 
         return chunks
 
@@ -65,6 +174,7 @@ class ChucksHybridSearchRetriever:
         top_k: int,
         user_id: str,
         search_space_id: int | None = None,
+        document_type: str | None = None,
     ) -> list:
         """
         Perform full-text keyword search on chunks.
@@ -74,6 +184,7 @@ class ChucksHybridSearchRetriever:
             top_k: Number of results to return
             user_id: The ID of the user performing the search
             search_space_id: Optional search space ID to filter results
+            document_type: Optional document type to filter results (e.g., "FILE")
 
         Returns:
             List of chunks sorted by text relevance
@@ -81,28 +192,26 @@ class ChucksHybridSearchRetriever:
         from sqlalchemy import func, select
         from sqlalchemy.orm import joinedload
 
-        from app.db import Chunk, Document, SearchSpace
+        from app.db import Chunk, Document
 
-        # Create tsvector and tsquery for PostgreSQL full-text search
-        tsvector = func.to_tsvector("english", Chunk.content)
-        tsquery = func.plainto_tsquery("english", query_text)
+        # Use the stored tsvector and the search space's text search configuration
+        tsvector = Chunk.search_vector
+        tsquery = func.plainto_tsquery(
+            self._text_search_config(search_space_id), query_text
+        )
 
-        # Build the base query with user ownership check
+        # Build the base query with user ownership and search space filters
         query = (
             select(Chunk)
             .options(joinedload(Chunk.document).joinedload(Document.search_space))
-            .join(Document, Chunk.document_id == Document.id)
-            .join(SearchSpace, Document.search_space_id == SearchSpace.id)
-            .where(SearchSpace.user_id == user_id)
+            .where(
+                *self._chunk_filter_conditions(user_id, search_space_id, document_type)
+            )
             .where(
                 tsvector.op("@@")(tsquery)
             )  # Only include results that match the query
         )
 
-        # Add search space filter if provided
-        if search_space_id is not None:
-            query = query.where(Document.search_space_id == search_space_id)
-
         # Add text search ranking
         query = query.order_by(func.ts_rank_cd(tsvector, tsquery).desc()).limit(top_k)
 
@@ -119,6 +228,8 @@ class ChucksHybridSearchRetriever:
         user_id: str,
         search_space_id: int | None = None,
         document_type: str | None = None,
+        ef_search: int | None = None,
+        document_ids=None,
     ) -> list:
         """
         Combine vector similarity and full-text search results using Reciprocal Rank Fusion.
@@ -129,95 +240,110 @@ class ChucksHybridSearchRetriever:
             user_id: The ID of the user performing the search
             search_space_id: Optional search space ID to filter results
             document_type: Optional document type to filter results (e.g., "FILE", "CRAWLED_URL")
+            ef_search: Optional HNSW ef_search for this request (defaults to HNSW_EF_SEARCH)
+            document_ids: Optional document IDs (list or select() subquery) to restrict
+                the search to; the chunks are then ranked exactly instead of via HNSW
 
         Returns:
             List of dictionaries containing chunk data and relevance scores
         """
         from sqlalchemy import func, select, text
-        from sqlalchemy.orm import joinedload
 
-        from app.config import config
-        from app.db import Chunk, Document, DocumentType, SearchSpace
+        from app.db import Chunk, Document, DocumentType
+        from app.retriver.vector_search_settings import (
+            apply_vector_search_settings,
+            candidate_fill_stats,
+        )
+        from app.retriver.vector_storage import rank_by_embedding
+        from app.services.embedding_service import embed_query
 
-        # Get embedding for the query
-        embedding_model = config.embedding_model_instance
-        query_embedding = embedding_model.embed(query_text)
+        # Convert string to enum value if needed
+        if isinstance(document_type, str):
+            try:
+                document_type = DocumentType[document_type]
+            except KeyError:
+                # If the document type doesn't exist in the enum, return empty results
+                return []
+
+        # Get embedding for the query (shared cache across retrievers/connectors)
+        query_embedding = await embed_query(query_text)
 
         # Constants for RRF calculation
         k = 60  # Constant for RRF calculation
         n_results = top_k * 2  # Get more results for better fusion
 
-        # Create tsvector and tsquery for PostgreSQL full-text search
-        tsvector = func.to_tsvector("english", Chunk.content)
-        tsquery = func.plainto_tsquery("english", query_text)
-
-        # Base conditions for document filtering
-        base_conditions = [SearchSpace.user_id == user_id]
-
-        # Add search space filter if provided
-        if search_space_id is not None:
-            base_conditions.append(Document.search_space_id == search_space_id)
+        # Tune the HNSW scan for this request
+        search_settings = await apply_vector_search_settings(
+            self.db_session, n_results, ef_search
+        )
 
-        # Add document type filter if provided
-        if document_type is not None:
-            # Convert string to enum value if needed
-            if isinstance(document_type, str):
-                try:
-                    doc_type_enum = DocumentType[document_type]
-                    base_conditions.append(Document.document_type == doc_type_enum)
-                except KeyError:
-                    # If the document type doesn't exist in the enum, return empty results
-                    return []
-            else:
-                base_conditions.append(Document.document_type == document_type)
-
-        # CTE for semantic search with user ownership check
-        semantic_search_cte = (
-            select(
-                Chunk.id,
-                func.rank()
-                .over(order_by=Chunk.embedding.op("<=>")(query_embedding))
-                .label("rank"),
-            )
-            .join(Document, Chunk.document_id == Document.id)
-            .join(SearchSpace, Document.search_space_id == SearchSpace.id)
-            .where(*base_conditions)
+        # Use the stored tsvector and the search space's text search configuration
+        tsvector = Chunk.search_vector
+        tsquery = func.plainto_tsquery(
+            self._text_search_config(search_space_id), query_text
         )
 
-        semantic_search_cte = (
-            semantic_search_cte.order_by(Chunk.embedding.op("<=>")(query_embedding))
-            .limit(n_results)
-            .cte("semantic_search")
+        # Filter on the denormalized chunk columns (no join to documents)
+        base_conditions = self._chunk_filter_conditions(
+            user_id, search_space_id, document_type
         )
 
-        # CTE for keyword search with user ownership check
-        keyword_search_cte = (
-            select(
-                Chunk.id,
-                func.rank()
-                .over(order_by=func.ts_rank_cd(tsvector, tsquery).desc())
-                .label("rank"),
-            )
-            .join(Document, Chunk.document_id == Document.id)
-            .join(SearchSpace, Document.search_space_id == SearchSpace.id)
+        # Restrict to a document shortlist if provided (hierarchical retrieval)
+        if document_ids is not None:
+            base_conditions.append(Chunk.document_id.in_(document_ids))
+
+        # Semantic candidates: ORDER BY distance + LIMIT with no window function
+        # so the planner can walk the HNSW index and stop after n_results rows
+        # (rescored at full precision when the index is compressed).
+        semantic_candidates = rank_by_embedding(
+            select(Chunk.id).where(*base_conditions),
+            Chunk.embedding,
+            query_embedding,
+            n_results,
+            use_index=document_ids is None,
+        ).subquery("semantic_candidates")
+
+        # Ranks are assigned over the shortlist only
+        semantic_search_cte = select(
+            semantic_candidates.c.id,
+            func.rank().over(order_by=semantic_candidates.c.distance).label("rank"),
+        ).cte("semantic_search")
+
+        # Keyword candidates: GIN index match, then top n_results by ts_rank_cd
+        keyword_score = func.ts_rank_cd(tsvector, tsquery)
+        keyword_candidates = (
+            select(Chunk.id, keyword_score.label("ts_rank"))
             .where(*base_conditions)
             .where(tsvector.op("@@")(tsquery))
+            .order_by(keyword_score.desc())
+            .limit(n_results)
+            .subquery("keyword_candidates")
         )
 
-        keyword_search_cte = (
-            keyword_search_cte.order_by(func.ts_rank_cd(tsvector, tsquery).desc())
-            .limit(n_results)
-            .cte("keyword_search")
+        keyword_search_cte = select(
+            keyword_candidates.c.id,
+            func.rank()
+            .over(order_by=keyword_candidates.c.ts_rank.desc())
+            .label("rank"),
+        ).cte("keyword_search")
+
+        # Number of semantic candidates the HNSW scan produced (for scan metrics)
+        semantic_candidate_count = (
+            select(func.count())
+            .select_from(semantic_search_cte)
+            .scalar_subquery()
+            .label("semantic_candidate_count")
         )
 
         # Final combined query using a FULL OUTER JOIN with RRF scoring
         final_query = (
             select(
-                Chunk,
+                *self._result_columns(),
                 (
                     func.coalesce(1.0 / (k + semantic_search_cte.c.rank), 0.0)
                     + func.coalesce(1.0 / (k + keyword_search_cte.c.rank), 0.0)
                 ).label("score"),
+                semantic_candidate_count,
             )
             .select_from(
                 semantic_search_cte.outerjoin(
@@ -231,36 +357,537 @@ class ChucksHybridSearchRetriever:
                 Chunk.id
                 == func.coalesce(semantic_search_cte.c.id, keyword_search_cte.c.id),
             )
-            .options(joinedload(Chunk.document))
+            .join(Document, Document.id == Chunk.document_id)
             .order_by(text("score DESC"))
             .limit(top_k)
         )
 
         # Execute the query
         result = await self.db_session.execute(final_query)
-        chunks_with_scores = result.all()
+        rows = result.all()
+        candidate_fill_stats.record(
+            search_settings, n_results, rows[0].semantic_candidate_count if rows else 0
+        )
 
         # If no results were found, return an empty list
-        if not chunks_with_scores:
+        if not rows:
             return []
 
         # Convert to serializable dictionaries if no reranker is available or if reranking failed
-        serialized_results = []
-        for chunk, score in chunks_with_scores:
-            serialized_results.append(
-                {
-                    "chunk_id": chunk.id,
-                    "content": chunk.content,
-                    "score": float(score),  # Ensure score is a Python float
-                    "document": {
-                        "id": chunk.document.id,
-                        "title": chunk.document.title,
-                        "document_type": chunk.document.document_type.value
-                        if hasattr(chunk.document, "document_type")
-                        else None,
-                        "metadata": chunk.document.document_metadata,
-                    },
-                }
+        return [self._serialize_chunk(row) for row in rows]
+
+    async def hierarchical_search(
+        self,
+        query_text: str,
+        top_k: int,
+        user_id: str,
+        search_space_id: int | None = None,
+        document_type: str | None = None,
+        document_top_n: int | None = None,
+        ef_search: int | None = None,
+    ) -> list:
+        """
+        Two-tier retrieval: shortlist documents by summary embedding, then run
+        the chunk hybrid search over the chunks of those documents only.
+
+        Both tiers run in a single SQL statement, and the chunk tier's cost is
+        proportional to the shortlist rather than to the whole search space.
+
+        Args:
+            query_text: The search query text
+            top_k: Number of chunks to return
+            user_id: The ID of the user performing the search
+            search_space_id: Optional search space ID to filter results
+            document_type: Optional document type to filter results (e.g., "FILE", "CRAWLED_URL")
+            document_top_n: Number of documents to shortlist
+                (defaults to HIERARCHICAL_DOCUMENT_TOP_N, at least top_k)
+            ef_search: Optional HNSW ef_search for this request (defaults to HNSW_EF_SEARCH)
+
+        Returns:
+            List of dictionaries in the same format as hybrid_search
+        """
+        from sqlalchemy import select
+
+        from app.config import config
+        from app.db import DocumentType
+        from app.retriver.documents_hybrid_search import (
+            DocumentHybridSearchRetriever,
+        )
+        from app.services.embedding_service import embed_query
+
+        # Convert string to enum value if needed
+        if isinstance(document_type, str):
+            try:
+                document_type = DocumentType[document_type]
+            except KeyError:
+                # If the document type doesn't exist in the enum, return empty results
+                return []
+
+        document_top_n = max(
+            document_top_n or config.HIERARCHICAL_DOCUMENT_TOP_N, top_k
+        )
+        # The document tier's HNSW scan must be able to return document_top_n rows
+        ef_search = max(ef_search or config.HNSW_EF_SEARCH, document_top_n)
+
+        # A CTE so the shortlist is computed once for both the semantic and keyword scans
+        document_shortlist = DocumentHybridSearchRetriever.summary_shortlist_query(
+            await embed_query(query_text),
+            document_top_n,
+            user_id,
+            search_space_id,
+            document_type,
+        ).cte("document_shortlist_ids")
+
+        return await self.hybrid_search(
+            query_text=query_text,
+            top_k=top_k,
+            user_id=user_id,
+            search_space_id=search_space_id,
+            document_type=document_type,
+            ef_search=ef_search,
+            document_ids=select(document_shortlist.c.id),
+        )
+
+    async def hybrid_search_by_document_types(
+        self,
+        query_text: str,
+        top_k_by_type: dict[str, int],
+        user_id: str,
+        search_space_id: int | None = None,
+        ef_search: int | None = None,
+    ) -> dict[str, list]:
+        """
+        Run hybrid search for several document types in a single SQL statement.
+
+        Args:
+            query_text: The search query text
+            top_k_by_type: Number of results to return per document type
+                (e.g., {"FILE": 10, "SLACK_CONNECTOR": 10})
+            user_id: The ID of the user performing the search
+            search_space_id: Optional search space ID to filter results
+            ef_search: Optional HNSW ef_search for this request (defaults to HNSW_EF_SEARCH)
+
+        Returns:
+            Dictionary mapping each requested document type to a list of
+            dictionaries in the same format as hybrid_search
+        """
+        results_by_query = await self.hybrid_search_by_queries(
+            query_texts=[query_text],
+            top_k_by_type=top_k_by_type,
+            user_id=user_id,
+            search_space_id=search_space_id,
+            ef_search=ef_search,
+        )
+        return results_by_query[0]
+
+    async def hybrid_search_by_queries(
+        self,
+        query_texts: list[str],
+        top_k_by_type: dict[str, int],
+        user_id: str,
+        search_space_id: int | None = None,
+        ef_search: int | None = None,
+    ) -> list[dict[str, list]]:
+        """
+        Run hybrid search for several queries and document types in a single SQL statement.
+
+        The queries are embedded in one batch and passed as a VALUES list of
+        query vectors. Each document type gets its own index-friendly candidate
+        scan (ORDER BY ... LIMIT), run once per query through a LATERAL join.
+        Ranks, RRF scores and the per-type top_k cut are then computed with
+        window functions partitioned by query and document type, so every
+        question and local connector of a research turn is searched in one
+        database round trip.
+
+        Args:
+            query_texts: The search query texts
+            top_k_by_type: Number of results to return per document type
+                (e.g., {"FILE": 10, "SLACK_CONNECTOR": 10})
+            user_id: The ID of the user performing the search
+            search_space_id: Optional search space ID to filter results
+            ef_search: Optional HNSW ef_search for this request (defaults to HNSW_EF_SEARCH)
+
+        Returns:
+            One dictionary per query (in the order of query_texts) mapping each
+            requested document type to a list of dictionaries in the same
+            format as hybrid_search
+        """
+        from pgvector.sqlalchemy import Vector
+        from sqlalchemy import (
+            Integer,
+            Text,
+            and_,
+            cast,
+            column,
+            func,
+            literal,
+            select,
+            true,
+            union_all,
+            values,
+        )
+
+        from app.config import config
+        from app.db import Chunk, Document, DocumentType
+        from app.retriver.vector_search_settings import (
+            apply_vector_search_settings,
+            candidate_fill_stats,
+        )
+        from app.retriver.vector_storage import rank_by_embedding
+        from app.services.embedding_service import embed_queries
+
+        results_by_query = [
+            {document_type: [] for document_type in top_k_by_type} for _ in query_texts
+        ]
+
+        # Unknown document types simply return empty results
+        valid_top_k_by_type = {
+            document_type: top_k
+            for document_type, top_k in top_k_by_type.items()
+            if document_type in DocumentType.__members__ and top_k > 0
+        }
+        if not valid_top_k_by_type or not query_texts:
+            return results_by_query
+
+        # Embed all queries in one batch (shared cache across retrievers/connectors)
+        query_embeddings = await embed_queries(query_texts)
+
+        # Tune the HNSW scan for the largest per-type candidate list
+        candidates_requested = len(query_texts) * sum(
+            top_k * 2 for top_k in valid_top_k_by_type.values()
+        )
+        search_settings = await apply_vector_search_settings(
+            self.db_session, max(valid_top_k_by_type.values()) * 2, ef_search
+        )
+
+        # Constant for RRF calculation
+        k = 60
+
+        # One row per query; the vector is cast explicitly since VALUES
+        # parameters are otherwise typed as text
+        dimension = config.embedding_dimension
+        query_values = values(
+            column("query_index", Integer),
+            column("query_text", Text),
+            column("embedding", Vector(dimension)),
+            name="query_values",
+        ).data(
+            [
+                (query_index, query_text, query_embedding)
+                for query_index, (query_text, query_embedding) in enumerate(
+                    zip(query_texts, query_embeddings, strict=True)
+                )
+            ]
+        )
+        queries = select(
+            query_values.c.query_index,
+            query_values.c.query_text,
+            cast(query_values.c.embedding, Vector(dimension)).label("embedding"),
+        ).cte("queries")
+
+        # Use the stored tsvector and the search space's text search configuration
+        tsvector = Chunk.search_vector
+        tsquery = func.plainto_tsquery(
+            self._text_search_config(search_space_id), queries.c.query_text
+        )
+        keyword_score = func.ts_rank_cd(tsvector, tsquery)
+
+        # One limited candidate scan per document type and query for each search method
+        semantic_branches = []
+        keyword_branches = []
+        for document_type, top_k in valid_top_k_by_type.items():
+            n_results = top_k * 2  # Get more results for better fusion
+            # Filter on the denormalized chunk columns (no join to documents)
+            type_conditions = self._chunk_filter_conditions(
+                user_id, search_space_id, DocumentType[document_type]
+            )
+
+            semantic_branch = rank_by_embedding(
+                select(Chunk.id).where(*type_conditions),
+                Chunk.embedding,
+                queries.c.embedding,
+                n_results,
+            ).lateral()
+            semantic_branches.append(
+                select(
+                    queries.c.query_index,
+                    literal(document_type).label("document_type"),
+                    literal(top_k).label("top_k"),
+                    semantic_branch.c.id,
+                    semantic_branch.c.distance,
+                ).select_from(queries.join(semantic_branch, true()))
+            )
+
+            keyword_branch = (
+                select(Chunk.id, keyword_score.label("ts_rank"))
+                .where(*type_conditions)
+                .where(tsvector.op("@@")(tsquery))
+                .order_by(keyword_score.desc())
+                .limit(n_results)
+                .lateral()
+            )
+            keyword_branches.append(
+                select(
+                    queries.c.query_index,
+                    literal(document_type).label("document_type"),
+                    literal(top_k).label("top_k"),
+                    keyword_branch.c.id,
+                    keyword_branch.c.ts_rank,
+                ).select_from(queries.join(keyword_branch, true()))
+            )
+
+        semantic_candidates = union_all(*semantic_branches).subquery(
+            "semantic_candidates"
+        )
+        semantic_search_cte = select(
+            semantic_candidates.c.id,
+            semantic_candidates.c.query_index,
+            semantic_candidates.c.document_type,
+            semantic_candidates.c.top_k,
+            func.rank()
+            .over(
+                partition_by=(
+                    semantic_candidates.c.query_index,
+                    semantic_candidates.c.document_type,
+                ),
+                order_by=semantic_candidates.c.distance,
+            )
+            .label("rank"),
+        ).cte("semantic_search")
+
+        keyword_candidates = union_all(*keyword_branches).subquery("keyword_candidates")
+        keyword_search_cte = select(
+            keyword_candidates.c.id,
+            keyword_candidates.c.query_index,
+            keyword_candidates.c.document_type,
+            keyword_candidates.c.top_k,
+            func.rank()
+            .over(
+                partition_by=(
+                    keyword_candidates.c.query_index,
+                    keyword_candidates.c.document_type,
+                ),
+                order_by=keyword_candidates.c.ts_rank.desc(),
+            )
+            .label("rank"),
+        ).cte("keyword_search")
+
+        # RRF scores per query and chunk, then the per-type top_k cut
+        fused = (
+            select(
+                func.coalesce(semantic_search_cte.c.id, keyword_search_cte.c.id).label(
+                    "id"
+                ),
+                func.coalesce(
+                    semantic_search_cte.c.query_index,
+                    keyword_search_cte.c.query_index,
+                ).label("query_index"),
+                func.coalesce(
+                    semantic_search_cte.c.document_type,
+                    keyword_search_cte.c.document_type,
+                ).label("document_type"),
+                func.coalesce(
+                    semantic_search_cte.c.top_k, keyword_search_cte.c.top_k
+                ).label("top_k"),
+                (
+                    func.coalesce(1.0 / (k + semantic_search_cte.c.rank), 0.0)
+                    + func.coalesce(1.0 / (k + keyword_search_cte.c.rank), 0.0)
+                ).label("score"),
+            )
+            .select_from(
+                semantic_search_cte.outerjoin(
+                    keyword_search_cte,
+                    and_(
+                        semantic_search_cte.c.id == keyword_search_cte.c.id,
+                        semantic_search_cte.c.query_index
+                        == keyword_search_cte.c.query_index,
+                        semantic_search_cte.c.document_type
+                        == keyword_search_cte.c.document_type,
+                    ),
+                    full=True,
+                )
+            )
+            .subquery("fused")
+        )
+
+        ranked = select(
+            fused,
+            func.row_number()
+            .over(
+                partition_by=(fused.c.query_index, fused.c.document_type),
+                order_by=fused.c.score.desc(),
+            )
+            .label("type_rank"),
+        ).cte("ranked")
+
+        # Number of semantic candidates the HNSW scans produced (for scan metrics)
+        semantic_candidate_count = (
+            select(func.count())
+            .select_from(semantic_search_cte)
+            .scalar_subquery()
+            .label("semantic_candidate_count")
+        )
+
+        final_query = (
+            select(
+                *self._result_columns(),
+                ranked.c.score,
+                ranked.c.query_index,
+                ranked.c.document_type.label("result_type"),
+                semantic_candidate_count,
+            )
+            .join(Chunk, Chunk.id == ranked.c.id)
+            .join(Document, Document.id == Chunk.document_id)
+            .where(ranked.c.type_rank <= ranked.c.top_k)
+            .order_by(ranked.c.query_index, ranked.c.document_type, ranked.c.type_rank)
+        )
+
+        # Execute the query
+        result = await self.db_session.execute(final_query)
+        rows = result.all()
+        candidate_fill_stats.record(
+            search_settings,
+            candidates_requested,
+            rows[0].semantic_candidate_count if rows else 0,
+        )
+
+        for row in rows:
+            results_by_query[row.query_index][row.result_type].append(
+                self._serialize_chunk(row)
             )
 
-        return serialized_results
+        return results_by_query
+
+    async def expand_with_neighbors(self, results: list[dict], window: int) -> list:
+        """
+        Expand each chunk result to its neighboring chunks in the same document.
+
+        The content of every hit is replaced by the window chunks before it,
+        the hit itself and the window chunks after it in its document, joined
+        in document order. Positions are sparse, so the neighbors are found by
+        position order rather than by position arithmetic. All hits are
+        expanded in one query served by the (document_id, position) index.
+        Hits without a stored position are left unchanged. Scores and ordering
+        are not affected.
+
+        Args:
+            results: Results in the format returned by hybrid_search (modified in place)
+            window: Number of neighboring chunks to include on each side
+
+        Returns:
+            The same list, with "content" expanded, "context_chunk_ids"
+            listing the chunks each expanded result was built from and
+            "token_counts" summed over them
+        """
+        from sqlalchemy import select, true, union_all
+        from sqlalchemy.orm import aliased
+
+        from app.db import Chunk
+
+        chunk_ids = sorted({result["chunk_id"] for result in results})
+        if window <= 0 or not chunk_ids:
+            return results
+
+        hits = (
+            select(Chunk.id, Chunk.document_id, Chunk.position)
+            .where(Chunk.id.in_(chunk_ids), Chunk.position.is_not(None))
+            .subquery("hits")
+        )
+        neighbor = aliased(Chunk, name="neighbor")
+        neighbor_columns = (
+            neighbor.id.label("chunk_id"),
+            neighbor.content,
+            neighbor.token_counts,
+            neighbor.position,
+        )
+        # The window chunks before each hit, and the hit plus the window
+        # chunks after it, each an index range scan limited to its rows
+        before = (
+            select(*neighbor_columns)
+            .where(
+                neighbor.document_id == hits.c.document_id,
+                neighbor.position < hits.c.position,
+            )
+            .order_by(neighbor.position.desc())
+            .limit(window)
+            .lateral("before")
+        )
+        after = (
+            select(*neighbor_columns)
+            .where(
+                neighbor.document_id == hits.c.document_id,
+                neighbor.position >= hits.c.position,
+            )
+            .order_by(neighbor.position)
+            .limit(window + 1)
+            .lateral("after")
+        )
+        neighbors = union_all(
+            *(
+                select(
+                    hits.c.id.label("hit_id"),
+                    side.c.chunk_id,
+                    side.c.content,
+                    side.c.token_counts,
+                    side.c.position,
+                ).select_from(hits.join(side, true()))
+                for side in (before, after)
+            )
+        ).subquery("neighbors")
+        query = select(
+            neighbors.c.hit_id,
+            neighbors.c.chunk_id,
+            neighbors.c.content,
+            neighbors.c.token_counts,
+        ).order_by(neighbors.c.hit_id, neighbors.c.position)
+
+        result = await self.db_session.execute(query)
+        windows: dict[int, list] = {}
+        for row in result.all():
+            windows.setdefault(row.hit_id, []).append(row)
+
+        for hit in results:
+            rows = windows.get(hit["chunk_id"])
+            if rows:
+                hit["content"] = "\n\n".join(row.content for row in rows)
+                hit["context_chunk_ids"] = [row.chunk_id for row in rows]
+                hit["token_counts"] = _sum_token_counts(
+                    [row.token_counts for row in rows]
+                )
+
+        return results
+
+    @staticmethod
+    def _serialize_chunk(row) -> dict:
+        """Convert a row of _result_columns plus score into the retriever result format."""
+        return {
+            "chunk_id": row.chunk_id,
+            "content": row.content,
+            "token_counts": row.token_counts,
+            "score": float(row.score),  # Ensure score is a Python float
+            "document": {
+                "id": row.document_id,
+                "title": row.title,
+                "document_type": row.document_type.value
+                if row.document_type is not None
+                else None,
+                "metadata": row.document_metadata,
+            },
+        }
+
+
+def _sum_token_counts(token_counts: list[dict | None]) -> dict | None:
+    """
+    Sum per-family token counts of joined chunks.
+
+    Only families counted for every chunk are kept, with one extra token per
+    separator between chunks. Returns None if any chunk has no counts.
+    """
+    if not token_counts or any(counts is None for counts in token_counts):
+        return None
+    families = set(token_counts[0]).intersection(*token_counts[1:])
+    separators = len(token_counts) - 1
+    return {
+        family: sum(counts[family] for counts in token_counts) + separators
+        for family in families
+    }
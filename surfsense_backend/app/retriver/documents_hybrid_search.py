@@ -8,12 +8,109 @@ class DocumentHybridSearchRetriever:
         """
         self.db_session = db_session
 
+    @staticmethod
+    def _text_search_config(search_space_id: int | None):
+        """
+        Build the text search configuration expression for keyword queries.
+
+        The configuration is read from the search space with a scalar subquery
+        that is evaluated once per statement, so the GIN index on search_vector
+        stays usable.
+
+        Args:
+            search_space_id: Optional search space ID whose configuration to use
+
+        Returns:
+            SQL expression of type regconfig
+        """
+        from sqlalchemy import cast, literal, select
+        from sqlalchemy.dialects.postgresql import REGCONFIG
+
+        from app.db import SearchSpace
+
+        if search_space_id is None:
+            return cast(literal("english"), REGCONFIG)
+
+        return cast(
+            select(SearchSpace.text_search_config)
+            .where(SearchSpace.id == search_space_id)
+            .correlate(None)
+            .scalar_subquery(),
+            REGCONFIG,
+        )
+
+    @staticmethod
+    def _result_columns() -> list:
+        """
+        Columns selected for document results.
+
+        Document content is left out: results are expanded into chunks, and the
+        content is only loaded for the rare document without chunks.
+
+        Returns:
+            List of SQLAlchemy columns
+        """
+        from app.db import Document
+
+        return [
+            Document.id,
+            Document.title,
+            Document.document_type,
+            Document.document_metadata,
+            Document.search_space_id,
+        ]
+
+    @staticmethod
+    def summary_shortlist_query(
+        query_embedding,
+        top_n: int,
+        user_id: str,
+        search_space_id: int | None = None,
+        document_type=None,
+    ):
+        """
+        Build a query for the IDs of the top_n documents by summary embedding.
+
+        This is the first tier of hierarchical retrieval; the chunk search is
+        then restricted to these documents.
+
+        Args:
+            query_embedding: The query embedding
+            top_n: Number of documents to shortlist
+            user_id: The ID of the user performing the search
+            search_space_id: Optional search space ID to filter results
+            document_type: Optional DocumentType to filter results
+
+        Returns:
+            select() of document IDs, usable as an IN (...) subquery
+        """
+        from sqlalchemy import select
+
+        from app.db import Document, SearchSpace
+        from app.retriver.vector_storage import rank_by_embedding
+
+        base_query = (
+            select(Document.id)
+            .join(SearchSpace, Document.search_space_id == SearchSpace.id)
+            .where(SearchSpace.user_id == user_id)
+        )
+        if search_space_id is not None:
+            base_query = base_query.where(Document.search_space_id == search_space_id)
+        if document_type is not None:
+            base_query = base_query.where(Document.document_type == document_type)
+
+        shortlist = rank_by_embedding(
+            base_query, Document.embedding, query_embedding, top_n
+        ).subquery("document_shortlist")
+        return select(shortlist.c.id)
+
     async def vector_search(
         self,
         query_text: str,
         top_k: int,
         user_id: str,
         search_space_id: int | None = None,
+        document_type: str | None = None,
     ) -> list:
         """
         Perform vector similarity search on documents.
@@ -23,6 +120,7 @@ class DocumentHybridSearchRetriever:
             top_k: Number of results to return
             user_id: The ID of the user performing the search
             search_space_id: Optional search space ID to filter results
+            document_type: Optional document type to filter results (e.g., "FILE")
 
         Returns:
             List of documents sorted by vector similarity
@@ -30,12 +128,15 @@ class DocumentHybridSearchRetriever:
         from sqlalchemy import select
         from sqlalchemy.orm import joinedload
 
-        from app.config import config
-        from app.db import Document, SearchSpace
+        from app.db import Document, DocumentType, SearchSpace
+        from app.retriver.vector_search_settings import (
+            apply_vector_search_settings,
+            candidate_fill_stats,
+        )
+        from app.services.embedding_service import embed_query
 
-        # Get embedding for the query
-        embedding_model = config.embedding_model_instance
-        query_embedding = embedding_model.embed(query_text)
+        # Get embedding for the query (shared cache across retrievers/connectors)
+        query_embedding = await embed_query(query_text)
 
         # Build the base query with user ownership check
         query = (
@@ -48,15 +149,21 @@ class DocumentHybridSearchRetriever:
         # Add search space filter if provided
         if search_space_id is not None:
             query = query.where(Document.search_space_id == search_space_id)
+        if document_type is not None:
+            query = query.where(Document.document_type == DocumentType[document_type])
 
         # Add vector similarity ordering
         query = query.order_by(Document.embedding.op("<=>")(query_embedding)).limit(
             top_k
         )
 
+        # Tune the HNSW scan for this request
+        search_settings = await apply_vector_search_settings(self.db_session, top_k)
+
         # Execute the query
         result = await self.db_session.execute(query)
         documents = result.scalars().all()
+        candidate_fill_stats.record(search_settings, top_k, len(documents))
 
         return documents
 
@@ -66,6 +173,7 @@ class DocumentHybridSearchRetriever:
         top_k: int,
         user_id: str,
         search_space_id: int | None = None,
+        document_type: str | None = None,
     ) -> list:
         """
         Perform full-text keyword search on documents.
@@ -75,6 +183,7 @@ class DocumentHybridSearchRetriever:
             top_k: Number of results to return
             user_id: The ID of the user performing the search
             search_space_id: Optional search space ID to filter results
+            document_type: Optional document type to filter results (e.g., "FILE")
 
         Returns:
             List of documents sorted by text relevance
@@ -82,11 +191,13 @@ class DocumentHybridSearchRetriever:
         from sqlalchemy import func, select
         from sqlalchemy.orm import joinedload
 
-        from app.db import Document, SearchSpace
+        from app.db import Document, DocumentType, SearchSpace
 
-        # Create tsvector and tsquery for PostgreSQL full-text search
-        tsvector = func.to_tsvector("english", Document.content)
-        tsquery = func.plainto_tsquery("english", query_text)
+        # Use the stored tsvector and the search space's text search configuration
+        tsvector = Document.search_vector
+        tsquery = func.plainto_tsquery(
+            self._text_search_config(search_space_id), query_text
+        )
 
         # Build the base query with user ownership check
         query = (
@@ -102,6 +213,8 @@ class DocumentHybridSearchRetriever:
         # Add search space filter if provided
         if search_space_id is not None:
             query = query.where(Document.search_space_id == search_space_id)
+        if document_type is not None:
+            query = query.where(Document.document_type == DocumentType[document_type])
 
         # Add text search ranking
         query = query.order_by(func.ts_rank_cd(tsvector, tsquery).desc()).limit(top_k)
@@ -119,6 +232,7 @@ class DocumentHybridSearchRetriever:
         user_id: str,
         search_space_id: int | None = None,
         document_type: str | None = None,
+        ef_search: int | None = None,
     ) -> list:
         """
         Combine vector similarity and full-text search results using Reciprocal Rank Fusion.
@@ -129,25 +243,36 @@ class DocumentHybridSearchRetriever:
             user_id: The ID of the user performing the search
             search_space_id: Optional search space ID to filter results
             document_type: Optional document type to filter results (e.g., "FILE", "CRAWLED_URL")
+            ef_search: Optional HNSW ef_search for this request (defaults to HNSW_EF_SEARCH)
 
         """
         from sqlalchemy import func, select, text
-        from sqlalchemy.orm import joinedload
 
-        from app.config import config
         from app.db import Document, DocumentType, SearchSpace
+        from app.retriver.vector_search_settings import (
+            apply_vector_search_settings,
+            candidate_fill_stats,
+        )
+        from app.retriver.vector_storage import rank_by_embedding
+        from app.services.embedding_service import embed_query
 
-        # Get embedding for the query
-        embedding_model = config.embedding_model_instance
-        query_embedding = embedding_model.embed(query_text)
+        # Get embedding for the query (shared cache across retrievers/connectors)
+        query_embedding = await embed_query(query_text)
 
         # Constants for RRF calculation
         k = 60  # Constant for RRF calculation
         n_results = top_k * 2  # Get more results for better fusion
 
-        # Create tsvector and tsquery for PostgreSQL full-text search
-        tsvector = func.to_tsvector("english", Document.content)
-        tsquery = func.plainto_tsquery("english", query_text)
+        # Tune the HNSW scan for this request
+        search_settings = await apply_vector_search_settings(
+            self.db_session, n_results, ef_search
+        )
+
+        # Use the stored tsvector and the search space's text search configuration
+        tsvector = Document.search_vector
+        tsquery = func.plainto_tsquery(
+            self._text_search_config(search_space_id), query_text
+        )
 
         # Base conditions for document filtering
         base_conditions = [SearchSpace.user_id == user_id]
@@ -169,51 +294,60 @@ class DocumentHybridSearchRetriever:
             else:
                 base_conditions.append(Document.document_type == document_type)
 
-        # CTE for semantic search with user ownership check
-        semantic_search_cte = (
-            select(
-                Document.id,
-                func.rank()
-                .over(order_by=Document.embedding.op("<=>")(query_embedding))
-                .label("rank"),
-            )
+        # Semantic candidates: ORDER BY distance + LIMIT with no window function
+        # so the planner can walk the HNSW index and stop after n_results rows
+        # (rescored at full precision when the index is compressed).
+        semantic_candidates = rank_by_embedding(
+            select(Document.id)
             .join(SearchSpace, Document.search_space_id == SearchSpace.id)
-            .where(*base_conditions)
-        )
-
-        semantic_search_cte = (
-            semantic_search_cte.order_by(Document.embedding.op("<=>")(query_embedding))
-            .limit(n_results)
-            .cte("semantic_search")
-        )
-
-        # CTE for keyword search with user ownership check
-        keyword_search_cte = (
-            select(
-                Document.id,
-                func.rank()
-                .over(order_by=func.ts_rank_cd(tsvector, tsquery).desc())
-                .label("rank"),
-            )
+            .where(*base_conditions),
+            Document.embedding,
+            query_embedding,
+            n_results,
+        ).subquery("semantic_candidates")
+
+        # Ranks are assigned over the shortlist only
+        semantic_search_cte = select(
+            semantic_candidates.c.id,
+            func.rank().over(order_by=semantic_candidates.c.distance).label("rank"),
+        ).cte("semantic_search")
+
+        # Keyword candidates: GIN index match, then top n_results by ts_rank_cd
+        keyword_score = func.ts_rank_cd(tsvector, tsquery)
+        keyword_candidates = (
+            select(Document.id, keyword_score.label("ts_rank"))
             .join(SearchSpace, Document.search_space_id == SearchSpace.id)
             .where(*base_conditions)
             .where(tsvector.op("@@")(tsquery))
+            .order_by(keyword_score.desc())
+            .limit(n_results)
+            .subquery("keyword_candidates")
         )
 
-        keyword_search_cte = (
-            keyword_search_cte.order_by(func.ts_rank_cd(tsvector, tsquery).desc())
-            .limit(n_results)
-            .cte("keyword_search")
+        keyword_search_cte = select(
+            keyword_candidates.c.id,
+            func.rank()
+            .over(order_by=keyword_candidates.c.ts_rank.desc())
+            .label("rank"),
+        ).cte("keyword_search")
+
+        # Number of semantic candidates the HNSW scan produced (for scan metrics)
+        semantic_candidate_count = (
+            select(func.count())
+            .select_from(semantic_search_cte)
+            .scalar_subquery()
+            .label("semantic_candidate_count")
         )
 
         # Final combined query using a FULL OUTER JOIN with RRF scoring
         final_query = (
             select(
-                Document,
+                *self._result_columns(),
                 (
                     func.coalesce(1.0 / (k + semantic_search_cte.c.rank), 0.0)
                     + func.coalesce(1.0 / (k + keyword_search_cte.c.rank), 0.0)
                 ).label("score"),
+                semantic_candidate_count,
             )
             .select_from(
                 semantic_search_cte.outerjoin(
@@ -227,41 +361,441 @@ class DocumentHybridSearchRetriever:
                 Document.id
                 == func.coalesce(semantic_search_cte.c.id, keyword_search_cte.c.id),
             )
-            .options(joinedload(Document.search_space))
             .order_by(text("score DESC"))
             .limit(top_k)
         )
 
         # Execute the query
         result = await self.db_session.execute(final_query)
-        documents_with_scores = result.all()
+        rows = result.all()
+        candidate_fill_stats.record(
+            search_settings, n_results, rows[0].semantic_candidate_count if rows else 0
+        )
+        documents_with_scores = [(row, row.score) for row in rows]
 
         # If no results were found, return an empty list
         if not documents_with_scores:
             return []
 
         # Convert to serializable dictionaries - return individual chunks
-        serialized_results = []
-        for document, score in documents_with_scores:
-            # Fetch associated chunks for this document
-            from sqlalchemy import select
+        return await self._serialize_documents_with_chunks(documents_with_scores)
+
+    async def hybrid_search_by_document_types(
+        self,
+        query_text: str,
+        top_k_by_type: dict[str, int],
+        user_id: str,
+        search_space_id: int | None = None,
+        ef_search: int | None = None,
+    ) -> dict[str, list]:
+        """
+        Run document hybrid search for several document types in a single SQL statement.
+
+        Args:
+            query_text: The search query text
+            top_k_by_type: Number of documents to return per document type
+            user_id: The ID of the user performing the search
+            search_space_id: Optional search space ID to filter results
+            ef_search: Optional HNSW ef_search for this request (defaults to HNSW_EF_SEARCH)
+
+        Returns:
+            Dictionary mapping each requested document type to a list of
+            dictionaries in the same format as hybrid_search
+        """
+        results_by_query = await self.hybrid_search_by_queries(
+            query_texts=[query_text],
+            top_k_by_type=top_k_by_type,
+            user_id=user_id,
+            search_space_id=search_space_id,
+            ef_search=ef_search,
+        )
+        return results_by_query[0]
+
+    async def hybrid_search_by_queries(
+        self,
+        query_texts: list[str],
+        top_k_by_type: dict[str, int],
+        user_id: str,
+        search_space_id: int | None = None,
+        ef_search: int | None = None,
+    ) -> list[dict[str, list]]:
+        """
+        Run document hybrid search for several queries and document types in a single SQL statement.
+
+        The queries are embedded in one batch and passed as a VALUES list of
+        query vectors. Each document type gets its own index-friendly candidate
+        scan (ORDER BY ... LIMIT), run once per query through a LATERAL join.
+        Ranks, RRF scores and the per-type top_k cut are then computed with
+        window functions partitioned by query and document type. The chunks of
+        all ranked documents are loaded with one more query.
+
+        Args:
+            query_texts: The search query texts
+            top_k_by_type: Number of documents to return per document type
+            user_id: The ID of the user performing the search
+            search_space_id: Optional search space ID to filter results
+            ef_search: Optional HNSW ef_search for this request (defaults to HNSW_EF_SEARCH)
+
+        Returns:
+            One dictionary per query (in the order of query_texts) mapping each
+            requested document type to a list of dictionaries in the same
+            format as hybrid_search
+        """
+        from pgvector.sqlalchemy import Vector
+        from sqlalchemy import (
+            Integer,
+            Text,
+            and_,
+            cast,
+            column,
+            func,
+            literal,
+            select,
+            true,
+            union_all,
+            values,
+        )
+
+        from app.config import config
+        from app.db import Document, DocumentType, SearchSpace
+        from app.retriver.vector_search_settings import (
+            apply_vector_search_settings,
+            candidate_fill_stats,
+        )
+        from app.retriver.vector_storage import rank_by_embedding
+        from app.services.embedding_service import embed_queries
+
+        results_by_query = [
+            {document_type: [] for document_type in top_k_by_type} for _ in query_texts
+        ]
+
+        # Unknown document types simply return empty results
+        valid_top_k_by_type = {
+            document_type: top_k
+            for document_type, top_k in top_k_by_type.items()
+            if document_type in DocumentType.__members__ and top_k > 0
+        }
+        if not valid_top_k_by_type or not query_texts:
+            return results_by_query
+
+        # Embed all queries in one batch (shared cache across retrievers/connectors)
+        query_embeddings = await embed_queries(query_texts)
+
+        # Tune the HNSW scan for the largest per-type candidate list
+        candidates_requested = len(query_texts) * sum(
+            top_k * 2 for top_k in valid_top_k_by_type.values()
+        )
+        search_settings = await apply_vector_search_settings(
+            self.db_session, max(valid_top_k_by_type.values()) * 2, ef_search
+        )
+
+        # Constant for RRF calculation
+        k = 60
+
+        # One row per query; the vector is cast explicitly since VALUES
+        # parameters are otherwise typed as text
+        dimension = config.embedding_dimension
+        query_values = values(
+            column("query_index", Integer),
+            column("query_text", Text),
+            column("embedding", Vector(dimension)),
+            name="query_values",
+        ).data(
+            [
+                (query_index, query_text, query_embedding)
+                for query_index, (query_text, query_embedding) in enumerate(
+                    zip(query_texts, query_embeddings, strict=True)
+                )
+            ]
+        )
+        queries = select(
+            query_values.c.query_index,
+            query_values.c.query_text,
+            cast(query_values.c.embedding, Vector(dimension)).label("embedding"),
+        ).cte("queries")
+
+        # Use the stored tsvector and the search space's text search configuration
+        tsvector = Document.search_vector
+        tsquery = func.plainto_tsquery(
+            self._text_search_config(search_space_id), queries.c.query_text
+        )
+        keyword_score = func.ts_rank_cd(tsvector, tsquery)
+
+        # Base conditions for document filtering
+        base_conditions = [SearchSpace.user_id == user_id]
+
+        # Add search space filter if provided
+        if search_space_id is not None:
+            base_conditions.append(Document.search_space_id == search_space_id)
+
+        # One limited candidate scan per document type and query for each search method
+        semantic_branches = []
+        keyword_branches = []
+        for document_type, top_k in valid_top_k_by_type.items():
+            n_results = top_k * 2  # Get more results for better fusion
+            type_conditions = [
+                *base_conditions,
+                Document.document_type == DocumentType[document_type],
+            ]
+
+            semantic_branch = rank_by_embedding(
+                select(Document.id)
+                .join(SearchSpace, Document.search_space_id == SearchSpace.id)
+                .where(*type_conditions),
+                Document.embedding,
+                queries.c.embedding,
+                n_results,
+            ).lateral()
+            semantic_branches.append(
+                select(
+                    queries.c.query_index,
+                    literal(document_type).label("document_type"),
+                    literal(top_k).label("top_k"),
+                    semantic_branch.c.id,
+                    semantic_branch.c.distance,
+                ).select_from(queries.join(semantic_branch, true()))
+            )
+
+            keyword_branch = (
+                select(Document.id, keyword_score.label("ts_rank"))
+                .join(SearchSpace, Document.search_space_id == SearchSpace.id)
+                .where(*type_conditions)
+                .where(tsvector.op("@@")(tsquery))
+                .order_by(keyword_score.desc())
+                .limit(n_results)
+                .lateral()
+            )
+            keyword_branches.append(
+                select(
+                    queries.c.query_index,
+                    literal(document_type).label("document_type"),
+                    literal(top_k).label("top_k"),
+                    keyword_branch.c.id,
+                    keyword_branch.c.ts_rank,
+                ).select_from(queries.join(keyword_branch, true()))
+            )
+
+        semantic_candidates = union_all(*semantic_branches).subquery(
+            "semantic_candidates"
+        )
+        semantic_search_cte = select(
+            semantic_candidates.c.id,
+            semantic_candidates.c.query_index,
+            semantic_candidates.c.document_type,
+            semantic_candidates.c.top_k,
+            func.rank()
+            .over(
+                partition_by=(
+                    semantic_candidates.c.query_index,
+                    semantic_candidates.c.document_type,
+                ),
+                order_by=semantic_candidates.c.distance,
+            )
+            .label("rank"),
+        ).cte("semantic_search")
+
+        keyword_candidates = union_all(*keyword_branches).subquery("keyword_candidates")
+        keyword_search_cte = select(
+            keyword_candidates.c.id,
+            keyword_candidates.c.query_index,
+            keyword_candidates.c.document_type,
+            keyword_candidates.c.top_k,
+            func.rank()
+            .over(
+                partition_by=(
+                    keyword_candidates.c.query_index,
+                    keyword_candidates.c.document_type,
+                ),
+                order_by=keyword_candidates.c.ts_rank.desc(),
+            )
+            .label("rank"),
+        ).cte("keyword_search")
+
+        # RRF scores per query and document, then the per-type top_k cut
+        fused = (
+            select(
+                func.coalesce(semantic_search_cte.c.id, keyword_search_cte.c.id).label(
+                    "id"
+                ),
+                func.coalesce(
+                    semantic_search_cte.c.query_index,
+                    keyword_search_cte.c.query_index,
+                ).label("query_index"),
+                func.coalesce(
+                    semantic_search_cte.c.document_type,
+                    keyword_search_cte.c.document_type,
+                ).label("document_type"),
+                func.coalesce(
+                    semantic_search_cte.c.top_k, keyword_search_cte.c.top_k
+                ).label("top_k"),
+                (
+                    func.coalesce(1.0 / (k + semantic_search_cte.c.rank), 0.0)
+                    + func.coalesce(1.0 / (k + keyword_search_cte.c.rank), 0.0)
+                ).label("score"),
+            )
+            .select_from(
+                semantic_search_cte.outerjoin(
+                    keyword_search_cte,
+                    and_(
+                        semantic_search_cte.c.id == keyword_search_cte.c.id,
+                        semantic_search_cte.c.query_index
+                        == keyword_search_cte.c.query_index,
+                        semantic_search_cte.c.document_type
+                        == keyword_search_cte.c.document_type,
+                    ),
+                    full=True,
+                )
+            )
+            .subquery("fused")
+        )
+
+        ranked = select(
+            fused,
+            func.row_number()
+            .over(
+                partition_by=(fused.c.query_index, fused.c.document_type),
+                order_by=fused.c.score.desc(),
+            )
+            .label("type_rank"),
+        ).cte("ranked")
+
+        # Number of semantic candidates the HNSW scans produced (for scan metrics)
+        semantic_candidate_count = (
+            select(func.count())
+            .select_from(semantic_search_cte)
+            .scalar_subquery()
+            .label("semantic_candidate_count")
+        )
+
+        final_query = (
+            select(
+                *self._result_columns(),
+                ranked.c.score,
+                ranked.c.query_index,
+                ranked.c.document_type.label("result_type"),
+                semantic_candidate_count,
+            )
+            .join(Document, Document.id == ranked.c.id)
+            .where(ranked.c.type_rank <= ranked.c.top_k)
+            .order_by(ranked.c.query_index, ranked.c.document_type, ranked.c.type_rank)
+        )
+
+        # Execute the query
+        result = await self.db_session.execute(final_query)
+        rows = result.all()
+        candidate_fill_stats.record(
+            search_settings,
+            candidates_requested,
+            rows[0].semantic_candidate_count if rows else 0,
+        )
+
+        grouped_documents = {}
+        for row in rows:
+            grouped_documents.setdefault((row.query_index, row.result_type), []).append(
+                (row, row.score)
+            )
+
+        # Chunks for every ranked document, across all queries and types, in one query
+        chunks_by_document = await self._load_chunks_by_document(
+            list(dict.fromkeys(row.id for row in rows))
+        )
+
+        for (query_index, document_type), scored_documents in grouped_documents.items():
+            results_by_query[query_index][
+                document_type
+            ] = await self._serialize_documents_with_chunks(
+                scored_documents, chunks_by_document
+            )
+
+        return results_by_query
+
+    async def _load_chunks_by_document(self, document_ids: list[int]) -> dict:
+        """
+        Load the chunks of several documents in a single query.
+
+        Rows are streamed ordered by document then chunk, and only the columns
+        needed for serialization are selected (no embeddings).
+
+        Args:
+            document_ids: IDs of the documents whose chunks to load
+
+        Returns:
+            Dictionary mapping document ID to a list of (chunk_id, content,
+            token_counts) tuples
+        """
+        from sqlalchemy import select
+
+        from app.db import Chunk
+
+        chunks_by_document = {document_id: [] for document_id in document_ids}
+        if not document_ids:
+            return chunks_by_document
+
+        chunks_result = await self.db_session.stream(
+            select(Chunk.id, Chunk.document_id, Chunk.content, Chunk.token_counts)
+            .where(Chunk.document_id.in_(document_ids))
+            .order_by(Chunk.document_id, Chunk.position.asc().nulls_last(), Chunk.id)
+        )
+        async for chunk_id, document_id, content, token_counts in chunks_result:
+            chunks_by_document[document_id].append((chunk_id, content, token_counts))
+
+        return chunks_by_document
+
+    async def _serialize_documents_with_chunks(
+        self, documents_with_scores, chunks_by_document: dict | None = None
+    ) -> list:
+        """
+        Expand ranked documents into one result per chunk.
+
+        Args:
+            documents_with_scores: List of (document, score) tuples in rank order,
+                where document is a row of _result_columns
+            chunks_by_document: Optional chunks already loaded with
+                _load_chunks_by_document; loaded in one query when omitted
+
+        Returns:
+            List of dictionaries, one per chunk (or per document without chunks)
+        """
+        from sqlalchemy import select
+
+        from app.db import Document
 
-            from app.db import Chunk
+        if chunks_by_document is None:
+            chunks_by_document = await self._load_chunks_by_document(
+                [document.id for document, _ in documents_with_scores]
+            )
 
-            chunks_query = (
-                select(Chunk).where(Chunk.document_id == document.id).order_by(Chunk.id)
+        # Full content is only needed for documents that have no chunks
+        unchunked_ids = [
+            document.id
+            for document, _ in documents_with_scores
+            if not chunks_by_document.get(document.id)
+        ]
+        content_by_document = {}
+        if unchunked_ids:
+            content_result = await self.db_session.execute(
+                select(Document.id, Document.content, Document.token_counts).where(
+                    Document.id.in_(unchunked_ids)
+                )
             )
-            chunks_result = await self.db_session.execute(chunks_query)
-            chunks = chunks_result.scalars().all()
+            content_by_document = {
+                document_id: (content, token_counts)
+                for document_id, content, token_counts in content_result.all()
+            }
+
+        serialized_results = []
+        for document, score in documents_with_scores:
+            chunks = chunks_by_document.get(document.id)
 
             # Return individual chunks instead of concatenated content
             if chunks:
-                for chunk in chunks:
+                for chunk_id, chunk_content, token_counts in chunks:
                     serialized_results.append(
                         {
-                            "document_id": chunk.id,
+                            "document_id": chunk_id,
                             "title": document.title,
-                            "content": chunk.content,  # Use chunk content instead of document content
+                            "content": chunk_content,  # Use chunk content instead of document content
+                            "token_counts": token_counts,
                             "document_type": document.document_type.value
                             if hasattr(document, "document_type")
                             else None,
@@ -272,11 +806,15 @@ class DocumentHybridSearchRetriever:
                     )
             else:
                 # If no chunks exist, return the document content as a single result
+                content, token_counts = content_by_document.get(
+                    document.id, (None, None)
+                )
                 serialized_results.append(
                     {
                         "document_id": document.id,
                         "title": document.title,
-                        "content": document.content,
+                        "content": content,
+                        "token_counts": token_counts,
                         "document_type": document.document_type.value
                         if hasattr(document, "document_type")
                         else None,
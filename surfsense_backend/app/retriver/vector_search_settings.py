@@ -0,0 +1,169 @@
+import logging
+import threading
+from typing import Any
+
+from sqlalchemy import text
+
+from app.config import config
+from app.retriver.vector_storage import candidate_scan_size
+
+logger = logging.getLogger(__name__)
+
+# pgvector rejects hnsw.ef_search values outside 1..1000
+MAX_EF_SEARCH = 1000
+ITERATIVE_SCAN_MODES = ("off", "strict_order", "relaxed_order")
+ITERATIVE_SCAN_MIN_VERSION = (0, 8, 0)
+
+# Cached per process: whether the installed pgvector supports iterative scans
+_iterative_scan_supported: bool | None = None
+
+
+class CandidateFillStats:
+    """
+    Process-level counters of how many semantic candidates each search
+    requested and how many it got back.
+
+    A filtered HNSW scan returns at most ef_search candidates before the filter
+    is applied, so a search space holding a small share of the table can come
+    back short. Comparing requested and returned candidates per setting shows
+    when ef_search or iterative scanning needs to change. How many index
+    tuples the scan visited is not counted; EXPLAIN ANALYZE (or the retrieval
+    benchmark) shows that.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.searches = 0
+        self.candidates_requested = 0
+        self.candidates_returned = 0
+        self.short_searches = 0
+        self.ef_search_total = 0
+        self.by_iterative_scan: dict[str, int] = {}
+
+    def record(
+        self,
+        settings: dict[str, Any],
+        candidates_requested: int,
+        candidates_returned: int,
+    ) -> None:
+        """Record the requested and returned candidates of one semantic search."""
+        with self._lock:
+            self.searches += 1
+            self.candidates_requested += candidates_requested
+            self.candidates_returned += candidates_returned
+            if candidates_returned < candidates_requested:
+                self.short_searches += 1
+            self.ef_search_total += settings["ef_search"]
+            mode = settings["iterative_scan"]
+            self.by_iterative_scan[mode] = self.by_iterative_scan.get(mode, 0) + 1
+
+        logger.debug(
+            "Semantic search (ef_search=%s, iterative_scan=%s) filled %s/%s candidates",
+            settings["ef_search"],
+            settings["iterative_scan"],
+            candidates_returned,
+            candidates_requested,
+        )
+
+    def get_stats(self) -> dict[str, Any]:
+        """Return candidate counters and the average ef_search used."""
+        with self._lock:
+            return {
+                "searches": self.searches,
+                "candidates_requested": self.candidates_requested,
+                "candidates_returned": self.candidates_returned,
+                "short_searches": self.short_searches,
+                "candidate_fill_rate": self.candidates_returned
+                / self.candidates_requested
+                if self.candidates_requested
+                else 0.0,
+                "avg_ef_search": self.ef_search_total / self.searches
+                if self.searches
+                else 0.0,
+                "by_iterative_scan": dict(self.by_iterative_scan),
+            }
+
+
+candidate_fill_stats = CandidateFillStats()
+
+
+async def _supports_iterative_scan(db_session) -> bool:
+    """Check once per process whether pgvector supports hnsw.iterative_scan."""
+    global _iterative_scan_supported
+
+    if _iterative_scan_supported is None:
+        result = await db_session.execute(
+            text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+        )
+        version = result.scalar() or "0"
+        try:
+            version_tuple = tuple(int(part) for part in version.split("."))
+        except ValueError:
+            version_tuple = (0,)
+        _iterative_scan_supported = version_tuple >= ITERATIVE_SCAN_MIN_VERSION
+        if not _iterative_scan_supported:
+            logger.info(
+                "pgvector %s does not support iterative index scans; "
+                "HNSW_ITERATIVE_SCAN is ignored",
+                version,
+            )
+
+    return _iterative_scan_supported
+
+
+async def apply_vector_search_settings(
+    db_session,
+    n_results: int,
+    ef_search: int | None = None,
+) -> dict[str, Any]:
+    """
+    Set HNSW scan parameters for the current transaction.
+
+    ef_search is raised to at least n_results, since an HNSW scan cannot return
+    more rows than its candidate list. When the installed pgvector supports it,
+    iterative index scans are enabled so filtered queries keep scanning until
+    enough rows pass the filter (bounded by HNSW_MAX_SCAN_TUPLES).
+
+    Args:
+        db_session: The AsyncSession the search will run on
+        n_results: Number of semantic candidates the query will request
+        ef_search: Optional per-request ef_search; defaults to HNSW_EF_SEARCH
+
+    Returns:
+        Dictionary with the ef_search and iterative_scan values in effect
+    """
+    # Compressed storage modes scan a larger shortlist before exact rescoring
+    n_results = candidate_scan_size(n_results)
+    ef_search = max(ef_search or config.HNSW_EF_SEARCH, n_results)
+    ef_search = min(ef_search, MAX_EF_SEARCH)
+
+    iterative_scan = config.HNSW_ITERATIVE_SCAN
+    if iterative_scan not in ITERATIVE_SCAN_MODES:
+        logger.warning(
+            "Unknown HNSW_ITERATIVE_SCAN value %r; using 'off'", iterative_scan
+        )
+        iterative_scan = "off"
+    if iterative_scan != "off" and not await _supports_iterative_scan(db_session):
+        iterative_scan = "off"
+
+    # is_local=true: the settings end with the current transaction
+    if iterative_scan == "off":
+        await db_session.execute(
+            text("SELECT set_config('hnsw.ef_search', :ef_search, true)"),
+            {"ef_search": str(ef_search)},
+        )
+    else:
+        await db_session.execute(
+            text(
+                "SELECT set_config('hnsw.ef_search', :ef_search, true), "
+                "set_config('hnsw.iterative_scan', :iterative_scan, true), "
+                "set_config('hnsw.max_scan_tuples', :max_scan_tuples, true)"
+            ),
+            {
+                "ef_search": str(ef_search),
+                "iterative_scan": iterative_scan,
+                "max_scan_tuples": str(config.HNSW_MAX_SCAN_TUPLES),
+            },
+        )
+
+    return {"ef_search": ef_search, "iterative_scan": iterative_scan}
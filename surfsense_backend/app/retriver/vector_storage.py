@@ -0,0 +1,195 @@
+"""
+Compressed vector storage for the HNSW indexes.
+
+Embeddings are always stored at full precision in the table. With
+VECTOR_STORAGE_MODE set to "halfvec" or "binary", the HNSW indexes are built
+on an expression (embedding::halfvec(n) or binary_quantize(embedding)::bit(n))
+that is 2x or 32x smaller than the full-precision index. The ANN scan then
+produces a shortlist of VECTOR_RESCORE_FACTOR times the requested candidates,
+and that shortlist is re-ranked by exact cosine distance on the stored vectors.
+
+Requires pgvector >= 0.7.0 for the halfvec and binary modes.
+"""
+
+from pgvector.sqlalchemy import BIT, HALFVEC, Vector
+from sqlalchemy import cast, func, literal, literal_column, select
+from sqlalchemy.sql.expression import ColumnElement
+
+from app.config import config
+
+VECTOR_STORAGE_MODES = ("full", "halfvec", "binary")
+
+# (table, full-precision index name, compressed index name prefix) of the
+# whole-table indexes. Chunks only get per-document-type partial indexes:
+# every chunk search filters on one document type, and a whole-table index
+# next to them doubled the index size (see migration 48).
+_VECTOR_INDEX_TABLES = (("documents", "document_vector_index", "document"),)
+
+
+def get_vector_storage_mode() -> str:
+    """Return the configured storage mode, validated against VECTOR_STORAGE_MODES."""
+    mode = config.VECTOR_STORAGE_MODE
+    if mode not in VECTOR_STORAGE_MODES:
+        raise ValueError(
+            f"Invalid VECTOR_STORAGE_MODE {mode!r}; "
+            f"expected one of {', '.join(VECTOR_STORAGE_MODES)}"
+        )
+    return mode
+
+
+def candidate_scan_size(n_results: int, mode: str | None = None) -> int:
+    """Number of rows the ANN scan must produce to return n_results candidates."""
+    mode = mode or get_vector_storage_mode()
+    if mode == "full":
+        return n_results
+    return n_results * config.VECTOR_RESCORE_FACTOR
+
+
+def vector_index_statements(
+    mode: str,
+    dimension: int,
+    document_types: list[str],
+    concurrently: bool = False,
+) -> list[tuple[str, str]]:
+    """
+    Build the CREATE INDEX statements for the HNSW indexes of a storage mode.
+
+    Covers the documents index and the per-document-type partial chunk
+    indexes.
+
+    Args:
+        mode: One of VECTOR_STORAGE_MODES
+        dimension: Embedding dimension
+        document_types: Document type values that get a partial chunk index
+        concurrently: Build with CREATE INDEX CONCURRENTLY (outside a transaction)
+
+    Returns:
+        List of (index_name, statement) tuples
+    """
+    if mode == "full":
+        expression, opclass = "embedding", "public.vector_cosine_ops"
+    elif mode == "halfvec":
+        expression, opclass = f"(embedding::halfvec({dimension}))", "halfvec_cosine_ops"
+    elif mode == "binary":
+        expression = f"(binary_quantize(embedding)::bit({dimension}))"
+        opclass = "bit_hamming_ops"
+    else:
+        raise ValueError(f"Invalid vector storage mode {mode!r}")
+
+    create = "CREATE INDEX CONCURRENTLY" if concurrently else "CREATE INDEX"
+    create += " IF NOT EXISTS"
+    statements = []
+
+    for table, full_name, prefix in _VECTOR_INDEX_TABLES:
+        # Existing full-precision index names are kept as they are
+        name = full_name if mode == "full" else f"{prefix}_{mode}_vector_index"
+        statements.append(
+            (name, f"{create} {name} ON {table} USING hnsw ({expression} {opclass})")
+        )
+
+    for document_type in document_types:
+        suffix = document_type.lower()
+        name = (
+            f"chunks_vector_{suffix}_index"
+            if mode == "full"
+            else f"chunks_{mode}_vector_{suffix}_index"
+        )
+        statements.append(
+            (
+                name,
+                f"{create} {name} ON chunks USING hnsw ({expression} {opclass}) "
+                f"WHERE document_type = '{document_type}'",
+            )
+        )
+
+    return statements
+
+
+def rank_by_embedding(
+    base_query,
+    embedding_column,
+    query_embedding,
+    n_results: int,
+    mode: str | None = None,
+    use_index: bool = True,
+):
+    """
+    Select the n_results nearest rows of base_query with their cosine distance.
+
+    In "full" mode this is a plain ORDER BY distance LIMIT n_results. In the
+    compressed modes the ORDER BY uses the compressed expression (matching the
+    expression index), and the shortlist is re-ranked by exact distance.
+
+    With use_index=False the rows of base_query are ranked exactly without the
+    HNSW index. Use it when base_query is already restricted to a small set
+    (e.g. the chunks of a few documents), where walking the whole-table index
+    and filtering afterwards would lose recall.
+
+    query_embedding may also be a vector column of an outer query; the result
+    is then meant to be used as a LATERAL subquery (one scan per outer row).
+
+    Args:
+        base_query: select() of the row id (labelled "id") with joins and filters
+        embedding_column: The full-precision embedding column of the model
+        query_embedding: The query embedding, or a vector column of an outer query
+        n_results: Number of candidates to return
+        mode: Optional storage mode override (defaults to VECTOR_STORAGE_MODE)
+        use_index: Whether the ORDER BY may be served by the HNSW index
+
+    Returns:
+        select() with columns (id, distance) ordered by exact distance
+    """
+    mode = mode or get_vector_storage_mode()
+    exact_distance = embedding_column.op("<=>")(query_embedding)
+
+    if not use_index:
+        # "+ 0" keeps the ordering but no longer matches the index expression
+        return (
+            base_query.add_columns(exact_distance.label("distance"))
+            .order_by(exact_distance + literal_column("0"))
+            .limit(n_results)
+        )
+
+    if mode == "full":
+        return (
+            base_query.add_columns(exact_distance.label("distance"))
+            .order_by(exact_distance)
+            .limit(n_results)
+        )
+
+    dimension = config.embedding_dimension
+    outer_query_vector = isinstance(query_embedding, ColumnElement)
+    # Explicit cast: binary_quantize() is overloaded for vector and halfvec
+    query_vector = (
+        query_embedding
+        if outer_query_vector
+        else cast(literal(query_embedding, Vector(dimension)), Vector(dimension))
+    )
+    if mode == "halfvec":
+        approximate_distance = cast(embedding_column, HALFVEC(dimension)).op("<=>")(
+            cast(query_vector, HALFVEC(dimension))
+        )
+    else:
+        approximate_distance = cast(
+            func.binary_quantize(embedding_column), BIT(dimension)
+        ).op("<~>")(cast(func.binary_quantize(query_vector), BIT(dimension)))
+
+    shortlist = (
+        base_query.add_columns(embedding_column.label("embedding"))
+        .order_by(approximate_distance)
+        .limit(candidate_scan_size(n_results, mode))
+    )
+    # LATERAL keeps the reference to the outer query vector correlated
+    shortlist = (
+        shortlist.lateral("shortlist")
+        if outer_query_vector
+        else shortlist.subquery("shortlist")
+    )
+
+    # Exact rescoring over the shortlist only
+    rescored_distance = shortlist.c.embedding.op("<=>")(query_embedding)
+    return (
+        select(shortlist.c.id, rescored_distance.label("distance"))
+        .order_by(rescored_distance)
+        .limit(n_results)
+    )
@@ -4,9 +4,8 @@ from langchain.schema import AIMessage, HumanMessage
 from sqlalchemy.exc import IntegrityError, OperationalError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
 
-from app.db import Chat, SearchSpace, User, UserSearchSpacePreference, get_async_session
+from app.db import Chat, SearchSpace, User, get_async_session
 from app.schemas import (
     AISDKChatRequest,
     ChatCreate,
@@ -14,12 +13,15 @@ from app.schemas import (
     ChatReadWithoutMessages,
     ChatUpdate,
 )
+from app.services.llm_service import get_user_search_space_language
 from app.tasks.stream_connector_search_results import stream_connector_search_results
 from app.users import current_active_user
 from app.utils.check_ownership import check_ownership
 from app.utils.validators import (
     validate_connectors,
+    validate_context_window,
     validate_document_ids,
+    validate_ef_search,
     validate_messages,
     validate_research_mode,
     validate_search_mode,
@@ -56,72 +58,17 @@ async def handle_chat_data(
     )
     search_mode_str = validate_search_mode(request_data.get("search_mode"))
     top_k = validate_top_k(request_data.get("top_k"))
+    ef_search = validate_ef_search(request_data.get("ef_search"))
+    context_window = validate_context_window(request_data.get("context_window"))
     # print("RESQUEST DATA:", request_data)
     # print("SELECTED CONNECTORS:", selected_connectors)
 
     # Check if the search space belongs to the current user
     try:
         await check_ownership(session, SearchSpace, search_space_id, user)
-        language_result = await session.execute(
-            select(UserSearchSpacePreference)
-            .options(
-                selectinload(UserSearchSpacePreference.search_space).selectinload(
-                    SearchSpace.llm_configs
-                ),
-                # Note: Removed selectinload for LLM relationships as they no longer exist
-                # Global configs (negative IDs) don't have foreign keys
-                # LLM configs are now fetched manually when needed
-            )
-            .filter(
-                UserSearchSpacePreference.search_space_id == search_space_id,
-                UserSearchSpacePreference.user_id == user.id,
-            )
+        language = await get_user_search_space_language(
+            session, user.id, search_space_id
         )
-        user_preference = language_result.scalars().first()
-        # print("UserSearchSpacePreference:", user_preference)
-
-        language = None
-        llm_configs = []  # Initialize to empty list
-
-        if (
-            user_preference
-            and user_preference.search_space
-            and user_preference.search_space.llm_configs
-        ):
-            llm_configs = user_preference.search_space.llm_configs
-
-            # Manually fetch LLM configs since relationships no longer exist
-            # Check fast_llm, long_context_llm, and strategic_llm IDs
-            from app.config import config as app_config
-
-            for llm_id in [
-                user_preference.fast_llm_id,
-                user_preference.long_context_llm_id,
-                user_preference.strategic_llm_id,
-            ]:
-                if llm_id is not None:
-                    # Check if it's a global config (negative ID)
-                    if llm_id < 0:
-                        # Look in global configs
-                        for global_cfg in app_config.GLOBAL_LLM_CONFIGS:
-                            if global_cfg.get("id") == llm_id:
-                                language = global_cfg.get("language")
-                                if language:
-                                    break
-                    else:
-                        # Look in custom configs
-                        for llm_config in llm_configs:
-                            if llm_config.id == llm_id and getattr(
-                                llm_config, "language", None
-                            ):
-                                language = llm_config.language
-                                break
-                    if language:
-                        break
-
-        if not language and llm_configs:
-            first_llm_config = llm_configs[0]
-            language = getattr(first_llm_config, "language", None)
 
     except HTTPException:
         raise HTTPException(
@@ -148,6 +95,8 @@ async def handle_chat_data(
             document_ids_to_add_in_context,
             language,
             top_k,
+            ef_search,
+            context_window,
         )
     )
 
@@ -428,8 +428,8 @@ async def get_document_by_chunk_id(
                 detail="Document not found or you don't have access to it",
             )
 
-        # Sort chunks by creation time
-        sorted_chunks = sorted(document.chunks, key=lambda x: x.created_at)
+        # Document.chunks is loaded in document order (by chunk position)
+        sorted_chunks = document.chunks
 
         # Return the document with its chunks
         return DocumentWithChunksRead(
@@ -14,7 +14,7 @@ from app.db import (
     get_async_session,
 )
 from app.schemas import LLMConfigCreate, LLMConfigRead, LLMConfigUpdate
-from app.services.llm_service import validate_llm_config
+from app.services.llm_service import llm_instance_cache, validate_llm_config
 from app.users import current_active_user
 
 router = APIRouter()
@@ -63,6 +63,7 @@ async def get_or_create_user_preference(
         session.add(preference)
         await session.commit()
         await session.refresh(preference)
+        llm_instance_cache.invalidate(search_space_id, user_id=user_id)
 
     return preference
 
@@ -169,6 +170,8 @@ async def create_llm_config(
         session.add(db_llm_config)
         await session.commit()
         await session.refresh(db_llm_config)
+        # The search space's language may fall back to the new config
+        llm_instance_cache.invalidate(db_llm_config.search_space_id)
         return db_llm_config
     except HTTPException:
         raise
@@ -295,6 +298,7 @@ async def update_llm_config(
 
         await session.commit()
         await session.refresh(db_llm_config)
+        llm_instance_cache.invalidate(db_llm_config.search_space_id)
         return db_llm_config
     except HTTPException:
         raise
@@ -325,8 +329,10 @@ async def delete_llm_config(
         # Verify user has access to the search space
         await check_search_space_access(session, db_llm_config.search_space_id, user)
 
+        search_space_id = db_llm_config.search_space_id
         await session.delete(db_llm_config)
         await session.commit()
+        llm_instance_cache.invalidate(search_space_id)
         return {"message": "LLM configuration deleted successfully"}
     except HTTPException:
         raise
@@ -497,6 +503,7 @@ async def update_user_llm_preferences(
 
         await session.commit()
         await session.refresh(preference)
+        llm_instance_cache.invalidate(search_space_id, user_id=user.id)
 
         # Helper function to get config (global or custom)
         async def get_config_for_id(config_id):
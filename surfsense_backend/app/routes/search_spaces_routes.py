@@ -2,6 +2,7 @@ from pathlib import Path
 
 import yaml
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
@@ -13,6 +14,19 @@ from app.utils.check_ownership import check_ownership
 router = APIRouter()
 
 
+async def validate_text_search_config(session: AsyncSession, text_search_config: str):
+    """Ensure the text search configuration exists in PostgreSQL."""
+    result = await session.execute(
+        text("SELECT 1 FROM pg_ts_config WHERE cfgname = :cfgname"),
+        {"cfgname": text_search_config},
+    )
+    if result.scalar() is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown text search configuration: {text_search_config}",
+        )
+
+
 @router.post("/searchspaces", response_model=SearchSpaceRead)
 async def create_search_space(
     search_space: SearchSpaceCreate,
@@ -24,6 +38,9 @@ async def create_search_space(
 
         # citations_enabled defaults to True (handled by Pydantic schema)
         # qna_custom_instructions defaults to None/empty (handled by DB)
+        await validate_text_search_config(
+            session, search_space_data["text_search_config"]
+        )
 
         db_search_space = SearchSpace(**search_space_data, user_id=user.id)
         session.add(db_search_space)
@@ -123,10 +140,28 @@ async def update_search_space(
             session, SearchSpace, search_space_id, user
         )
         update_data = search_space_update.model_dump(exclude_unset=True)
+        text_search_config_changed = update_data.get("text_search_config") not in (
+            None,
+            db_search_space.text_search_config,
+        )
+        if text_search_config_changed:
+            await validate_text_search_config(
+                session, update_data["text_search_config"]
+            )
         for key, value in update_data.items():
             setattr(db_search_space, key, value)
         await session.commit()
         await session.refresh(db_search_space)
+
+        if text_search_config_changed:
+            from app.tasks.celery_tasks.search_space_tasks import (
+                retokenize_search_space_task,
+            )
+
+            # Existing documents and chunks are re-tokenized in the background;
+            # until the task finishes, keyword search may miss some of them
+            retokenize_search_space_task.delay(search_space_id)
+
         return db_search_space
     except HTTPException:
         raise
@@ -0,0 +1,20 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends
+
+from app.db import User
+from app.services.runtime_stats import collect_runtime_stats
+from app.users import current_superuser
+
+router = APIRouter()
+
+
+@router.get("/stats")
+async def read_runtime_stats(
+    user: User = Depends(current_superuser),
+) -> dict[str, Any]:
+    """
+    Get the embedding executor, cache and vector search counters of the API
+    worker process that serves the request (superusers only).
+    """
+    return collect_runtime_stats()
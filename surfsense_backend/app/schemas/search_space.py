@@ -15,6 +15,8 @@ class SearchSpaceCreate(SearchSpaceBase):
     # Optional on create, will use defaults if not provided
     citations_enabled: bool = True
     qna_custom_instructions: str | None = None
+    # PostgreSQL text search configuration used for keyword search
+    text_search_config: str = "english"
 
 
 class SearchSpaceUpdate(BaseModel):
@@ -23,6 +25,7 @@ class SearchSpaceUpdate(BaseModel):
     description: str | None = None
     citations_enabled: bool | None = None
     qna_custom_instructions: str | None = None
+    text_search_config: str | None = None
 
 
 class SearchSpaceRead(SearchSpaceBase, IDModel, TimestampModel):
@@ -32,5 +35,6 @@ class SearchSpaceRead(SearchSpaceBase, IDModel, TimestampModel):
     # QnA configuration
     citations_enabled: bool
     qna_custom_instructions: str | None = None
+    text_search_config: str = "english"
 
     model_config = ConfigDict(from_attributes=True)
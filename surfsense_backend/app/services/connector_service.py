@@ -10,29 +10,48 @@ from sqlalchemy.future import select
 from tavily import TavilyClient
 
 from app.agents.researcher.configuration import SearchMode
+from app.config import config
 from app.db import (
     Chunk,
     Document,
     SearchSourceConnector,
     SearchSourceConnectorType,
     SearchSpace,
+    SearchSpaceIndexWrite,
 )
 from app.retriver.chunks_hybrid_search import ChucksHybridSearchRetriever
 from app.retriver.documents_hybrid_search import DocumentHybridSearchRetriever
+from app.services.search_result_cache import search_result_cache
 
 
 class ConnectorService:
-    def __init__(self, session: AsyncSession, user_id: str | None = None):
+    def __init__(
+        self,
+        session: AsyncSession,
+        user_id: str | None = None,
+        ef_search: int | None = None,
+        context_window: int | None = None,
+    ):
         self.session = session
         self.chunk_retriever = ChucksHybridSearchRetriever(session)
         self.document_retriever = DocumentHybridSearchRetriever(session)
         self.user_id = user_id
+        # Optional per-request HNSW ef_search override for local searches
+        self.ef_search = ef_search
+        # Neighboring chunks added on each side of a chunk hit
+        self.context_window = (
+            config.CHUNK_CONTEXT_WINDOW if context_window is None else context_window
+        )
         self.source_id_counter = (
             100000  # High starting value to avoid collisions with existing IDs
         )
         self.counter_lock = (
             asyncio.Lock()
         )  # Lock to protect counter in multithreaded environments
+        # Local search results fetched ahead of time by prefetch_local_search
+        self._local_search_results: dict[tuple, list[dict[str, Any]]] = {}
+        # Search space index generations, read once per service (i.e. per request)
+        self._index_generations: dict[int, int | None] = {}
 
     async def initialize_counter(self):
         """
@@ -73,24 +92,14 @@ class ConnectorService:
         Returns:
             tuple: (sources_info, langchain_documents)
         """
-        if search_mode == SearchMode.CHUNKS:
-            crawled_urls_chunks = await self.chunk_retriever.hybrid_search(
-                query_text=user_query,
-                top_k=top_k,
-                user_id=user_id,
-                search_space_id=search_space_id,
-                document_type="CRAWLED_URL",
-            )
-        elif search_mode == SearchMode.DOCUMENTS:
-            crawled_urls_chunks = await self.document_retriever.hybrid_search(
-                query_text=user_query,
-                top_k=top_k,
-                user_id=user_id,
-                search_space_id=search_space_id,
-                document_type="CRAWLED_URL",
-            )
-            # Transform document retriever results to match expected format
-            crawled_urls_chunks = self._transform_document_results(crawled_urls_chunks)
+        crawled_urls_chunks = await self._local_hybrid_search(
+            user_query=user_query,
+            user_id=user_id,
+            search_space_id=search_space_id,
+            document_type="CRAWLED_URL",
+            top_k=top_k,
+            search_mode=search_mode,
+        )
 
         # Early return if no results
         if not crawled_urls_chunks:
@@ -147,24 +156,14 @@ class ConnectorService:
         Returns:
             tuple: (sources_info, langchain_documents)
         """
-        if search_mode == SearchMode.CHUNKS:
-            files_chunks = await self.chunk_retriever.hybrid_search(
-                query_text=user_query,
-                top_k=top_k,
-                user_id=user_id,
-                search_space_id=search_space_id,
-                document_type="FILE",
-            )
-        elif search_mode == SearchMode.DOCUMENTS:
-            files_chunks = await self.document_retriever.hybrid_search(
-                query_text=user_query,
-                top_k=top_k,
-                user_id=user_id,
-                search_space_id=search_space_id,
-                document_type="FILE",
-            )
-            # Transform document retriever results to match expected format
-            files_chunks = self._transform_document_results(files_chunks)
+        files_chunks = await self._local_hybrid_search(
+            user_query=user_query,
+            user_id=user_id,
+            search_space_id=search_space_id,
+            document_type="FILE",
+            top_k=top_k,
+            search_mode=search_mode,
+        )
 
         # Early return if no results
         if not files_chunks:
@@ -207,6 +206,258 @@ class ConnectorService:
 
         return result_object, files_chunks
 
+    async def _get_index_generation(self, search_space_id: int) -> int | None:
+        """
+        Return the search space's index generation, reading it once per service.
+
+        The generation is the compacted index_generation plus the index writes
+        recorded since, i.e. the number of committed statements that wrote the
+        space's documents or chunks.
+
+        Returns:
+            The generation, or None if the search space does not exist
+        """
+        if search_space_id not in self._index_generations:
+            recent_writes = (
+                select(func.count())
+                .select_from(SearchSpaceIndexWrite)
+                .where(SearchSpaceIndexWrite.search_space_id == SearchSpace.id)
+                .scalar_subquery()
+            )
+            result = await self.session.execute(
+                select(SearchSpace.index_generation + recent_writes).where(
+                    SearchSpace.id == search_space_id
+                )
+            )
+            self._index_generations[search_space_id] = result.scalar()
+        return self._index_generations[search_space_id]
+
+    async def _search_result_cache_key(
+        self,
+        user_query: str,
+        user_id: str,
+        search_space_id: int,
+        document_type: str,
+        top_k: int,
+        search_mode: SearchMode,
+    ) -> str | None:
+        """
+        Build the result cache key for a local hybrid search.
+
+        Returns:
+            The cache key, or None when the search must not be cached
+        """
+        if not search_result_cache.enabled or search_space_id is None:
+            return None
+
+        index_generation = await self._get_index_generation(search_space_id)
+        if index_generation is None:
+            return None
+
+        return search_result_cache.make_key(
+            query=user_query,
+            user_id=str(user_id),
+            search_space_id=search_space_id,
+            index_generation=index_generation,
+            document_type=document_type,
+            top_k=top_k,
+            search_mode=search_mode.value,
+            # Settings that change the ranking
+            ef_search=self.ef_search or config.HNSW_EF_SEARCH,
+            embedding_model=config.EMBEDDING_MODEL,
+            vector_storage_mode=config.VECTOR_STORAGE_MODE,
+            hierarchical_document_top_n=config.HIERARCHICAL_DOCUMENT_TOP_N,
+            context_window=self.context_window,
+        )
+
+    async def prefetch_local_search(
+        self,
+        user_queries: list[str],
+        user_id: str,
+        search_space_id: int,
+        document_types: list[str],
+        top_k: int = 20,
+        search_mode: SearchMode = SearchMode.CHUNKS,
+    ) -> None:
+        """
+        Search several queries and local document types in one database round-trip.
+
+        The queries are embedded in one batch call. The results are kept on the
+        service and consumed by the matching search_* calls, which would
+        otherwise each embed their query and run their own hybrid search
+        statement. Query and document type pairs with cached results are not
+        searched again.
+
+        Args:
+            user_queries: The queries to search for (e.g., all research questions)
+            user_id: The user's ID
+            search_space_id: The search space ID to search in
+            document_types: Document types (local connectors) to search
+            top_k: Maximum number of results to return per query and document type
+            search_mode: Search mode (CHUNKS or DOCUMENTS)
+        """
+        if search_mode not in (SearchMode.CHUNKS, SearchMode.DOCUMENTS):
+            return
+
+        cache_keys = {}
+        missing_queries = []
+        missing_types = []
+        for user_query in dict.fromkeys(user_queries):
+            for document_type in document_types:
+                key = (user_query, search_space_id, document_type, top_k, search_mode)
+                cache_key = await self._search_result_cache_key(
+                    user_query,
+                    user_id,
+                    search_space_id,
+                    document_type,
+                    top_k,
+                    search_mode,
+                )
+                cached = await search_result_cache.get(cache_key) if cache_key else None
+                if cached is not None:
+                    self._local_search_results[key] = cached
+                    continue
+                cache_keys[key] = cache_key
+                if user_query not in missing_queries:
+                    missing_queries.append(user_query)
+                if document_type not in missing_types:
+                    missing_types.append(document_type)
+
+        if not missing_queries:
+            return
+
+        top_k_by_type = dict.fromkeys(missing_types, top_k)
+        if search_mode == SearchMode.CHUNKS:
+            results_by_query = await self.chunk_retriever.hybrid_search_by_queries(
+                query_texts=missing_queries,
+                top_k_by_type=top_k_by_type,
+                user_id=user_id,
+                search_space_id=search_space_id,
+                ef_search=self.ef_search,
+            )
+            # One expansion query for the hits of all queries and types
+            await self.chunk_retriever.expand_with_neighbors(
+                [
+                    result
+                    for results_by_type in results_by_query
+                    for results in results_by_type.values()
+                    for result in results
+                ],
+                self.context_window,
+            )
+        else:
+            results_by_query = await self.document_retriever.hybrid_search_by_queries(
+                query_texts=missing_queries,
+                top_k_by_type=top_k_by_type,
+                user_id=user_id,
+                search_space_id=search_space_id,
+                ef_search=self.ef_search,
+            )
+            # Transform document retriever results to match expected format
+            results_by_query = [
+                {
+                    document_type: self._transform_document_results(results)
+                    for document_type, results in results_by_type.items()
+                }
+                for results_by_type in results_by_query
+            ]
+
+        for user_query, results_by_type in zip(
+            missing_queries, results_by_query, strict=True
+        ):
+            for document_type, results in results_by_type.items():
+                key = (user_query, search_space_id, document_type, top_k, search_mode)
+                self._local_search_results[key] = results
+                if cache_keys.get(key):
+                    await search_result_cache.put(cache_keys[key], results)
+
+    async def _local_hybrid_search(
+        self,
+        user_query: str,
+        user_id: str,
+        search_space_id: int,
+        document_type: str,
+        top_k: int,
+        search_mode: SearchMode,
+    ) -> list[dict[str, Any]]:
+        """
+        Hybrid search over a single local document type.
+
+        Uses the result of a previous prefetch_local_search call when one matches,
+        then the search result cache, and otherwise runs the chunk or document
+        retriever for this type only.
+
+        Returns:
+            List of results in the chunk retriever format
+        """
+        key = (user_query, search_space_id, document_type, top_k, search_mode)
+        prefetched = self._local_search_results.pop(key, None)
+        if prefetched is not None:
+            return prefetched
+
+        cache_key = await self._search_result_cache_key(
+            user_query, user_id, search_space_id, document_type, top_k, search_mode
+        )
+        if cache_key:
+            cached = await search_result_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        results = await self._run_local_hybrid_search(
+            user_query, user_id, search_space_id, document_type, top_k, search_mode
+        )
+        if cache_key:
+            await search_result_cache.put(cache_key, results)
+        return results
+
+    async def _run_local_hybrid_search(
+        self,
+        user_query: str,
+        user_id: str,
+        search_space_id: int,
+        document_type: str,
+        top_k: int,
+        search_mode: SearchMode,
+    ) -> list[dict[str, Any]]:
+        """Run the retriever for one local document type, bypassing all caches."""
+        if search_mode == SearchMode.CHUNKS:
+            results = await self.chunk_retriever.hybrid_search(
+                query_text=user_query,
+                top_k=top_k,
+                user_id=user_id,
+                search_space_id=search_space_id,
+                document_type=document_type,
+                ef_search=self.ef_search,
+            )
+            return await self.chunk_retriever.expand_with_neighbors(
+                results, self.context_window
+            )
+        elif search_mode == SearchMode.DOCUMENTS:
+            document_results = await self.document_retriever.hybrid_search(
+                query_text=user_query,
+                top_k=top_k,
+                user_id=user_id,
+                search_space_id=search_space_id,
+                document_type=document_type,
+                ef_search=self.ef_search,
+            )
+            # Transform document retriever results to match expected format
+            return self._transform_document_results(document_results)
+        elif search_mode == SearchMode.HIERARCHICAL:
+            results = await self.chunk_retriever.hierarchical_search(
+                query_text=user_query,
+                top_k=top_k,
+                user_id=user_id,
+                search_space_id=search_space_id,
+                document_type=document_type,
+                ef_search=self.ef_search,
+            )
+            return await self.chunk_retriever.expand_with_neighbors(
+                results, self.context_window
+            )
+
+        return []
+
     def _transform_document_results(
         self, document_results: list[dict[str, Any]]
     ) -> list[dict[str, Any]]:
@@ -232,6 +483,7 @@ class ConnectorService:
                         "metadata": doc.get("metadata", {}),
                     },
                     "content": doc.get("chunks_content", doc.get("content", "")),
+                    "token_counts": doc.get("token_counts"),
                     "score": doc.get("score", 0.0),
                 }
             )
@@ -800,24 +1052,14 @@ class ConnectorService:
         Returns:
             tuple: (sources_info, langchain_documents)
         """
-        if search_mode == SearchMode.CHUNKS:
-            slack_chunks = await self.chunk_retriever.hybrid_search(
-                query_text=user_query,
-                top_k=top_k,
-                user_id=user_id,
-                search_space_id=search_space_id,
-                document_type="SLACK_CONNECTOR",
-            )
-        elif search_mode == SearchMode.DOCUMENTS:
-            slack_chunks = await self.document_retriever.hybrid_search(
-                query_text=user_query,
-                top_k=top_k,
-                user_id=user_id,
-                search_space_id=search_space_id,
-                document_type="SLACK_CONNECTOR",
-            )
-            # Transform document retriever results to match expected format
-            slack_chunks = self._transform_document_results(slack_chunks)
+        slack_chunks = await self._local_hybrid_search(
+            user_query=user_query,
+            user_id=user_id,
+            search_space_id=search_space_id,
+            document_type="SLACK_CONNECTOR",
+            top_k=top_k,
+            search_mode=search_mode,
+        )
 
         # Early return if no results
         if not slack_chunks:
@@ -894,24 +1136,14 @@ class ConnectorService:
         Returns:
             tuple: (sources_info, langchain_documents)
         """
-        if search_mode == SearchMode.CHUNKS:
-            notion_chunks = await self.chunk_retriever.hybrid_search(
-                query_text=user_query,
-                top_k=top_k,
-                user_id=user_id,
-                search_space_id=search_space_id,
-                document_type="NOTION_CONNECTOR",
-            )
-        elif search_mode == SearchMode.DOCUMENTS:
-            notion_chunks = await self.document_retriever.hybrid_search(
-                query_text=user_query,
-                top_k=top_k,
-                user_id=user_id,
-                search_space_id=search_space_id,
-                document_type="NOTION_CONNECTOR",
-            )
-            # Transform document retriever results to match expected format
-            notion_chunks = self._transform_document_results(notion_chunks)
+        notion_chunks = await self._local_hybrid_search(
+            user_query=user_query,
+            user_id=user_id,
+            search_space_id=search_space_id,
+            document_type="NOTION_CONNECTOR",
+            top_k=top_k,
+            search_mode=search_mode,
+        )
 
         # Early return if no results
         if not notion_chunks:
@@ -991,24 +1223,14 @@ class ConnectorService:
         Returns:
             tuple: (sources_info, langchain_documents)
         """
-        if search_mode == SearchMode.CHUNKS:
-            extension_chunks = await self.chunk_retriever.hybrid_search(
-                query_text=user_query,
-                top_k=top_k,
-                user_id=user_id,
-                search_space_id=search_space_id,
-                document_type="EXTENSION",
-            )
-        elif search_mode == SearchMode.DOCUMENTS:
-            extension_chunks = await self.document_retriever.hybrid_search(
-                query_text=user_query,
-                top_k=top_k,
-                user_id=user_id,
-                search_space_id=search_space_id,
-                document_type="EXTENSION",
-            )
-            # Transform document retriever results to match expected format
-            extension_chunks = self._transform_document_results(extension_chunks)
+        extension_chunks = await self._local_hybrid_search(
+            user_query=user_query,
+            user_id=user_id,
+            search_space_id=search_space_id,
+            document_type="EXTENSION",
+            top_k=top_k,
+            search_mode=search_mode,
+        )
 
         # Early return if no results
         if not extension_chunks:
@@ -1112,24 +1334,14 @@ class ConnectorService:
         Returns:
             tuple: (sources_info, langchain_documents)
         """
-        if search_mode == SearchMode.CHUNKS:
-            youtube_chunks = await self.chunk_retriever.hybrid_search(
-                query_text=user_query,
-                top_k=top_k,
-                user_id=user_id,
-                search_space_id=search_space_id,
-                document_type="YOUTUBE_VIDEO",
-            )
-        elif search_mode == SearchMode.DOCUMENTS:
-            youtube_chunks = await self.document_retriever.hybrid_search(
-                query_text=user_query,
-                top_k=top_k,
-                user_id=user_id,
-                search_space_id=search_space_id,
-                document_type="YOUTUBE_VIDEO",
-            )
-            # Transform document retriever results to match expected format
-            youtube_chunks = self._transform_document_results(youtube_chunks)
+        youtube_chunks = await self._local_hybrid_search(
+            user_query=user_query,
+            user_id=user_id,
+            search_space_id=search_space_id,
+            document_type="YOUTUBE_VIDEO",
+            top_k=top_k,
+            search_mode=search_mode,
+        )
 
         # Early return if no results
         if not youtube_chunks:
@@ -1203,24 +1415,14 @@ class ConnectorService:
         Returns:
             tuple: (sources_info, langchain_documents)
         """
-        if search_mode == SearchMode.CHUNKS:
-            github_chunks = await self.chunk_retriever.hybrid_search(
-                query_text=user_query,
-                top_k=top_k,
-                user_id=user_id,
-                search_space_id=search_space_id,
-                document_type="GITHUB_CONNECTOR",
-            )
-        elif search_mode == SearchMode.DOCUMENTS:
-            github_chunks = await self.document_retriever.hybrid_search(
-                query_text=user_query,
-                top_k=top_k,
-                user_id=user_id,
-                search_space_id=search_space_id,
-                document_type="GITHUB_CONNECTOR",
-            )
-            # Transform document retriever results to match expected format
-            github_chunks = self._transform_document_results(github_chunks)
+        github_chunks = await self._local_hybrid_search(
+            user_query=user_query,
+            user_id=user_id,
+            search_space_id=search_space_id,
+            document_type="GITHUB_CONNECTOR",
+            top_k=top_k,
+            search_mode=search_mode,
+        )
 
         # Early return if no results
         if not github_chunks:
@@ -1284,24 +1486,14 @@ class ConnectorService:
         Returns:
             tuple: (sources_info, langchain_documents)
         """
-        if search_mode == SearchMode.CHUNKS:
-            linear_chunks = await self.chunk_retriever.hybrid_search(
-                query_text=user_query,
-                top_k=top_k,
-                user_id=user_id,
-                search_space_id=search_space_id,
-                document_type="LINEAR_CONNECTOR",
-            )
-        elif search_mode == SearchMode.DOCUMENTS:
-            linear_chunks = await self.document_retriever.hybrid_search(
-                query_text=user_query,
-                top_k=top_k,
-                user_id=user_id,
-                search_space_id=search_space_id,
-                document_type="LINEAR_CONNECTOR",
-            )
-            # Transform document retriever results to match expected format
-            linear_chunks = self._transform_document_results(linear_chunks)
+        linear_chunks = await self._local_hybrid_search(
+            user_query=user_query,
+            user_id=user_id,
+            search_space_id=search_space_id,
+            document_type="LINEAR_CONNECTOR",
+            top_k=top_k,
+            search_mode=search_mode,
+        )
 
         # Early return if no results
         if not linear_chunks:
@@ -1394,24 +1586,14 @@ class ConnectorService:
         Returns:
             tuple: (sources_info, langchain_documents)
         """
-        if search_mode == SearchMode.CHUNKS:
-            jira_chunks = await self.chunk_retriever.hybrid_search(
-                query_text=user_query,
-                top_k=top_k,
-                user_id=user_id,
-                search_space_id=search_space_id,
-                document_type="JIRA_CONNECTOR",
-            )
-        elif search_mode == SearchMode.DOCUMENTS:
-            jira_chunks = await self.document_retriever.hybrid_search(
-                query_text=user_query,
-                top_k=top_k,
-                user_id=user_id,
-                search_space_id=search_space_id,
-                document_type="JIRA_CONNECTOR",
-            )
-            # Transform document retriever results to match expected format
-            jira_chunks = self._transform_document_results(jira_chunks)
+        jira_chunks = await self._local_hybrid_search(
+            user_query=user_query,
+            user_id=user_id,
+            search_space_id=search_space_id,
+            document_type="JIRA_CONNECTOR",
+            top_k=top_k,
+            search_mode=search_mode,
+        )
 
         # Early return if no results
         if not jira_chunks:
@@ -1515,24 +1697,14 @@ class ConnectorService:
         Returns:
             tuple: (sources_info, langchain_documents)
         """
-        if search_mode == SearchMode.CHUNKS:
-            calendar_chunks = await self.chunk_retriever.hybrid_search(
-                query_text=user_query,
-                top_k=top_k,
-                user_id=user_id,
-                search_space_id=search_space_id,
-                document_type="GOOGLE_CALENDAR_CONNECTOR",
-            )
-        elif search_mode == SearchMode.DOCUMENTS:
-            calendar_chunks = await self.document_retriever.hybrid_search(
-                query_text=user_query,
-                top_k=top_k,
-                user_id=user_id,
-                search_space_id=search_space_id,
-                document_type="GOOGLE_CALENDAR_CONNECTOR",
-            )
-            # Transform document retriever results to match expected format
-            calendar_chunks = self._transform_document_results(calendar_chunks)
+        calendar_chunks = await self._local_hybrid_search(
+            user_query=user_query,
+            user_id=user_id,
+            search_space_id=search_space_id,
+            document_type="GOOGLE_CALENDAR_CONNECTOR",
+            top_k=top_k,
+            search_mode=search_mode,
+        )
 
         # Early return if no results
         if not calendar_chunks:
@@ -1648,24 +1820,14 @@ class ConnectorService:
         Returns:
             tuple: (sources_info, langchain_documents)
         """
-        if search_mode == SearchMode.CHUNKS:
-            airtable_chunks = await self.chunk_retriever.hybrid_search(
-                query_text=user_query,
-                top_k=top_k,
-                user_id=user_id,
-                search_space_id=search_space_id,
-                document_type="AIRTABLE_CONNECTOR",
-            )
-        elif search_mode == SearchMode.DOCUMENTS:
-            airtable_chunks = await self.document_retriever.hybrid_search(
-                query_text=user_query,
-                top_k=top_k,
-                user_id=user_id,
-                search_space_id=search_space_id,
-                document_type="AIRTABLE_CONNECTOR",
-            )
-            # Transform document retriever results to match expected format
-            airtable_chunks = self._transform_document_results(airtable_chunks)
+        airtable_chunks = await self._local_hybrid_search(
+            user_query=user_query,
+            user_id=user_id,
+            search_space_id=search_space_id,
+            document_type="AIRTABLE_CONNECTOR",
+            top_k=top_k,
+            search_mode=search_mode,
+        )
 
         # Early return if no results
         if not airtable_chunks:
@@ -1736,24 +1898,14 @@ class ConnectorService:
         Returns:
             tuple: (sources_info, langchain_documents)
         """
-        if search_mode == SearchMode.CHUNKS:
-            gmail_chunks = await self.chunk_retriever.hybrid_search(
-                query_text=user_query,
-                top_k=top_k,
-                user_id=user_id,
-                search_space_id=search_space_id,
-                document_type="GOOGLE_GMAIL_CONNECTOR",
-            )
-        elif search_mode == SearchMode.DOCUMENTS:
-            gmail_chunks = await self.document_retriever.hybrid_search(
-                query_text=user_query,
-                top_k=top_k,
-                user_id=user_id,
-                search_space_id=search_space_id,
-                document_type="GOOGLE_GMAIL_CONNECTOR",
-            )
-            # Transform document retriever results to match expected format
-            gmail_chunks = self._transform_document_results(gmail_chunks)
+        gmail_chunks = await self._local_hybrid_search(
+            user_query=user_query,
+            user_id=user_id,
+            search_space_id=search_space_id,
+            document_type="GOOGLE_GMAIL_CONNECTOR",
+            top_k=top_k,
+            search_mode=search_mode,
+        )
 
         # Early return if no results
         if not gmail_chunks:
@@ -1860,24 +2012,14 @@ class ConnectorService:
         Returns:
             tuple: (sources_info, langchain_documents)
         """
-        if search_mode == SearchMode.CHUNKS:
-            confluence_chunks = await self.chunk_retriever.hybrid_search(
-                query_text=user_query,
-                top_k=top_k,
-                user_id=user_id,
-                search_space_id=search_space_id,
-                document_type="CONFLUENCE_CONNECTOR",
-            )
-        elif search_mode == SearchMode.DOCUMENTS:
-            confluence_chunks = await self.document_retriever.hybrid_search(
-                query_text=user_query,
-                top_k=top_k,
-                user_id=user_id,
-                search_space_id=search_space_id,
-                document_type="CONFLUENCE_CONNECTOR",
-            )
-            # Transform document retriever results to match expected format
-            confluence_chunks = self._transform_document_results(confluence_chunks)
+        confluence_chunks = await self._local_hybrid_search(
+            user_query=user_query,
+            user_id=user_id,
+            search_space_id=search_space_id,
+            document_type="CONFLUENCE_CONNECTOR",
+            top_k=top_k,
+            search_mode=search_mode,
+        )
 
         # Early return if no results
         if not confluence_chunks:
@@ -1955,24 +2097,14 @@ class ConnectorService:
         Returns:
             tuple: (sources_info, langchain_documents)
         """
-        if search_mode == SearchMode.CHUNKS:
-            clickup_chunks = await self.chunk_retriever.hybrid_search(
-                query_text=user_query,
-                top_k=top_k,
-                user_id=user_id,
-                search_space_id=search_space_id,
-                document_type="CLICKUP_CONNECTOR",
-            )
-        elif search_mode == SearchMode.DOCUMENTS:
-            clickup_chunks = await self.document_retriever.hybrid_search(
-                query_text=user_query,
-                top_k=top_k,
-                user_id=user_id,
-                search_space_id=search_space_id,
-                document_type="CLICKUP_CONNECTOR",
-            )
-            # Transform document retriever results to match expected format
-            clickup_chunks = self._transform_document_results(clickup_chunks)
+        clickup_chunks = await self._local_hybrid_search(
+            user_query=user_query,
+            user_id=user_id,
+            search_space_id=search_space_id,
+            document_type="CLICKUP_CONNECTOR",
+            top_k=top_k,
+            search_mode=search_mode,
+        )
 
         # Early return if no results
         if not clickup_chunks:
@@ -2193,24 +2325,14 @@ class ConnectorService:
         Returns:
             tuple: (sources_info, langchain_documents)
         """
-        if search_mode == SearchMode.CHUNKS:
-            discord_chunks = await self.chunk_retriever.hybrid_search(
-                query_text=user_query,
-                top_k=top_k,
-                user_id=user_id,
-                search_space_id=search_space_id,
-                document_type="DISCORD_CONNECTOR",
-            )
-        elif search_mode == SearchMode.DOCUMENTS:
-            discord_chunks = await self.document_retriever.hybrid_search(
-                query_text=user_query,
-                top_k=top_k,
-                user_id=user_id,
-                search_space_id=search_space_id,
-                document_type="DISCORD_CONNECTOR",
-            )
-            # Transform document retriever results to match expected format
-            discord_chunks = self._transform_document_results(discord_chunks)
+        discord_chunks = await self._local_hybrid_search(
+            user_query=user_query,
+            user_id=user_id,
+            search_space_id=search_space_id,
+            document_type="DISCORD_CONNECTOR",
+            top_k=top_k,
+            search_mode=search_mode,
+        )
 
         # Early return if no results
         if not discord_chunks:
@@ -2291,24 +2413,14 @@ class ConnectorService:
         Returns:
             tuple: (sources_info, langchain_documents)
         """
-        if search_mode == SearchMode.CHUNKS:
-            luma_chunks = await self.chunk_retriever.hybrid_search(
-                query_text=user_query,
-                top_k=top_k,
-                user_id=user_id,
-                search_space_id=search_space_id,
-                document_type="LUMA_CONNECTOR",
-            )
-        elif search_mode == SearchMode.DOCUMENTS:
-            luma_chunks = await self.document_retriever.hybrid_search(
-                query_text=user_query,
-                top_k=top_k,
-                user_id=user_id,
-                search_space_id=search_space_id,
-                document_type="LUMA_CONNECTOR",
-            )
-            # Transform document retriever results to match expected format
-            luma_chunks = self._transform_document_results(luma_chunks)
+        luma_chunks = await self._local_hybrid_search(
+            user_query=user_query,
+            user_id=user_id,
+            search_space_id=search_space_id,
+            document_type="LUMA_CONNECTOR",
+            top_k=top_k,
+            search_mode=search_mode,
+        )
 
         # Early return if no results
         if not luma_chunks:
@@ -2449,26 +2561,14 @@ class ConnectorService:
         Returns:
             tuple: (sources_info, langchain_documents)
         """
-        if search_mode == SearchMode.CHUNKS:
-            elasticsearch_chunks = await self.chunk_retriever.hybrid_search(
-                query_text=user_query,
-                top_k=top_k,
-                user_id=user_id,
-                search_space_id=search_space_id,
-                document_type="ELASTICSEARCH_CONNECTOR",
-            )
-        elif search_mode == SearchMode.DOCUMENTS:
-            elasticsearch_chunks = await self.document_retriever.hybrid_search(
-                query_text=user_query,
-                top_k=top_k,
-                user_id=user_id,
-                search_space_id=search_space_id,
-                document_type="ELASTICSEARCH_CONNECTOR",
-            )
-            # Transform document retriever results to match expected format
-            elasticsearch_chunks = self._transform_document_results(
-                elasticsearch_chunks
-            )
+        elasticsearch_chunks = await self._local_hybrid_search(
+            user_query=user_query,
+            user_id=user_id,
+            search_space_id=search_space_id,
+            document_type="ELASTICSEARCH_CONNECTOR",
+            top_k=top_k,
+            search_mode=search_mode,
+        )
 
         # Early return if no results
         if not elasticsearch_chunks:
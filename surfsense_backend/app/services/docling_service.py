@@ -4,6 +4,7 @@ Docling Document Processing Service for SurfSense
 SSL-safe implementation with pre-downloaded models
 """
 
+import asyncio
 import logging
 import os
 import ssl
@@ -11,6 +12,49 @@ from typing import Any
 
 logger = logging.getLogger(__name__)
 
+# Documents longer than this (100K characters ≈ 25K tokens) are summarized
+# chunk by chunk
+LARGE_DOCUMENT_THRESHOLD_CHARS = 100_000
+
+# LLM-optimized chunks (8K tokens max for safety) with 10% overlap
+SUMMARY_CHUNK_SIZE = 8000
+SUMMARY_CHUNK_OVERLAP = 0.1
+
+# Tokens kept free in a combine prompt for the instructions and the output
+COMBINE_RESERVED_TOKENS = 4000
+MIN_COMBINE_BUDGET_TOKENS = 4000
+
+CHUNK_SUMMARY_TEMPLATE = """<INSTRUCTIONS>
+You are summarizing chunk {chunk_number} of {total_chunks} from a large document.
+
+Create a comprehensive summary of this document chunk. Focus on:
+- Key concepts, facts, and information
+- Important details and context
+- Main topics and themes
+
+Provide a clear, structured summary that captures the essential content.
+
+Chunk {chunk_number}/{total_chunks}:
+<document_chunk>
+{chunk}
+</document_chunk>
+</INSTRUCTIONS>"""
+
+COMBINE_SUMMARIES_TEMPLATE = """<INSTRUCTIONS>
+You are combining multiple section summaries into a final comprehensive document summary.
+
+Create a unified, coherent summary from the following section summaries of "{document_title}".
+Ensure:
+- Logical flow and organization
+- No redundancy or repetition  
+- Comprehensive coverage of all key points
+- Professional, objective tone
+
+<section_summaries>
+{summaries}
+</section_summaries>
+</INSTRUCTIONS>"""
+
 
 class DoclingService:
     """Docling service for enhanced document processing with SSL fixes."""
@@ -223,23 +267,85 @@ class DoclingService:
             raise RuntimeError(f"Docling processing failed: {e}") from e
 
     async def process_large_document_summary(
-        self, content: str, llm, document_title: str = "Document"
+        self,
+        content: str,
+        llm,
+        document_title: str = "Document",
+        session=None,
+        task_logger=None,
+        log_entry=None,
     ) -> str:
         """
         Process large documents using chunked LLM summarization.
 
+        Chunks are summarized concurrently (up to DOCUMENT_SUMMARY_CONCURRENCY
+        LLM calls at a time). If the chunk summaries overflow the model's
+        context window, they are combined in groups, level by level, before
+        the final combine, so a document takes about log(n) LLM round trips.
+
+        With a session, the summary cache is checked first, and complete
+        summaries (no failed chunk or combine step) are stored in it.
+
         Args:
             content: The full document content
             llm: The language model to use for summarization
             document_title: Title of the document for context
+            session: Optional session used to look up and store the summary in
+                the summary cache
+            task_logger: Optional TaskLoggingService to report progress through
+            log_entry: Log entry of the task (required with task_logger)
 
         Returns:
             Final summary of the document
         """
-        # Large document threshold (100K characters ≈ 25K tokens)
-        large_document_threshold = 100_000
+        if session is None:
+            summary, _ = await self._summarize_document(
+                content, llm, document_title, task_logger, log_entry
+            )
+            return summary
+
+        from app.services.summary_cache import summary_cache
+
+        cache_model = summary_cache.model_id(llm)
+        from app.prompts import SUMMARY_PROMPT_TEMPLATE
+
+        # Everything that shapes the prompts; the concurrency only changes
+        # the order of the LLM calls, not their inputs
+        cache_key = summary_cache.make_key(
+            "large_document_summary",
+            SUMMARY_PROMPT_TEMPLATE.template,
+            CHUNK_SUMMARY_TEMPLATE,
+            COMBINE_SUMMARIES_TEMPLATE,
+            LARGE_DOCUMENT_THRESHOLD_CHARS,
+            SUMMARY_CHUNK_SIZE,
+            SUMMARY_CHUNK_OVERLAP,
+            COMBINE_RESERVED_TOKENS,
+            MIN_COMBINE_BUDGET_TOKENS,
+            document_title,
+            content,
+        )
+        summary = await summary_cache.get(session, cache_model, cache_key)
+        if summary is not None:
+            logger.info(f"📋 Using cached summary for {document_title}")
+            return summary
+
+        summary, complete = await self._summarize_document(
+            content, llm, document_title, task_logger, log_entry
+        )
+        if complete:
+            await summary_cache.put(session, cache_model, cache_key, summary)
+        return summary
+
+    async def _summarize_document(
+        self, content: str, llm, document_title: str, task_logger, log_entry
+    ) -> tuple[str, bool]:
+        """
+        Summarize a document with the LLM, chunking large documents.
 
-        if len(content) <= large_document_threshold:
+        Returns:
+            Tuple of (summary, whether every LLM call succeeded)
+        """
+        if len(content) <= LARGE_DOCUMENT_THRESHOLD_CHARS:
             # For smaller documents, use direct processing
             logger.info(
                 f"📄 Document size: {len(content)} chars - using direct processing"
@@ -248,24 +354,20 @@ class DoclingService:
 
             summary_chain = SUMMARY_PROMPT_TEMPLATE | llm
             result = await summary_chain.ainvoke({"document": content})
-            return result.content
+            return result.content, True
 
         logger.info(
             f"📚 Large document detected: {len(content)} chars - using chunked processing"
         )
 
-        # Import chunker from config
-        # Create LLM-optimized chunks (8K tokens max for safety)
         from chonkie import OverlapRefinery, RecursiveChunker
         from langchain_core.prompts import PromptTemplate
 
-        llm_chunker = RecursiveChunker(
-            chunk_size=8000  # Conservative for most LLMs
-        )
+        llm_chunker = RecursiveChunker(chunk_size=SUMMARY_CHUNK_SIZE)
 
-        # Apply overlap refinery for context preservation (10% overlap = 800 tokens)
+        # Apply overlap refinery for context preservation
         overlap_refinery = OverlapRefinery(
-            context_size=0.1,  # 10% overlap for context preservation
+            context_size=SUMMARY_CHUNK_OVERLAP,
             method="suffix",  # Add next chunk context to current chunk
         )
 
@@ -279,91 +381,199 @@ class DoclingService:
         # Template for chunk processing
         chunk_template = PromptTemplate(
             input_variables=["chunk", "chunk_number", "total_chunks"],
-            template="""<INSTRUCTIONS>
-You are summarizing chunk {chunk_number} of {total_chunks} from a large document.
-
-Create a comprehensive summary of this document chunk. Focus on:
-- Key concepts, facts, and information
-- Important details and context
-- Main topics and themes
-
-Provide a clear, structured summary that captures the essential content.
-
-Chunk {chunk_number}/{total_chunks}:
-<document_chunk>
-{chunk}
-</document_chunk>
-</INSTRUCTIONS>""",
+            template=CHUNK_SUMMARY_TEMPLATE,
         )
 
-        # Process each chunk individually
-        chunk_summaries = []
-        for i, chunk in enumerate(chunks, 1):
-            try:
-                logger.info(
-                    f"🔄 Processing chunk {i}/{total_chunks} ({len(chunk.text)} chars)"
-                )
-
-                chunk_chain = chunk_template | llm
-                chunk_result = await chunk_chain.ainvoke(
-                    {
-                        "chunk": chunk.text,
-                        "chunk_number": i,
-                        "total_chunks": total_chunks,
-                    }
-                )
+        # Map: summarize the chunks concurrently, at most
+        # DOCUMENT_SUMMARY_CONCURRENCY LLM calls in flight
+        from app.config import config
 
-                chunk_summary = chunk_result.content
-                chunk_summaries.append(f"=== Section {i} ===\n{chunk_summary}")
+        semaphore = asyncio.Semaphore(max(config.DOCUMENT_SUMMARY_CONCURRENCY, 1))
+        progress = _SummaryProgress(task_logger, log_entry, total_chunks)
 
+        async def summarize_chunk(i: int, chunk) -> str | None:
+            try:
+                async with semaphore:
+                    logger.info(
+                        f"🔄 Processing chunk {i}/{total_chunks} ({len(chunk.text)} chars)"
+                    )
+                    chunk_chain = chunk_template | llm
+                    chunk_result = await chunk_chain.ainvoke(
+                        {
+                            "chunk": chunk.text,
+                            "chunk_number": i,
+                            "total_chunks": total_chunks,
+                        }
+                    )
                 logger.info(f"✅ Completed chunk {i}/{total_chunks}")
-
+                return chunk_result.content
             except Exception as e:
                 logger.error(f"❌ Failed to process chunk {i}/{total_chunks}: {e}")
-                chunk_summaries.append(f"=== Section {i} ===\n[Processing failed]")
-
-        # Combine summaries into final document summary
-        logger.info(f"🔄 Combining {len(chunk_summaries)} chunk summaries")
-
-        try:
-            combine_template = PromptTemplate(
-                input_variables=["summaries", "document_title"],
-                template="""<INSTRUCTIONS>
-You are combining multiple section summaries into a final comprehensive document summary.
-
-Create a unified, coherent summary from the following section summaries of "{document_title}".
-Ensure:
-- Logical flow and organization
-- No redundancy or repetition  
-- Comprehensive coverage of all key points
-- Professional, objective tone
+                return None
+            finally:
+                # Reported after releasing the semaphore, so waiting for the
+                # progress lock never holds back the next LLM call
+                await progress.chunk_done()
+
+        results = await asyncio.gather(
+            *(summarize_chunk(i, chunk) for i, chunk in enumerate(chunks, 1))
+        )
+        failed_chunks = sum(result is None for result in results)
+        chunk_summaries = [
+            f"=== Section {i} ===\n{result if result is not None else '[Processing failed]'}"
+            for i, result in enumerate(results, 1)
+        ]
+
+        combine_template = PromptTemplate(
+            input_variables=["summaries", "document_title"],
+            template=COMBINE_SUMMARIES_TEMPLATE,
+        )
+        combine_chain = combine_template | llm
+
+        async def combine(summaries: list[str]) -> str:
+            result = await combine_chain.ainvoke(
+                {
+                    "summaries": "\n\n".join(summaries),
+                    "document_title": document_title,
+                }
+            )
+            return result.content
 
-<section_summaries>
-{summaries}
-</section_summaries>
-</INSTRUCTIONS>""",
+        # Reduce: while the summaries overflow the context window, combine
+        # them in groups that fit (concurrently), level by level
+        budget = _reduce_token_budget(llm)
+        level = 0
+        complete = failed_chunks == 0
+        groups = _group_summaries(chunk_summaries, budget, llm)
+        while len(groups) > 1:
+            level += 1
+            logger.info(
+                f"🔄 Reduce level {level}: combining {len(chunk_summaries)} "
+                f"summaries in {len(groups)} groups"
+            )
+            await progress.report(
+                f"Combining section summaries (level {level}, {len(groups)} groups)",
+                {"reduce_level": level, "reduce_groups": len(groups)},
             )
 
-            combined_summaries = "\n\n".join(chunk_summaries)
-            combine_chain = combine_template | llm
+            async def combine_group(group: list[str]) -> str:
+                async with semaphore:
+                    return await combine(group)
 
-            final_result = await combine_chain.ainvoke(
-                {"summaries": combined_summaries, "document_title": document_title}
+            combined = await asyncio.gather(
+                *(combine_group(group) for group in groups), return_exceptions=True
             )
+            chunk_summaries = []
+            for index, (group, result) in enumerate(
+                zip(groups, combined, strict=True), 1
+            ):
+                if isinstance(result, BaseException):
+                    logger.error(f"❌ Failed to combine group {index}: {result}")
+                    complete = False
+                    result = "\n\n".join(group)
+                chunk_summaries.append(f"=== Part {index} ===\n{result}")
+            groups = _group_summaries(chunk_summaries, budget, llm)
+
+        # Combine summaries into final document summary
+        logger.info(f"🔄 Combining {len(chunk_summaries)} chunk summaries")
 
-            final_summary = final_result.content
+        try:
+            final_summary = await combine(chunk_summaries)
             logger.info(
                 f"✅ Large document processing complete: {len(final_summary)} chars summary"
             )
 
-            return final_summary
+            return final_summary, complete
 
         except Exception as e:
             logger.error(f"❌ Failed to combine summaries: {e}")
             # Fallback: return concatenated chunk summaries
             fallback_summary = "\n\n".join(chunk_summaries)
             logger.warning("⚠️ Using fallback combined summary")
-            return fallback_summary
+            return fallback_summary, False
+
+
+class _SummaryProgress:
+    """
+    Reports large-document summarization progress through TaskLoggingService.
+
+    Updates are serialized (the logger shares the indexing session, which must
+    not be used concurrently) and limited to about ten per map phase.
+    """
+
+    def __init__(self, task_logger, log_entry, total_chunks: int):
+        self.task_logger = task_logger
+        self.log_entry = log_entry
+        self.total_chunks = total_chunks
+        self.done_chunks = 0
+        self._report_every = max(total_chunks // 10, 1)
+        self._lock = asyncio.Lock()
+
+    async def chunk_done(self) -> None:
+        self.done_chunks += 1
+        if (
+            self.done_chunks % self._report_every == 0
+            or self.done_chunks == self.total_chunks
+        ):
+            await self.report(
+                f"Summarized {self.done_chunks}/{self.total_chunks} document chunks",
+                {
+                    "summarized_chunks": self.done_chunks,
+                    "total_chunks": self.total_chunks,
+                },
+            )
+
+    async def report(self, message: str, metadata: dict[str, Any]) -> None:
+        if self.task_logger is None or self.log_entry is None:
+            return
+        async with self._lock:
+            try:
+                await self.task_logger.log_task_progress(
+                    self.log_entry,
+                    message,
+                    {"processing_stage": "summarizing", **metadata},
+                )
+            except Exception as e:
+                logger.warning(f"Could not report summarization progress: {e}")
+
+
+def _reduce_token_budget(llm) -> int:
+    """Tokens of section summaries one combine prompt may hold."""
+    from app.utils.document_converters import get_model_context_window
+
+    model_name = getattr(llm, "model", "gpt-3.5-turbo")
+    context_window = get_model_context_window(model_name)
+    return max(context_window - COMBINE_RESERVED_TOKENS, MIN_COMBINE_BUDGET_TOKENS)
+
+
+def _group_summaries(summaries: list[str], budget: int, llm) -> list[list[str]]:
+    """
+    Split summaries, in order, into groups whose total tokens fit the budget.
+
+    Every group of a multi-group split has at least two summaries, so each
+    reduce level at least halves the number of summaries.
+    """
+    from app.services.tokenizer_service import get_tokenizer
+
+    tokenizer = get_tokenizer(getattr(llm, "model", "gpt-3.5-turbo"))
+    token_counts = [tokenizer.count_tokens(summary) for summary in summaries]
+    if sum(token_counts) <= budget or len(summaries) <= 1:
+        return [summaries]
+
+    groups: list[list[str]] = []
+    group: list[str] = []
+    group_tokens = 0
+    for summary, tokens in zip(summaries, token_counts, strict=True):
+        if len(group) >= 2 and group_tokens + tokens > budget:
+            groups.append(group)
+            group, group_tokens = [], 0
+        group.append(summary)
+        group_tokens += tokens
+    if len(group) == 1 and groups:
+        groups[-1].append(group[0])
+    elif group:
+        groups.append(group)
+    return groups
 
 
 def create_docling_service() -> DoclingService:
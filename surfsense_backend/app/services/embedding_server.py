@@ -0,0 +1,191 @@
+"""
+Local embedding server shared by the API and Celery worker processes.
+
+Every process that imports app.config normally loads its own copy of the
+embedding model. With EMBEDDING_BACKEND=server those processes instead get a
+RemoteEmbeddings client, and a single embedding server process (started with
+embedding_server.py) holds the model. Requests from all clients go through the
+server's EmbeddingExecutor, so concurrent requests from different workers are
+embedded together in micro-batches.
+
+The server listens on localhost HTTP or on a Unix socket. EMBEDDING_SERVER_URL
+is either "http://127.0.0.1:8002" or "unix:///path/to/embeddings.sock".
+Embeddings are returned as raw float32 bytes rather than JSON.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any
+
+import httpx
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+UNIX_SOCKET_PREFIX = "unix://"
+
+
+class RemoteEmbeddings:
+    """
+    Embeddings client for the local embedding server.
+
+    Provides the part of the chonkie embeddings interface the application uses
+    (embed, embed_batch, dimension and max_seq_length), so it can stand in for
+    config.embedding_model_instance.
+
+    dimension and max_seq_length come from the server's /info, which waits
+    (blocking) for the server to start. Processes call load_info() at startup,
+    off the event loop (see Config.load_embedding_server_info), so these
+    properties never make a request while serving.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        model: str | None = None,
+        dimension: int | None = None,
+        timeout: float = 60.0,
+        startup_timeout: float = 120.0,
+    ):
+        """
+        Initialize the client. No request is made until the model is needed.
+
+        Args:
+            url: Server URL, http://host:port or unix:///path/to/socket
+            model: Expected EMBEDDING_MODEL of the server (checked on first use)
+            dimension: Expected dimension (EMBEDDING_DIMENSION), returned by
+                dimension without asking the server and checked on first use
+            timeout: Seconds to wait for one embedding request
+            startup_timeout: Seconds to keep retrying while the server starts
+        """
+        self.url = url
+        self.model = model
+        self.expected_dimension = dimension
+        self.timeout = timeout
+        self.startup_timeout = startup_timeout
+        self._info: dict[str, Any] | None = None
+        self._client: httpx.Client | None = None
+        self._client_pid: int | None = None
+        self._lock = threading.Lock()
+
+    def _get_client(self) -> httpx.Client:
+        """Return the HTTP client, creating a new one after a fork."""
+        pid = os.getpid()
+        if self._client is None or self._client_pid != pid:
+            with self._lock:
+                if self._client is None or self._client_pid != pid:
+                    if self.url.startswith(UNIX_SOCKET_PREFIX):
+                        transport = httpx.HTTPTransport(
+                            uds=self.url[len(UNIX_SOCKET_PREFIX) :]
+                        )
+                        base_url = "http://embedding-server"
+                    else:
+                        transport = httpx.HTTPTransport(retries=2)
+                        base_url = self.url
+                    self._client = httpx.Client(
+                        base_url=base_url, transport=transport, timeout=self.timeout
+                    )
+                    self._client_pid = pid
+        return self._client
+
+    def load_info(self) -> dict[str, Any]:
+        """Fetch the served model's name and dimensions, waiting for the server to start."""
+        if self._info is not None:
+            return self._info
+
+        deadline = time.monotonic() + self.startup_timeout
+        while True:
+            try:
+                response = self._get_client().get("/info")
+                response.raise_for_status()
+                break
+            except httpx.TransportError as e:
+                if time.monotonic() >= deadline:
+                    raise RuntimeError(
+                        f"Embedding server at {self.url} is not reachable: {e!s}"
+                    ) from e
+                logger.info("Waiting for the embedding server at %s...", self.url)
+                time.sleep(1)
+
+        info = response.json()
+        if self.model and info.get("model") != self.model:
+            raise RuntimeError(
+                f"Embedding server at {self.url} serves {info.get('model')!r}, "
+                f"but EMBEDDING_MODEL is {self.model!r}"
+            )
+        if self.expected_dimension and info.get("dimension") != self.expected_dimension:
+            raise RuntimeError(
+                f"Embedding server at {self.url} serves {info.get('dimension')} "
+                f"dimensions, but EMBEDDING_DIMENSION is {self.expected_dimension}"
+            )
+        self._info = info
+        return info
+
+    @property
+    def dimension(self) -> int:
+        return self.expected_dimension or self.load_info()["dimension"]
+
+    @property
+    def max_seq_length(self) -> int:
+        return self.load_info().get("max_seq_length") or 512
+
+    def embed_batch(self, texts: list[str]) -> list[np.ndarray]:
+        """Embed texts on the server; returns one float32 vector per text."""
+        if not texts:
+            return []
+
+        dimension = self.dimension
+        response = self._get_client().post("/embed", json={"texts": list(texts)})
+        response.raise_for_status()
+        matrix = np.frombuffer(response.content, dtype=np.float32).reshape(
+            len(texts), dimension
+        )
+        return list(matrix)
+
+    def embed(self, text: str) -> np.ndarray:
+        """Embed a single text on the server."""
+        return self.embed_batch([text])[0]
+
+
+def create_embedding_server_app():
+    """
+    Build the embedding server's FastAPI app.
+
+    Must run in a process with EMBEDDING_BACKEND=local, which loads the model.
+    """
+    from fastapi import FastAPI, HTTPException
+    from fastapi.responses import Response
+    from pydantic import BaseModel
+
+    from app.config import config
+    from app.services.embedding_service import embedding_executor
+
+    class EmbedRequest(BaseModel):
+        texts: list[str]
+
+    app = FastAPI(title="SurfSense embedding server")
+    model = config.embedding_model_instance
+
+    @app.get("/info")
+    async def info() -> dict[str, Any]:
+        return {
+            "model": config.EMBEDDING_MODEL,
+            "dimension": model.dimension,
+            "max_seq_length": getattr(model, "max_seq_length", None),
+        }
+
+    @app.post("/embed")
+    async def embed(request: EmbedRequest) -> Response:
+        if not request.texts:
+            raise HTTPException(status_code=400, detail="texts must not be empty")
+        embeddings = await embedding_executor.embed_batch(request.texts)
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        return Response(content=matrix.tobytes(), media_type="application/octet-stream")
+
+    @app.get("/stats")
+    async def stats() -> dict[str, Any]:
+        return embedding_executor.get_stats()
+
+    return app
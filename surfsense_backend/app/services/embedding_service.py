@@ -0,0 +1,463 @@
+import asyncio
+import hashlib
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import config
+
+logger = logging.getLogger(__name__)
+
+
+class QueryEmbeddingCache:
+    """
+    Process-level LRU + TTL cache for query embeddings.
+
+    One chat turn searches the same research questions across many connectors,
+    and every hybrid search used to embed the query again. Entries are keyed by
+    the embedding model and the whitespace-normalized query text.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 3600):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of embeddings kept in memory
+            ttl_seconds: Seconds after which an entry is recomputed
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[tuple[str, str], tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def normalize(query_text: str) -> str:
+        """Collapse whitespace so trivially different queries share an entry."""
+        return " ".join(query_text.split())
+
+    def get(self, model_name: str, query_text: str) -> Any | None:
+        """Return a cached embedding or None, updating hit/miss counters."""
+        key = (model_name, self.normalize(query_text))
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                created_at, embedding = entry
+                if now - created_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return embedding
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, model_name: str, query_text: str, embedding: Any) -> None:
+        """Store an embedding, evicting the least recently used entries."""
+        if self.max_size <= 0:
+            return
+
+        key = (model_name, self.normalize(query_text))
+        with self._lock:
+            self._entries[key] = (time.monotonic(), embedding)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all cached embeddings (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> dict[str, Any]:
+        """Return hit/miss counters and the current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+query_embedding_cache = QueryEmbeddingCache(
+    max_size=config.QUERY_EMBEDDING_CACHE_SIZE,
+    ttl_seconds=config.QUERY_EMBEDDING_CACHE_TTL_SECONDS,
+)
+
+
+@dataclass
+class _EmbeddingRequest:
+    texts: list[str]
+    future: Future
+    submitted_at: float = field(default_factory=time.monotonic)
+
+
+class EmbeddingExecutor:
+    """
+    Runs embedding model calls on dedicated worker threads, off the event loop.
+
+    Embedding is a blocking CPU/GPU (or network) call. Made directly inside an
+    async function it stalls every other request served by the same event loop
+    for its whole duration. Callers instead await a future while a worker
+    thread runs the model.
+
+    Requests wait in a bounded queue. A worker takes the first waiting request,
+    then keeps collecting requests for up to max_wait_ms or until max_batch_size
+    texts are gathered, and embeds them all with one embed_batch call. Embeddings
+    requested concurrently by different users or tasks thus share a batch.
+    Requests are never split, so a batch may exceed max_batch_size by the size
+    of its last request.
+
+    Worker threads are started on first use, i.e. after a Celery prefork child
+    has been forked.
+    """
+
+    def __init__(
+        self,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5,
+        max_queue_size: int = 256,
+        workers: int = 1,
+    ):
+        """
+        Initialize the executor.
+
+        Args:
+            max_batch_size: Texts collected into one model call
+            max_wait_ms: How long a worker waits for more requests to join a batch
+            max_queue_size: Requests that may wait before submitters are throttled
+            workers: Number of worker threads calling the model
+        """
+        self.max_batch_size = max(max_batch_size, 1)
+        self.max_wait_seconds = max_wait_ms / 1000
+        self.workers = max(workers, 1)
+        self._queue: queue.Queue[_EmbeddingRequest] = queue.Queue(
+            maxsize=max_queue_size
+        )
+        self._threads: list[threading.Thread] = []
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.requests = 0
+        self.texts = 0
+        self.batches = 0
+        self.max_batch_texts = 0
+        self.errors = 0
+        self.queue_wait_seconds = 0.0
+        self.embed_seconds = 0.0
+
+    def _ensure_started(self) -> None:
+        if len(self._threads) >= self.workers:
+            return
+        with self._start_lock:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(
+                    target=self._run,
+                    name=f"embedding-worker-{len(self._threads)}",
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    async def embed_batch(self, texts: list[str]) -> list[Any]:
+        """
+        Embed texts on a worker thread without blocking the event loop.
+
+        Args:
+            texts: The texts to embed
+
+        Returns:
+            The embeddings, in the order of texts
+        """
+        if not texts:
+            return []
+
+        self._ensure_started()
+        request = _EmbeddingRequest(texts=list(texts), future=Future())
+        try:
+            self._queue.put_nowait(request)
+        except queue.Full:
+            # Wait for room on a helper thread rather than on the event loop
+            await asyncio.to_thread(self._queue.put, request)
+        return await asyncio.wrap_future(request.future)
+
+    async def embed(self, text: str) -> Any:
+        """Embed a single text on a worker thread."""
+        return (await self.embed_batch([text]))[0]
+
+    def _collect_batch(self) -> list[_EmbeddingRequest]:
+        """Block for one request, then gather more until the batch is full or the wait ends."""
+        batch = [self._queue.get()]
+        size = len(batch[0].texts)
+        deadline = time.monotonic() + self.max_wait_seconds
+
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(request)
+            size += len(request.texts)
+
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect_batch()
+            # Skip requests whose callers were cancelled while waiting
+            batch = [
+                request
+                for request in batch
+                if request.future.set_running_or_notify_cancel()
+            ]
+            if batch:
+                self._process(batch)
+
+    def _process(self, batch: list[_EmbeddingRequest]) -> None:
+        started_at = time.monotonic()
+        texts = [text for request in batch for text in request.texts]
+        try:
+            embeddings = config.embedding_model_instance.embed_batch(texts)
+        except Exception as e:
+            with self._stats_lock:
+                self.errors += 1
+            for request in batch:
+                request.future.set_exception(e)
+            return
+
+        offset = 0
+        for request in batch:
+            request.future.set_result(
+                list(embeddings[offset : offset + len(request.texts)])
+            )
+            offset += len(request.texts)
+
+        with self._stats_lock:
+            self.requests += len(batch)
+            self.texts += len(texts)
+            self.batches += 1
+            self.max_batch_texts = max(self.max_batch_texts, len(texts))
+            self.queue_wait_seconds += sum(
+                started_at - request.submitted_at for request in batch
+            )
+            self.embed_seconds += time.monotonic() - started_at
+
+        logger.debug(
+            "Embedded %s texts from %s requests (queue depth %s)",
+            len(texts),
+            len(batch),
+            self._queue.qsize(),
+        )
+
+    def get_stats(self) -> dict[str, Any]:
+        """Return queue depth, batch size and latency counters."""
+        with self._stats_lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "max_queue_size": self._queue.maxsize,
+                "workers": len(self._threads),
+                "requests": self.requests,
+                "texts": self.texts,
+                "batches": self.batches,
+                "errors": self.errors,
+                "avg_batch_texts": self.texts / self.batches if self.batches else 0.0,
+                "max_batch_texts": self.max_batch_texts,
+                "avg_requests_per_batch": self.requests / self.batches
+                if self.batches
+                else 0.0,
+                "avg_queue_wait_ms": self.queue_wait_seconds / self.requests * 1000
+                if self.requests
+                else 0.0,
+                "avg_embed_ms": self.embed_seconds / self.batches * 1000
+                if self.batches
+                else 0.0,
+            }
+
+
+embedding_executor = EmbeddingExecutor(
+    max_batch_size=config.EMBEDDING_BATCH_SIZE,
+    max_wait_ms=config.EMBEDDING_MAX_WAIT_MS,
+    max_queue_size=config.EMBEDDING_QUEUE_SIZE,
+    workers=config.EMBEDDING_EXECUTOR_WORKERS,
+)
+
+
+async def embed_query(query_text: str) -> Any:
+    """
+    Embed a search query, reusing the cached embedding when available.
+
+    Args:
+        query_text: The search query text
+
+    Returns:
+        The query embedding produced by the configured embedding model
+    """
+    model_name = config.EMBEDDING_MODEL or ""
+
+    embedding = query_embedding_cache.get(model_name, query_text)
+    if embedding is None:
+        embedding = await embedding_executor.embed(query_text)
+        query_embedding_cache.put(model_name, query_text, embedding)
+        logger.debug(
+            "Query embedding cache miss (%s)", query_embedding_cache.get_stats()
+        )
+
+    return embedding
+
+
+async def embed_queries(query_texts: list[str]) -> list[Any]:
+    """
+    Embed several search queries, embedding all cache misses in one batch call.
+
+    Args:
+        query_texts: The search query texts
+
+    Returns:
+        The query embeddings, in the order of query_texts
+    """
+    model_name = config.EMBEDDING_MODEL or ""
+
+    embeddings = {}
+    for query_text in query_texts:
+        if query_text not in embeddings:
+            embeddings[query_text] = query_embedding_cache.get(model_name, query_text)
+
+    # Each distinct missing query is embedded once, in a single batch
+    missing = [text for text, embedding in embeddings.items() if embedding is None]
+    if missing:
+        batch = await embedding_executor.embed_batch(missing)
+        for query_text, embedding in zip(missing, batch, strict=True):
+            embeddings[query_text] = embedding
+            query_embedding_cache.put(model_name, query_text, embedding)
+
+    return [embeddings[query_text] for query_text in query_texts]
+
+
+async def embed_texts(texts: list[str], batch_size: int | None = None) -> list[Any]:
+    """
+    Embed document texts (e.g. chunks) with batched model calls.
+
+    Texts are sorted by length before they are split into batches, so each
+    batch holds texts of similar length and models that pad every input to the
+    longest one in its batch waste little work on padding. Identical texts are
+    embedded once. The batches run on the embedding executor.
+
+    Args:
+        texts: The texts to embed
+        batch_size: Texts per embed_batch call (defaults to EMBEDDING_BATCH_SIZE)
+
+    Returns:
+        The embeddings, in the order of texts
+    """
+    batch_size = max(batch_size or config.EMBEDDING_BATCH_SIZE, 1)
+
+    distinct = sorted(dict.fromkeys(texts), key=len, reverse=True)
+    batches = [
+        distinct[start : start + batch_size]
+        for start in range(0, len(distinct), batch_size)
+    ]
+    batch_embeddings = await asyncio.gather(
+        *(embedding_executor.embed_batch(batch) for batch in batches)
+    )
+
+    embeddings = {}
+    for batch, embedded in zip(batches, batch_embeddings, strict=True):
+        embeddings.update(zip(batch, embedded, strict=True))
+
+    return [embeddings[text] for text in texts]
+
+
+# Rows per INSERT into embedding_cache, well below asyncpg's bind parameter limit
+EMBEDDING_CACHE_INSERT_BATCH_SIZE = 1000
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 hex digest identifying a text in the embedding cache."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+async def embed_texts_cached(session: AsyncSession, texts: list[str]) -> list[Any]:
+    """
+    Embed document texts, reusing embeddings stored in the embedding_cache table.
+
+    Texts are looked up by (embedding model, SHA-256 of the text). Only texts
+    without a stored embedding are sent to the model, and their embeddings are
+    added to the table in the caller's transaction. Re-indexing an edited
+    document therefore embeds only the chunks whose text changed.
+
+    Args:
+        session: The session of the indexing transaction
+        texts: The texts to embed
+
+    Returns:
+        The embeddings, in the order of texts
+    """
+    from sqlalchemy import select
+    from sqlalchemy.dialects.postgresql import insert
+
+    from app.db import EmbeddingCacheEntry
+
+    if not texts:
+        return []
+
+    model_name = config.EMBEDDING_MODEL or ""
+    hashes = {text: content_hash(text) for text in texts}
+
+    result = await session.execute(
+        select(EmbeddingCacheEntry.content_hash, EmbeddingCacheEntry.embedding).where(
+            EmbeddingCacheEntry.model == model_name,
+            EmbeddingCacheEntry.content_hash.in_(sorted(set(hashes.values()))),
+        )
+    )
+    cached = dict(result.all())
+
+    missing = [text for text, text_hash in hashes.items() if text_hash not in cached]
+    if missing:
+        for text, embedding in zip(missing, await embed_texts(missing), strict=True):
+            cached[hashes[text]] = embedding
+
+        # Sorted so concurrent indexers take the unique index locks in one order
+        rows = sorted(
+            (
+                {
+                    "model": model_name,
+                    "content_hash": hashes[text],
+                    "embedding": cached[hashes[text]],
+                }
+                for text in missing
+            ),
+            key=lambda row: row["content_hash"],
+        )
+        for start in range(0, len(rows), EMBEDDING_CACHE_INSERT_BATCH_SIZE):
+            await session.execute(
+                insert(EmbeddingCacheEntry)
+                .values(rows[start : start + EMBEDDING_CACHE_INSERT_BATCH_SIZE])
+                .on_conflict_do_nothing(
+                    constraint="uq_embedding_cache_model_content_hash"
+                )
+            )
+
+    logger.debug(
+        "Embedding cache: %s of %s texts reused",
+        len(hashes) - len(missing),
+        len(hashes),
+    )
+    return [cached[hashes[text]] for text in texts]
@@ -1,4 +1,8 @@
 import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
 
 import litellm
 from langchain_core.messages import HumanMessage
@@ -7,7 +11,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from app.config import config
-from app.db import LLMConfig, UserSearchSpacePreference
+from app.db import LLMConfig, SearchSpace, UserSearchSpacePreference
 
 # Configure litellm to automatically drop unsupported parameters
 litellm.drop_params = True
@@ -21,6 +25,132 @@ class LLMRole:
     STRATEGIC = "strategic"
 
 
+# Cache role of the response language resolved from the preferred LLM configs
+LANGUAGE_CACHE_ROLE = "language"
+
+
+class LLMInstanceCache:
+    """
+    Process-level LRU + TTL cache of resolved per-user LLM settings.
+
+    Keys are (user_id, search_space_id, role, llm_config_version); values
+    are ChatLiteLLM instances (or the response language for
+    LANGUAGE_CACHE_ROLE). After warm-up, a chat turn or an indexing run
+    resolves its LLMs with a single primary-key read of the search space's
+    llm_config_version instead of the preference and LLM config queries.
+
+    Database triggers bump llm_config_version on every change to the space's
+    LLM configs or preferences, so every process (API and Celery workers)
+    stops using the old entries as soon as the change commits. The old entries
+    age out through the LRU and TTL; llm_config_routes also drops them from
+    the process that handled the change right away.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 300):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of entries (0 disables the cache)
+            ttl_seconds: Seconds after which an entry is resolved again
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(
+        user_id, search_space_id: int, role: str, llm_config_version: int
+    ) -> tuple:
+        # User IDs arrive both as UUID objects and as strings
+        return (str(user_id), int(search_space_id), role, llm_config_version)
+
+    def get(self, key: tuple) -> tuple[bool, Any]:
+        """Return (found, value); value may be None for a cached language."""
+        if self.max_size <= 0:
+            return False, None
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                created_at, value = entry
+                if now - created_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key: tuple, value: Any) -> None:
+        if self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, search_space_id: int, user_id=None) -> None:
+        """
+        Drop the entries of a search space, optionally only those of one user.
+
+        Preference changes affect one user; LLM config changes affect every
+        user of the search space (configs are shared, and the language falls
+        back to the first config of the space).
+        """
+        search_space_id = int(search_space_id)
+        user_id = str(user_id) if user_id is not None else None
+        with self._lock:
+            stale = [
+                key
+                for key in self._entries
+                if key[1] == search_space_id and (user_id is None or key[0] == user_id)
+            ]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> dict[str, Any]:
+        """Return hit/miss counters and the current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+llm_instance_cache = LLMInstanceCache(
+    max_size=config.LLM_INSTANCE_CACHE_SIZE,
+    ttl_seconds=config.LLM_INSTANCE_CACHE_TTL_SECONDS,
+)
+
+
+async def _get_llm_config_version(
+    session: AsyncSession, search_space_id: int
+) -> int | None:
+    """Return the search space's llm_config_version, or None if it does not exist."""
+    result = await session.execute(
+        select(SearchSpace.llm_config_version).where(SearchSpace.id == search_space_id)
+    )
+    return result.scalar()
+
+
 def get_global_llm_config(llm_config_id: int) -> dict | None:
     """
     Get a global LLM configuration by ID.
@@ -150,6 +280,10 @@ async def get_user_llm_instance(
     """
     Get a ChatLiteLLM instance for a specific user, search space, and role.
 
+    Resolved instances are shared through llm_instance_cache, keyed on the
+    search space's llm_config_version; a missing or invalid configuration is
+    not cached, so fixing it takes effect at once.
+
     Args:
         session: Database session
         user_id: User ID
@@ -159,6 +293,28 @@ async def get_user_llm_instance(
     Returns:
         ChatLiteLLM instance or None if not found
     """
+    llm_config_version = await _get_llm_config_version(session, search_space_id)
+    if llm_config_version is None:
+        logger.error(f"Search space {search_space_id} not found")
+        return None
+
+    cache_key = llm_instance_cache.make_key(
+        user_id, search_space_id, role, llm_config_version
+    )
+    found, llm = llm_instance_cache.get(cache_key)
+    if found:
+        return llm
+
+    llm = await _resolve_user_llm_instance(session, user_id, search_space_id, role)
+    if llm is not None:
+        llm_instance_cache.put(cache_key, llm)
+    return llm
+
+
+async def _resolve_user_llm_instance(
+    session: AsyncSession, user_id: str, search_space_id: int, role: str
+) -> ChatLiteLLM | None:
+    """Build the ChatLiteLLM instance of a role from the preferences and configs."""
     try:
         # Get user's LLM preferences for this search space
         result = await session.execute(
@@ -359,3 +515,80 @@ async def get_user_strategic_llm(
     return await get_user_llm_instance(
         session, user_id, search_space_id, LLMRole.STRATEGIC
     )
+
+
+async def get_user_search_space_language(
+    session: AsyncSession, user_id: str, search_space_id: int
+) -> str | None:
+    """
+    Get the response language of a user's preferred LLM configs in a search space.
+
+    The first language set on the fast, long context or strategic LLM config
+    wins; otherwise the language of the search space's first LLM config is
+    used. Cached in llm_instance_cache like the LLM instances.
+
+    Args:
+        session: Database session
+        user_id: User ID
+        search_space_id: Search Space ID
+
+    Returns:
+        The language, or None if no config sets one
+    """
+    llm_config_version = await _get_llm_config_version(session, search_space_id)
+    if llm_config_version is None:
+        return None
+
+    cache_key = llm_instance_cache.make_key(
+        user_id, search_space_id, LANGUAGE_CACHE_ROLE, llm_config_version
+    )
+    found, language = llm_instance_cache.get(cache_key)
+    if found:
+        return language
+
+    result = await session.execute(
+        select(UserSearchSpacePreference).where(
+            UserSearchSpacePreference.user_id == user_id,
+            UserSearchSpacePreference.search_space_id == search_space_id,
+        )
+    )
+    preference = result.scalars().first()
+
+    language = None
+    if preference:
+        result = await session.execute(
+            select(LLMConfig)
+            .where(LLMConfig.search_space_id == search_space_id)
+            .order_by(LLMConfig.id)
+        )
+        llm_configs = result.scalars().all()
+
+        if llm_configs:
+            for llm_id in [
+                preference.fast_llm_id,
+                preference.long_context_llm_id,
+                preference.strategic_llm_id,
+            ]:
+                if llm_id is None:
+                    continue
+                if llm_id < 0:
+                    global_config = get_global_llm_config(llm_id)
+                    language = global_config.get("language") if global_config else None
+                else:
+                    language = next(
+                        (
+                            llm_config.language
+                            for llm_config in llm_configs
+                            if llm_config.id == llm_id
+                            and getattr(llm_config, "language", None)
+                        ),
+                        None,
+                    )
+                if language:
+                    break
+
+            if not language:
+                language = getattr(llm_configs[0], "language", None)
+
+    llm_instance_cache.put(cache_key, language)
+    return language
@@ -0,0 +1,73 @@
+import logging
+import os
+import threading
+import time
+from typing import Any
+
+from app.config import config
+
+logger = logging.getLogger(__name__)
+
+_logging_lock = threading.Lock()
+_logging_started = False
+
+
+def collect_runtime_stats() -> dict[str, Any]:
+    """
+    Collect the counters of this process's embedding executor, caches and
+    semantic candidate fill.
+
+    Every counter is per process: each API worker and Celery worker process
+    reports its own.
+    """
+    from app.retriver.vector_search_settings import candidate_fill_stats
+    from app.services.embedding_service import (
+        embedding_executor,
+        query_embedding_cache,
+    )
+    from app.services.llm_service import llm_instance_cache
+    from app.services.search_result_cache import search_result_cache
+    from app.services.summary_cache import summary_cache
+
+    return {
+        "pid": os.getpid(),
+        "embedding_executor": embedding_executor.get_stats(),
+        "query_embedding_cache": query_embedding_cache.get_stats(),
+        "summary_cache": summary_cache.get_stats(),
+        "search_result_cache": search_result_cache.get_stats(),
+        "llm_instance_cache": llm_instance_cache.get_stats(),
+        "candidate_fill": candidate_fill_stats.get_stats(),
+    }
+
+
+def start_runtime_stats_logging(process_name: str) -> None:
+    """
+    Log collect_runtime_stats() every RUNTIME_STATS_LOG_INTERVAL_SECONDS from a
+    daemon thread, so processes without the stats route (Celery workers) are
+    covered too. Starts at most once per process; an interval of 0 disables it.
+
+    Args:
+        process_name: Prefix of the log line, e.g. "API" or "Celery worker"
+    """
+    global _logging_started
+
+    interval = config.RUNTIME_STATS_LOG_INTERVAL_SECONDS
+    if interval <= 0:
+        return
+
+    with _logging_lock:
+        if _logging_started:
+            return
+        _logging_started = True
+
+    def log_periodically() -> None:
+        while True:
+            time.sleep(interval)
+            try:
+                logger.info(
+                    "%s runtime stats: %s", process_name, collect_runtime_stats()
+                )
+            except Exception as e:
+                logger.warning(f"Failed to collect runtime stats: {e!s}")
+
+    threading.Thread(target=log_periodically, name="runtime-stats", daemon=True).start()
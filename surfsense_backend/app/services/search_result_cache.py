@@ -0,0 +1,227 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from app.config import config
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "surfsense:search_results:"
+
+
+class SearchResultCache:
+    """
+    Process-level LRU + TTL cache for local hybrid search results, with an
+    optional Redis tier shared between workers.
+
+    Keys include the search space's index generation, which database triggers
+    advance on every write to its documents or chunks. A write therefore makes
+    all earlier entries for that space unreachable instead of stale; they age
+    out through the LRU and TTL.
+
+    Entries are stored as JSON so every hit returns fresh objects that callers
+    may modify freely.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 512,
+        ttl_seconds: float = 600,
+        redis_url: str | None = None,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of result lists kept in memory (0 disables the cache)
+            ttl_seconds: Seconds after which an entry is recomputed
+            redis_url: Optional Redis URL for the shared tier
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.redis_url = redis_url
+        self._redis = None
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.redis_errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    @staticmethod
+    def make_key(**fields: Any) -> str:
+        """
+        Build a cache key from everything that determines a result list.
+
+        Args:
+            **fields: JSON-serializable key fields (query, search space,
+                generation, document type, top_k, search mode, ...)
+
+        Returns:
+            Hex digest identifying the result list
+        """
+        if isinstance(fields.get("query"), str):
+            # Collapse whitespace so trivially different queries share an entry
+            fields["query"] = " ".join(fields["query"].split())
+        payload = json.dumps(fields, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _get_redis(self):
+        """Create the Redis client on first use."""
+        if self._redis is None:
+            import redis.asyncio as redis
+
+            self._redis = redis.Redis.from_url(self.redis_url)
+        return self._redis
+
+    def _get_local(self, key: str) -> str | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                created_at, payload = entry
+                if now - created_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    return payload
+                del self._entries[key]
+            return None
+
+    def _put_local(self, key: str, payload: str) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    async def get(self, key: str) -> list[dict[str, Any]] | None:
+        """Return cached results or None, checking memory first and then Redis."""
+        if not self.enabled:
+            return None
+
+        payload = self._get_local(key)
+        if payload is not None:
+            with self._lock:
+                self.hits += 1
+            return json.loads(payload)
+
+        if self.redis_url:
+            try:
+                payload = await self._get_redis().get(REDIS_KEY_PREFIX + key)
+            except Exception as e:
+                self.redis_errors += 1
+                logger.warning(f"Search result cache Redis read failed: {e!s}")
+                payload = None
+            if payload is not None:
+                payload = payload.decode() if isinstance(payload, bytes) else payload
+                self._put_local(key, payload)
+                with self._lock:
+                    self.redis_hits += 1
+                return json.loads(payload)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    async def put(self, key: str, results: list[dict[str, Any]]) -> None:
+        """Store results in memory and, when configured, in Redis."""
+        if not self.enabled:
+            return
+
+        try:
+            payload = json.dumps(results)
+        except (TypeError, ValueError):
+            # Results that are not JSON-serializable are simply not cached
+            logger.debug("Search results are not JSON-serializable; not caching")
+            return
+
+        self._put_local(key, payload)
+
+        if self.redis_url:
+            try:
+                await self._get_redis().set(
+                    REDIS_KEY_PREFIX + key, payload, ex=max(int(self.ttl_seconds), 1)
+                )
+            except Exception as e:
+                self.redis_errors += 1
+                logger.warning(f"Search result cache Redis write failed: {e!s}")
+
+    def clear(self) -> None:
+        """Drop all in-memory entries (counters and Redis entries are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> dict[str, Any]:
+        """Return hit/miss counters and the current in-memory size."""
+        with self._lock:
+            lookups = self.hits + self.redis_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "redis_hits": self.redis_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "redis_errors": self.redis_errors,
+                "hit_rate": (self.hits + self.redis_hits) / lookups if lookups else 0.0,
+            }
+
+
+async def compact_index_writes(session) -> int:
+    """
+    Fold the recorded index writes into searchspaces.index_generation.
+
+    The rows are deleted and counted into index_generation in one statement,
+    so the index generation of every search space stays the same. Rows of
+    writers that have not committed yet are not visible here and are folded in
+    by a later run.
+
+    Args:
+        session: Session to run the statement in (committed here)
+
+    Returns:
+        Number of folded index writes
+    """
+    from sqlalchemy import text
+
+    result = await session.execute(
+        text(
+            """
+            WITH folded AS (
+                DELETE FROM search_space_index_writes
+                RETURNING search_space_id
+            ), counts AS (
+                SELECT search_space_id, count(*) AS writes
+                FROM folded
+                GROUP BY search_space_id
+            ), updated AS (
+                UPDATE searchspaces
+                SET index_generation = index_generation + counts.writes
+                FROM counts
+                WHERE searchspaces.id = counts.search_space_id
+            )
+            SELECT coalesce(sum(writes), 0) FROM counts
+            """
+        )
+    )
+    await session.commit()
+
+    folded = int(result.scalar())
+    logger.info(f"Folded {folded} index writes into search space generations")
+    return folded
+
+
+search_result_cache = SearchResultCache(
+    max_size=config.SEARCH_RESULT_CACHE_SIZE,
+    ttl_seconds=config.SEARCH_RESULT_CACHE_TTL_SECONDS,
+    redis_url=config.SEARCH_RESULT_CACHE_REDIS_URL,
+)
@@ -0,0 +1,175 @@
+"""
+Persistent cache of LLM document summaries.
+
+Re-indexing, re-crawling a page or uploading the same file to another search
+space produces the exact same summarization prompt again. Summaries are
+stored in the summary_cache table by (LLM model, SHA-256 of the prompt input),
+so such repeats skip the long-context LLM call.
+
+Entries are written in the caller's indexing transaction, like the embedding
+cache, and never updated afterwards. The evict_summary_cache Celery beat task
+deletes entries older than SUMMARY_CACHE_MAX_AGE_DAYS and the oldest entries
+beyond SUMMARY_CACHE_MAX_ENTRIES.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import config
+
+logger = logging.getLogger(__name__)
+
+
+class SummaryCache:
+    """Summary lookups and stores against the summary_cache table, with hit counters."""
+
+    def __init__(self, enabled: bool = True):
+        """
+        Initialize the cache.
+
+        Args:
+            enabled: Whether summaries are looked up and stored at all
+        """
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """
+        Hash everything that determines a summary into a cache key.
+
+        Args:
+            *parts: JSON-serializable prompt inputs (prompt kind and template,
+                optimized document content, metadata, ...)
+
+        Returns:
+            Hex SHA-256 digest of the parts
+        """
+        payload = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @staticmethod
+    def model_id(llm) -> str:
+        """
+        Identify the model behind an LLM instance.
+
+        The API base is included so the same model name served by different
+        endpoints (e.g. two Ollama hosts) does not share entries.
+        """
+        model_name = getattr(llm, "model", None) or getattr(llm, "model_name", "")
+        api_base = getattr(llm, "api_base", None)
+        return f"{model_name}@{api_base}" if api_base else str(model_name)
+
+    async def get(self, session: AsyncSession, model: str, key: str) -> str | None:
+        """Return the stored summary for (model, key), or None."""
+        if not self.enabled:
+            return None
+
+        from sqlalchemy import select
+
+        from app.db import SummaryCacheEntry
+
+        result = await session.execute(
+            select(SummaryCacheEntry.summary).where(
+                SummaryCacheEntry.model == model,
+                SummaryCacheEntry.input_hash == key,
+            )
+        )
+        summary = result.scalar_one_or_none()
+
+        with self._lock:
+            if summary is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return summary
+
+    async def put(
+        self, session: AsyncSession, model: str, key: str, summary: str
+    ) -> None:
+        """Store a summary in the caller's transaction (first writer wins)."""
+        if not self.enabled or not summary:
+            return
+
+        from sqlalchemy.dialects.postgresql import insert
+
+        from app.db import SummaryCacheEntry
+
+        await session.execute(
+            insert(SummaryCacheEntry)
+            .values(model=model, input_hash=key, summary=summary)
+            .on_conflict_do_nothing(constraint="uq_summary_cache_model_input_hash")
+        )
+        with self._lock:
+            self.stores += 1
+
+    def get_stats(self) -> dict[str, Any]:
+        """Return this process's hit/miss counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+async def evict_summary_cache(
+    session: AsyncSession, max_age_days: float, max_entries: int
+) -> int:
+    """
+    Delete expired summaries, then the oldest ones beyond max_entries.
+
+    Args:
+        session: Session to run the deletes in (committed here)
+        max_age_days: Entries created longer ago than this are deleted
+        max_entries: Number of newest entries kept
+
+    Returns:
+        Number of deleted entries
+    """
+    from sqlalchemy import delete, select
+
+    from app.db import SummaryCacheEntry
+
+    expired = await session.execute(
+        delete(SummaryCacheEntry).where(
+            SummaryCacheEntry.created_at
+            < datetime.now(UTC) - timedelta(days=max_age_days)
+        )
+    )
+
+    # IDs grow with insertion, so everything up to the first ID past the
+    # max_entries newest entries is the oldest overflow
+    cutoff = (
+        select(SummaryCacheEntry.id)
+        .order_by(SummaryCacheEntry.id.desc())
+        .offset(max_entries)
+        .limit(1)
+        .scalar_subquery()
+    )
+    overflow = await session.execute(
+        delete(SummaryCacheEntry).where(SummaryCacheEntry.id <= cutoff)
+    )
+    await session.commit()
+
+    deleted = expired.rowcount + overflow.rowcount
+    logger.info(
+        f"Summary cache eviction removed {deleted} entries "
+        f"({expired.rowcount} expired, {overflow.rowcount} over the size limit)"
+    )
+    return deleted
+
+
+summary_cache = SummaryCache(enabled=config.SUMMARY_CACHE_ENABLED)
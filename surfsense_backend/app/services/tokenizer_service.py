@@ -0,0 +1,178 @@
+"""
+Tokenizer service for fitting text into a model's context window.
+
+Text is tokenized once with the same tokenizer litellm's token_counter uses
+for the model, keeping the character offset at which each token ends. The
+token count and the truncation to any token budget then come from those
+offsets instead of re-tokenizing ever-larger prefixes of the text.
+
+Chunks and documents also store their token counts per tokenizer family
+(computed at ingest for the models in TOKEN_COUNT_MODELS), so prompt packing
+can sum stored counts instead of tokenizing retrieved text on every request.
+"""
+
+import functools
+import hashlib
+import itertools
+import logging
+from typing import Any
+
+from litellm import token_counter
+
+from app.config import config
+
+logger = logging.getLogger(__name__)
+
+# Used when litellm cannot select a model's tokenizer
+FALLBACK_ENCODING = "cl100k_base"
+_fallback_logged = False
+
+
+class TokenizedText:
+    """Text with the character offset at which each of its tokens ends."""
+
+    __slots__ = ("_token_ends", "text")
+
+    def __init__(self, text: str, token_ends: list[int]):
+        self.text = text
+        self._token_ends = token_ends
+
+    @property
+    def token_count(self) -> int:
+        return len(self._token_ends)
+
+    def truncate(self, max_tokens: int) -> str:
+        """Return the longest prefix of the text that is at most max_tokens tokens."""
+        if max_tokens >= len(self._token_ends):
+            return self.text
+        if max_tokens <= 0:
+            return ""
+        return self.text[: self._token_ends[max_tokens - 1]]
+
+
+class Tokenizer:
+    """Tokenizer of one model, as selected by litellm for token counting."""
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        selected = _select_tokenizer(model_name)
+        self.is_huggingface = selected["type"] == "huggingface_tokenizer"
+        self._tokenizer = selected["tokenizer"]
+
+    @functools.cached_property
+    def family(self) -> str:
+        """
+        Name shared by all models that tokenize identically.
+
+        This is the tiktoken encoding name (e.g. "cl100k_base"), or "hf-" plus
+        a hash of the Hugging Face tokenizer definition.
+        """
+        if self.is_huggingface:
+            definition = self._tokenizer.to_str().encode()
+            return f"hf-{hashlib.sha256(definition).hexdigest()[:12]}"
+        return self._tokenizer.name
+
+    @functools.cached_property
+    def message_overhead(self) -> int:
+        """Tokens token_counter adds around the content of a single user message."""
+        return token_counter(
+            messages=[{"role": "user", "content": ""}], model=self.model_name
+        )
+
+    def count_tokens(self, text: str) -> int:
+        """Count the tokens of a plain text."""
+        if not text:
+            return 0
+        if self.is_huggingface:
+            return len(self._tokenizer.encode(text, add_special_tokens=False).ids)
+        return len(self._tokenizer.encode(text, disallowed_special=()))
+
+    def count_message_tokens(self, content: str) -> int:
+        """Count the tokens of a single user message, as token_counter would."""
+        return self.message_overhead + self.count_tokens(content)
+
+    def tokenize(self, text: str) -> TokenizedText:
+        """Tokenize text once, keeping the character offsets of the tokens."""
+        if not text:
+            return TokenizedText(text, [])
+
+        if self.is_huggingface:
+            encoding = self._tokenizer.encode(text, add_special_tokens=False)
+            token_ends = [end for _, end in encoding.offsets]
+        else:
+            tokens = self._tokenizer.encode(text, disallowed_special=())
+            # Offsets are the character index at which each token starts
+            decoded, token_starts = self._tokenizer.decode_with_offsets(tokens)
+            # Lone surrogates do not round-trip; offsets refer to the decoded text
+            text = decoded
+            token_ends = [*token_starts[1:], len(text)]
+
+        # Offsets never move backwards, so a truncated prefix keeps every
+        # character of the tokens before the cut
+        return TokenizedText(text, list(itertools.accumulate(token_ends, max)))
+
+
+def _select_tokenizer(model_name: str) -> dict[str, Any]:
+    """
+    Select the tokenizer litellm's token_counter uses for a model.
+
+    This relies on litellm's private _select_tokenizer helper. If it is missing
+    or fails (e.g. after a litellm upgrade), the tiktoken cl100k_base encoding
+    is used instead, so counts stay close for most models.
+    """
+    try:
+        from litellm.utils import _select_tokenizer as select_litellm_tokenizer
+
+        selected = select_litellm_tokenizer(model=model_name)
+        if selected["type"] in ("openai_tokenizer", "huggingface_tokenizer"):
+            return selected
+        error = f"unknown tokenizer type {selected['type']!r}"
+    except Exception as e:
+        error = repr(e)
+
+    _log_tokenizer_fallback(error)
+    import tiktoken
+
+    return {
+        "type": "openai_tokenizer",
+        "tokenizer": tiktoken.get_encoding(FALLBACK_ENCODING),
+    }
+
+
+def _log_tokenizer_fallback(error: str) -> None:
+    """Warn about the tokenizer fallback, once per process."""
+    global _fallback_logged
+    if not _fallback_logged:
+        _fallback_logged = True
+        logger.warning(
+            f"litellm could not select a tokenizer ({error}); "
+            f"counting tokens with tiktoken {FALLBACK_ENCODING} instead"
+        )
+
+
+@functools.lru_cache(maxsize=32)
+def get_tokenizer(model_name: str) -> Tokenizer:
+    """Return the cached Tokenizer for a model name."""
+    return Tokenizer(model_name)
+
+
+def count_tokens_by_family(
+    text: str, models: list[str] | None = None
+) -> dict[str, int]:
+    """
+    Count the tokens of a text once per tokenizer family.
+
+    Args:
+        text: Text to count
+        models: Models whose tokenizer families to count (defaults to
+            TOKEN_COUNT_MODELS)
+
+    Returns:
+        Dictionary mapping tokenizer family to token count
+    """
+    token_counts = {}
+    for model_name in config.TOKEN_COUNT_MODELS if models is None else models:
+        tokenizer = get_tokenizer(model_name)
+        if tokenizer.family not in token_counts:
+            token_counts[tokenizer.family] = tokenizer.count_tokens(text)
+    return token_counts
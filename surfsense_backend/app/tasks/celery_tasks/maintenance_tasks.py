@@ -0,0 +1,70 @@
+"""Celery beat tasks that keep cache and bookkeeping tables within their limits."""
+
+import logging
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.celery_app import celery_app
+from app.config import config
+
+logger = logging.getLogger(__name__)
+
+
+def get_celery_session_maker():
+    """Create async session maker for Celery tasks."""
+    engine = create_async_engine(
+        config.DATABASE_URL,
+        poolclass=NullPool,
+        echo=False,
+    )
+    return async_sessionmaker(engine, expire_on_commit=False)
+
+
+@celery_app.task(name="evict_summary_cache")
+def evict_summary_cache_task():
+    """
+    Delete summary cache entries older than SUMMARY_CACHE_MAX_AGE_DAYS and the
+    oldest entries beyond SUMMARY_CACHE_MAX_ENTRIES.
+    """
+    import asyncio
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    try:
+        return loop.run_until_complete(_evict_summary_cache())
+    finally:
+        loop.close()
+
+
+async def _evict_summary_cache() -> int:
+    from app.services.summary_cache import evict_summary_cache
+
+    async with get_celery_session_maker()() as session:
+        return await evict_summary_cache(
+            session,
+            max_age_days=config.SUMMARY_CACHE_MAX_AGE_DAYS,
+            max_entries=config.SUMMARY_CACHE_MAX_ENTRIES,
+        )
+
+
+@celery_app.task(name="compact_index_writes")
+def compact_index_writes_task():
+    """Fold the recorded index writes into the search space index generations."""
+    import asyncio
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    try:
+        return loop.run_until_complete(_compact_index_writes())
+    finally:
+        loop.close()
+
+
+async def _compact_index_writes() -> int:
+    from app.services.search_result_cache import compact_index_writes
+
+    async with get_celery_session_maker()() as session:
+        return await compact_index_writes(session)
@@ -0,0 +1,105 @@
+"""Celery tasks for search space maintenance."""
+
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.celery_app import celery_app
+from app.config import config
+
+logger = logging.getLogger(__name__)
+
+# Rows re-tokenized per committed batch
+RETOKENIZE_BATCH_SIZE = 1000
+
+# Each statement re-tokenizes the next batch of a search space's rows by id and
+# returns their ids. The configuration is read in the same statement, so a
+# batch never writes a configuration that was already replaced.
+RETOKENIZE_STATEMENTS = {
+    "documents": """
+        WITH batch AS (
+            SELECT id FROM documents
+            WHERE search_space_id = :search_space_id AND id > :last_id
+            ORDER BY id
+            LIMIT :batch_size
+        )
+        UPDATE documents d
+        SET search_vector = to_tsvector(s.text_search_config::regconfig, d.content)
+        FROM batch, searchspaces s
+        WHERE d.id = batch.id AND s.id = :search_space_id
+        RETURNING d.id
+    """,
+    "chunks": """
+        WITH batch AS (
+            SELECT id FROM chunks
+            WHERE search_space_id = :search_space_id AND id > :last_id
+            ORDER BY id
+            LIMIT :batch_size
+        )
+        UPDATE chunks c
+        SET search_vector = to_tsvector(s.text_search_config::regconfig, c.content)
+        FROM batch, searchspaces s
+        WHERE c.id = batch.id AND s.id = :search_space_id
+        RETURNING c.id
+    """,
+}
+
+
+def get_celery_session_maker():
+    """Create async session maker for Celery tasks."""
+    engine = create_async_engine(
+        config.DATABASE_URL,
+        poolclass=NullPool,
+        echo=False,
+    )
+    return async_sessionmaker(engine, expire_on_commit=False)
+
+
+@celery_app.task(name="retokenize_search_space")
+def retokenize_search_space_task(search_space_id: int):
+    """
+    Recompute search_vector of a search space's documents and chunks with its
+    current text_search_config.
+
+    Args:
+        search_space_id: ID of the search space whose configuration changed
+    """
+    import asyncio
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    try:
+        return loop.run_until_complete(_retokenize_search_space(search_space_id))
+    finally:
+        loop.close()
+
+
+async def _retokenize_search_space(search_space_id: int) -> int:
+    """Re-tokenize in committed batches, so no long transaction holds row locks."""
+    updated = 0
+    async with get_celery_session_maker()() as session:
+        for statement in RETOKENIZE_STATEMENTS.values():
+            last_id = 0
+            while True:
+                result = await session.execute(
+                    text(statement),
+                    {
+                        "search_space_id": search_space_id,
+                        "last_id": last_id,
+                        "batch_size": RETOKENIZE_BATCH_SIZE,
+                    },
+                )
+                ids = result.scalars().all()
+                await session.commit()
+                if not ids:
+                    break
+                updated += len(ids)
+                last_id = max(ids)
+
+    logger.info(
+        f"Re-tokenized {updated} documents and chunks of search space {search_space_id}"
+    )
+    return updated
@@ -5,14 +5,15 @@ Airtable connector indexer.
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.config import config
 from app.connectors.airtable_connector import AirtableConnector
 from app.db import Document, DocumentType, SearchSourceConnectorType
 from app.routes.airtable_add_connector_route import refresh_airtable_token
 from app.schemas.airtable_auth_credentials import AirtableAuthCredentialsBase
+from app.services.embedding_service import embedding_executor
 from app.services.llm_service import get_user_long_context_llm
 from app.services.task_logging_service import TaskLoggingService
 from app.utils.document_converters import (
+    compute_token_counts,
     create_document_chunks,
     generate_content_hash,
     generate_document_summary,
@@ -297,20 +298,23 @@ async def index_airtable_records(
                                             markdown_content,
                                             user_llm,
                                             document_metadata,
+                                            session=session,
                                         )
                                     else:
                                         summary_content = (
                                             f"Airtable Record: {record_id}\n\n"
                                         )
                                         summary_embedding = (
-                                            config.embedding_model_instance.embed(
+                                            await embedding_executor.embed(
                                                 summary_content
                                             )
                                         )
 
                                     # Process chunks
                                     chunks = await create_document_chunks(
-                                        markdown_content
+                                        markdown_content,
+                                        session=session,
+                                        existing_chunks=existing_document.chunks,
                                     )
 
                                     # Update existing document
@@ -318,6 +322,9 @@ async def index_airtable_records(
                                         f"Airtable Record: {record_id}"
                                     )
                                     existing_document.content = summary_content
+                                    existing_document.token_counts = (
+                                        await compute_token_counts(summary_content)
+                                    )
                                     existing_document.content_hash = content_hash
                                     existing_document.embedding = summary_embedding
                                     existing_document.document_metadata = {
@@ -351,19 +358,22 @@ async def index_airtable_records(
                                     summary_content,
                                     summary_embedding,
                                 ) = await generate_document_summary(
-                                    markdown_content, user_llm, document_metadata
+                                    markdown_content,
+                                    user_llm,
+                                    document_metadata,
+                                    session=session,
                                 )
                             else:
                                 # Fallback to simple summary if no LLM configured
                                 summary_content = f"Airtable Record: {record_id}\n\n"
-                                summary_embedding = (
-                                    config.embedding_model_instance.embed(
-                                        summary_content
-                                    )
+                                summary_embedding = await embedding_executor.embed(
+                                    summary_content
                                 )
 
                             # Process chunks
-                            chunks = await create_document_chunks(markdown_content)
+                            chunks = await create_document_chunks(
+                                markdown_content, session=session
+                            )
 
                             # Create and store new document
                             logger.info(
@@ -378,6 +388,9 @@ async def index_airtable_records(
                                     "created_time": record.get("CREATED_TIME()", ""),
                                 },
                                 content=summary_content,
+                                token_counts=await compute_token_counts(
+                                    summary_content
+                                ),
                                 content_hash=content_hash,
                                 unique_identifier_hash=unique_identifier_hash,
                                 embedding=summary_embedding,
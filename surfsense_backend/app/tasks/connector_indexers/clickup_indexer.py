@@ -7,12 +7,13 @@ from datetime import datetime
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.config import config
 from app.connectors.clickup_connector import ClickUpConnector
 from app.db import Document, DocumentType, SearchSourceConnectorType
+from app.services.embedding_service import embedding_executor
 from app.services.llm_service import get_user_long_context_llm
 from app.services.task_logging_service import TaskLoggingService
 from app.utils.document_converters import (
+    compute_token_counts,
     create_document_chunks,
     generate_content_hash,
     generate_document_summary,
@@ -258,20 +259,30 @@ async def index_clickup_tasks(
                                     summary_content,
                                     summary_embedding,
                                 ) = await generate_document_summary(
-                                    task_content, user_llm, document_metadata
+                                    task_content,
+                                    user_llm,
+                                    document_metadata,
+                                    session=session,
                                 )
                             else:
                                 summary_content = task_content
-                                summary_embedding = (
-                                    config.embedding_model_instance.embed(task_content)
+                                summary_embedding = await embedding_executor.embed(
+                                    task_content
                                 )
 
                             # Process chunks
-                            chunks = await create_document_chunks(task_content)
+                            chunks = await create_document_chunks(
+                                task_content,
+                                session=session,
+                                existing_chunks=existing_document.chunks,
+                            )
 
                             # Update existing document
                             existing_document.title = f"Task - {task_name}"
                             existing_document.content = summary_content
+                            existing_document.token_counts = await compute_token_counts(
+                                summary_content
+                            )
                             existing_document.content_hash = content_hash
                             existing_document.embedding = summary_embedding
                             existing_document.document_metadata = {
@@ -317,16 +328,14 @@ async def index_clickup_tasks(
                             summary_content,
                             summary_embedding,
                         ) = await generate_document_summary(
-                            task_content, user_llm, document_metadata
+                            task_content, user_llm, document_metadata, session=session
                         )
                     else:
                         # Fallback to simple summary if no LLM configured
                         summary_content = task_content
-                        summary_embedding = config.embedding_model_instance.embed(
-                            task_content
-                        )
+                        summary_embedding = await embedding_executor.embed(task_content)
 
-                    chunks = await create_document_chunks(task_content)
+                    chunks = await create_document_chunks(task_content, session=session)
 
                     document = Document(
                         search_space_id=search_space_id,
@@ -344,6 +353,7 @@ async def index_clickup_tasks(
                             "indexed_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                         },
                         content=summary_content,
+                        token_counts=await compute_token_counts(summary_content),
                         content_hash=content_hash,
                         unique_identifier_hash=unique_identifier_hash,
                         embedding=summary_embedding,
@@ -7,12 +7,13 @@ from datetime import datetime
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.config import config
 from app.connectors.confluence_connector import ConfluenceConnector
 from app.db import Document, DocumentType, SearchSourceConnectorType
+from app.services.embedding_service import embedding_executor
 from app.services.llm_service import get_user_long_context_llm
 from app.services.task_logging_service import TaskLoggingService
 from app.utils.document_converters import (
+    compute_token_counts,
     create_document_chunks,
     generate_content_hash,
     generate_document_summary,
@@ -265,7 +266,10 @@ async def index_confluence_pages(
                                 summary_content,
                                 summary_embedding,
                             ) = await generate_document_summary(
-                                full_content, user_llm, document_metadata
+                                full_content,
+                                user_llm,
+                                document_metadata,
+                                session=session,
                             )
                         else:
                             summary_content = f"Confluence Page: {page_title}\n\nSpace ID: {space_id}\n\n"
@@ -277,16 +281,23 @@ async def index_confluence_pages(
                                     f"Content Preview: {content_preview}\n\n"
                                 )
                             summary_content += f"Comments: {comment_count}"
-                            summary_embedding = config.embedding_model_instance.embed(
+                            summary_embedding = await embedding_executor.embed(
                                 summary_content
                             )
 
                         # Process chunks
-                        chunks = await create_document_chunks(full_content)
+                        chunks = await create_document_chunks(
+                            full_content,
+                            session=session,
+                            existing_chunks=existing_document.chunks,
+                        )
 
                         # Update existing document
                         existing_document.title = f"Confluence - {page_title}"
                         existing_document.content = summary_content
+                        existing_document.token_counts = await compute_token_counts(
+                            summary_content
+                        )
                         existing_document.content_hash = content_hash
                         existing_document.embedding = summary_embedding
                         existing_document.document_metadata = {
@@ -323,7 +334,7 @@ async def index_confluence_pages(
                         summary_content,
                         summary_embedding,
                     ) = await generate_document_summary(
-                        full_content, user_llm, document_metadata
+                        full_content, user_llm, document_metadata, session=session
                     )
                 else:
                     # Fallback to simple summary if no LLM configured
@@ -337,12 +348,10 @@ async def index_confluence_pages(
                             content_preview += "..."
                         summary_content += f"Content Preview: {content_preview}\n\n"
                     summary_content += f"Comments: {comment_count}"
-                    summary_embedding = config.embedding_model_instance.embed(
-                        summary_content
-                    )
+                    summary_embedding = await embedding_executor.embed(summary_content)
 
                 # Process chunks - using the full page content with comments
-                chunks = await create_document_chunks(full_content)
+                chunks = await create_document_chunks(full_content, session=session)
 
                 # Create and store new document
                 logger.info(f"Creating new document for page {page_title}")
@@ -358,6 +367,7 @@ async def index_confluence_pages(
                         "indexed_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                     },
                     content=summary_content,
+                    token_counts=await compute_token_counts(summary_content),
                     content_hash=content_hash,
                     unique_identifier_hash=unique_identifier_hash,
                     embedding=summary_embedding,
@@ -13,6 +13,7 @@ from app.db import Document, DocumentType, SearchSourceConnectorType
 from app.services.llm_service import get_user_long_context_llm
 from app.services.task_logging_service import TaskLoggingService
 from app.utils.document_converters import (
+    compute_token_counts,
     create_document_chunks,
     generate_content_hash,
     generate_document_summary,
@@ -367,16 +368,24 @@ async def index_discord_messages(
                                     combined_document_string,
                                     user_llm,
                                     document_metadata,
+                                    session=session,
                                 )
 
                                 # Chunks from channel content
-                                chunks = await create_document_chunks(channel_content)
+                                chunks = await create_document_chunks(
+                                    channel_content,
+                                    session=session,
+                                    existing_chunks=existing_document.chunks,
+                                )
 
                                 # Update existing document
                                 existing_document.title = (
                                     f"Discord - {guild_name}#{channel_name}"
                                 )
                                 existing_document.content = summary_content
+                                existing_document.token_counts = (
+                                    await compute_token_counts(summary_content)
+                                )
                                 existing_document.content_hash = content_hash
                                 existing_document.embedding = summary_embedding
                                 existing_document.document_metadata = {
@@ -426,11 +435,16 @@ async def index_discord_messages(
                             summary_content,
                             summary_embedding,
                         ) = await generate_document_summary(
-                            combined_document_string, user_llm, document_metadata
+                            combined_document_string,
+                            user_llm,
+                            document_metadata,
+                            session=session,
                         )
 
                         # Chunks from channel content
-                        chunks = await create_document_chunks(channel_content)
+                        chunks = await create_document_chunks(
+                            channel_content, session=session
+                        )
 
                         # Create and store new document
                         document = Document(
@@ -450,6 +464,7 @@ async def index_discord_messages(
                                 ),
                             },
                             content=summary_content,
+                            token_counts=await compute_token_counts(summary_content),
                             content_hash=content_hash,
                             unique_identifier_hash=unique_identifier_hash,
                             embedding=summary_embedding,
@@ -14,6 +14,7 @@ from app.connectors.elasticsearch_connector import ElasticsearchConnector
 from app.db import Document, DocumentType, SearchSourceConnector
 from app.services.task_logging_service import TaskLoggingService
 from app.utils.document_converters import (
+    compute_token_counts,
     create_document_chunks,
     generate_content_hash,
     generate_unique_identifier_hash,
@@ -244,10 +245,17 @@ async def index_elasticsearch_documents(
                             )
                             existing_doc.title = title
                             existing_doc.content = content
+                            existing_doc.token_counts = await compute_token_counts(
+                                content
+                            )
                             existing_doc.content_hash = content_hash
                             existing_doc.document_metadata = metadata
                             existing_doc.unique_identifier_hash = unique_identifier_hash
-                            chunks = await create_document_chunks(content)
+                            chunks = await create_document_chunks(
+                                content,
+                                session=session,
+                                existing_chunks=existing_doc.chunks,
+                            )
                             existing_doc.chunks = chunks
                             await session.flush()
                             documents_processed += 1
@@ -259,6 +267,7 @@ async def index_elasticsearch_documents(
                     document = Document(
                         title=title,
                         content=content,
+                        token_counts=await compute_token_counts(content),
                         content_hash=content_hash,
                         unique_identifier_hash=unique_identifier_hash,
                         document_type=DocumentType.ELASTICSEARCH_CONNECTOR,
@@ -267,7 +276,7 @@ async def index_elasticsearch_documents(
                     )
 
                     # Create chunks and attach to document (persist via relationship)
-                    chunks = await create_document_chunks(content)
+                    chunks = await create_document_chunks(content, session=session)
                     document.chunks = chunks
                     session.add(document)
                     await session.flush()
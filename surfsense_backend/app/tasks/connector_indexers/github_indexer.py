@@ -10,9 +10,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.config import config
 from app.connectors.github_connector import GitHubConnector
 from app.db import Document, DocumentType, SearchSourceConnectorType
+from app.services.embedding_service import embedding_executor
 from app.services.llm_service import get_user_long_context_llm
 from app.services.task_logging_service import TaskLoggingService
 from app.utils.document_converters import (
+    compute_token_counts,
     create_document_chunks,
     generate_content_hash,
     generate_document_summary,
@@ -247,25 +249,31 @@ async def index_github_repos(
                                     summary_content,
                                     summary_embedding,
                                 ) = await generate_document_summary(
-                                    file_content, user_llm, document_metadata
+                                    file_content,
+                                    user_llm,
+                                    document_metadata,
+                                    session=session,
                                 )
                             else:
                                 summary_content = f"GitHub file: {full_path_key}\n\n{file_content[:1000]}..."
-                                summary_embedding = (
-                                    config.embedding_model_instance.embed(
-                                        summary_content
-                                    )
+                                summary_embedding = await embedding_executor.embed(
+                                    summary_content
                                 )
 
                             # Chunk the content
                             try:
                                 if hasattr(config, "code_chunker_instance"):
-                                    chunks_data = [
-                                        await create_document_chunks(file_content)
-                                    ][0]
+                                    chunks_data = await create_document_chunks(
+                                        file_content,
+                                        chunker=config.code_chunker_instance,
+                                        session=session,
+                                        existing_chunks=existing_document.chunks,
+                                    )
                                 else:
                                     chunks_data = await create_document_chunks(
-                                        file_content
+                                        file_content,
+                                        session=session,
+                                        existing_chunks=existing_document.chunks,
                                     )
                             except Exception as chunk_err:
                                 logger.error(
@@ -276,6 +284,9 @@ async def index_github_repos(
                             # Update existing document
                             existing_document.title = f"GitHub - {full_path_key}"
                             existing_document.content = summary_content
+                            existing_document.token_counts = await compute_token_counts(
+                                summary_content
+                            )
                             existing_document.content_hash = content_hash
                             existing_document.embedding = summary_embedding
                             existing_document.document_metadata = {
@@ -315,36 +326,30 @@ async def index_github_repos(
                             summary_content,
                             summary_embedding,
                         ) = await generate_document_summary(
-                            file_content, user_llm, document_metadata
+                            file_content, user_llm, document_metadata, session=session
                         )
                     else:
                         # Fallback to simple summary if no LLM configured
                         summary_content = (
                             f"GitHub file: {full_path_key}\n\n{file_content[:1000]}..."
                         )
-                        summary_embedding = config.embedding_model_instance.embed(
+                        summary_embedding = await embedding_executor.embed(
                             summary_content
                         )
 
                     # Chunk the content
                     try:
-                        chunks_data = [await create_document_chunks(file_content)][0]
-
                         # Use code chunker if available, otherwise regular chunker
                         if hasattr(config, "code_chunker_instance"):
-                            chunks_data = [
-                                {
-                                    "content": chunk.text,
-                                    "embedding": config.embedding_model_instance.embed(
-                                        chunk.text
-                                    ),
-                                }
-                                for chunk in config.code_chunker_instance.chunk(
-                                    file_content
-                                )
-                            ]
+                            chunks_data = await create_document_chunks(
+                                file_content,
+                                chunker=config.code_chunker_instance,
+                                session=session,
+                            )
                         else:
-                            chunks_data = await create_document_chunks(file_content)
+                            chunks_data = await create_document_chunks(
+                                file_content, session=session
+                            )
 
                     except Exception as chunk_err:
                         logger.error(
@@ -372,6 +377,7 @@ async def index_github_repos(
                         document_type=DocumentType.GITHUB_CONNECTOR,
                         document_metadata=doc_metadata,
                         content=summary_content,  # Store summary
+                        token_counts=await compute_token_counts(summary_content),
                         content_hash=content_hash,
                         unique_identifier_hash=unique_identifier_hash,
                         embedding=summary_embedding,
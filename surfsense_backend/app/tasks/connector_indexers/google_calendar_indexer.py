@@ -8,12 +8,13 @@ from google.oauth2.credentials import Credentials
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.config import config
 from app.connectors.google_calendar_connector import GoogleCalendarConnector
 from app.db import Document, DocumentType, SearchSourceConnectorType
+from app.services.embedding_service import embedding_executor
 from app.services.llm_service import get_user_long_context_llm
 from app.services.task_logging_service import TaskLoggingService
 from app.utils.document_converters import (
+    compute_token_counts,
     create_document_chunks,
     generate_content_hash,
     generate_document_summary,
@@ -297,7 +298,10 @@ async def index_google_calendar_events(
                                 summary_content,
                                 summary_embedding,
                             ) = await generate_document_summary(
-                                event_markdown, user_llm, document_metadata
+                                event_markdown,
+                                user_llm,
+                                document_metadata,
+                                session=session,
                             )
                         else:
                             summary_content = (
@@ -313,16 +317,23 @@ async def index_google_calendar_events(
                                 if len(description) > 1000:
                                     desc_preview += "..."
                                 summary_content += f"Description: {desc_preview}\n"
-                            summary_embedding = config.embedding_model_instance.embed(
+                            summary_embedding = await embedding_executor.embed(
                                 summary_content
                             )
 
                         # Process chunks
-                        chunks = await create_document_chunks(event_markdown)
+                        chunks = await create_document_chunks(
+                            event_markdown,
+                            session=session,
+                            existing_chunks=existing_document.chunks,
+                        )
 
                         # Update existing document
                         existing_document.title = f"Calendar Event - {event_summary}"
                         existing_document.content = summary_content
+                        existing_document.token_counts = await compute_token_counts(
+                            summary_content
+                        )
                         existing_document.content_hash = content_hash
                         existing_document.embedding = summary_embedding
                         existing_document.document_metadata = {
@@ -363,7 +374,7 @@ async def index_google_calendar_events(
                         summary_content,
                         summary_embedding,
                     ) = await generate_document_summary(
-                        event_markdown, user_llm, document_metadata
+                        event_markdown, user_llm, document_metadata, session=session
                     )
                 else:
                     # Fallback to simple summary if no LLM configured
@@ -378,10 +389,8 @@ async def index_google_calendar_events(
                         if len(description) > 1000:
                             desc_preview += "..."
                         summary_content += f"Description: {desc_preview}\n"
-                    summary_embedding = config.embedding_model_instance.embed(
-                        summary_content
-                    )
-                chunks = await create_document_chunks(event_markdown)
+                    summary_embedding = await embedding_executor.embed(summary_content)
+                chunks = await create_document_chunks(event_markdown, session=session)
 
                 document = Document(
                     search_space_id=search_space_id,
@@ -397,6 +406,7 @@ async def index_google_calendar_events(
                         "indexed_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                     },
                     content=summary_content,
+                    token_counts=await compute_token_counts(summary_content),
                     content_hash=content_hash,
                     unique_identifier_hash=unique_identifier_hash,
                     embedding=summary_embedding,
@@ -8,16 +8,17 @@ from google.oauth2.credentials import Credentials
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.config import config
 from app.connectors.google_gmail_connector import GoogleGmailConnector
 from app.db import (
     Document,
     DocumentType,
     SearchSourceConnectorType,
 )
+from app.services.embedding_service import embedding_executor
 from app.services.llm_service import get_user_long_context_llm
 from app.services.task_logging_service import TaskLoggingService
 from app.utils.document_converters import (
+    compute_token_counts,
     create_document_chunks,
     generate_content_hash,
     generate_document_summary,
@@ -234,22 +235,32 @@ async def index_google_gmail_messages(
                                 summary_content,
                                 summary_embedding,
                             ) = await generate_document_summary(
-                                markdown_content, user_llm, document_metadata
+                                markdown_content,
+                                user_llm,
+                                document_metadata,
+                                session=session,
                             )
                         else:
                             summary_content = f"Google Gmail Message: {subject}\n\n"
                             summary_content += f"Sender: {sender}\n"
                             summary_content += f"Date: {date_str}\n"
-                            summary_embedding = config.embedding_model_instance.embed(
+                            summary_embedding = await embedding_executor.embed(
                                 summary_content
                             )
 
                         # Process chunks
-                        chunks = await create_document_chunks(markdown_content)
+                        chunks = await create_document_chunks(
+                            markdown_content,
+                            session=session,
+                            existing_chunks=existing_document.chunks,
+                        )
 
                         # Update existing document
                         existing_document.title = f"Gmail: {subject}"
                         existing_document.content = summary_content
+                        existing_document.token_counts = await compute_token_counts(
+                            summary_content
+                        )
                         existing_document.content_hash = content_hash
                         existing_document.embedding = summary_embedding
                         existing_document.document_metadata = {
@@ -286,19 +297,17 @@ async def index_google_gmail_messages(
                         summary_content,
                         summary_embedding,
                     ) = await generate_document_summary(
-                        markdown_content, user_llm, document_metadata
+                        markdown_content, user_llm, document_metadata, session=session
                     )
                 else:
                     # Fallback to simple summary if no LLM configured
                     summary_content = f"Google Gmail Message: {subject}\n\n"
                     summary_content += f"Sender: {sender}\n"
                     summary_content += f"Date: {date_str}\n"
-                    summary_embedding = config.embedding_model_instance.embed(
-                        summary_content
-                    )
+                    summary_embedding = await embedding_executor.embed(summary_content)
 
                 # Process chunks
-                chunks = await create_document_chunks(markdown_content)
+                chunks = await create_document_chunks(markdown_content, session=session)
 
                 # Create and store new document
                 logger.info(f"Creating new document for Gmail message: {subject}")
@@ -315,6 +324,7 @@ async def index_google_gmail_messages(
                         "connector_id": connector_id,
                     },
                     content=summary_content,
+                    token_counts=await compute_token_counts(summary_content),
                     content_hash=content_hash,
                     unique_identifier_hash=unique_identifier_hash,
                     embedding=summary_embedding,
@@ -7,12 +7,13 @@ from datetime import datetime
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.config import config
 from app.connectors.linear_connector import LinearConnector
 from app.db import Document, DocumentType, SearchSourceConnectorType
+from app.services.embedding_service import embedding_executor
 from app.services.llm_service import get_user_long_context_llm
 from app.services.task_logging_service import TaskLoggingService
 from app.utils.document_converters import (
+    compute_token_counts,
     create_document_chunks,
     generate_content_hash,
     generate_document_summary,
@@ -264,7 +265,10 @@ async def index_linear_issues(
                                 summary_content,
                                 summary_embedding,
                             ) = await generate_document_summary(
-                                issue_content, user_llm, document_metadata
+                                issue_content,
+                                user_llm,
+                                document_metadata,
+                                session=session,
                             )
                         else:
                             # Fallback to simple summary if no LLM configured
@@ -274,18 +278,25 @@ async def index_linear_issues(
                             if description:
                                 summary_content += f"Description: {description}\n\n"
                             summary_content += f"Comments: {comment_count}"
-                            summary_embedding = config.embedding_model_instance.embed(
+                            summary_embedding = await embedding_executor.embed(
                                 summary_content
                             )
 
                         # Process chunks
-                        chunks = await create_document_chunks(issue_content)
+                        chunks = await create_document_chunks(
+                            issue_content,
+                            session=session,
+                            existing_chunks=existing_document.chunks,
+                        )
 
                         # Update existing document
                         existing_document.title = (
                             f"Linear - {issue_identifier}: {issue_title}"
                         )
                         existing_document.content = summary_content
+                        existing_document.token_counts = await compute_token_counts(
+                            summary_content
+                        )
                         existing_document.content_hash = content_hash
                         existing_document.embedding = summary_embedding
                         existing_document.document_metadata = {
@@ -324,7 +335,7 @@ async def index_linear_issues(
                         summary_content,
                         summary_embedding,
                     ) = await generate_document_summary(
-                        issue_content, user_llm, document_metadata
+                        issue_content, user_llm, document_metadata, session=session
                     )
                 else:
                     # Fallback to simple summary if no LLM configured
@@ -335,12 +346,10 @@ async def index_linear_issues(
                     if description:
                         summary_content += f"Description: {description}\n\n"
                     summary_content += f"Comments: {comment_count}"
-                    summary_embedding = config.embedding_model_instance.embed(
-                        summary_content
-                    )
+                    summary_embedding = await embedding_executor.embed(summary_content)
 
                 # Process chunks - using the full issue content with comments
-                chunks = await create_document_chunks(issue_content)
+                chunks = await create_document_chunks(issue_content, session=session)
 
                 # Create and store new document
                 logger.info(
@@ -359,6 +368,7 @@ async def index_linear_issues(
                         "indexed_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                     },
                     content=summary_content,
+                    token_counts=await compute_token_counts(summary_content),
                     content_hash=content_hash,
                     unique_identifier_hash=unique_identifier_hash,
                     embedding=summary_embedding,
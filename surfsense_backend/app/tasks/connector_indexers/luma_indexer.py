@@ -7,12 +7,13 @@ from datetime import datetime, timedelta
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.config import config
 from app.connectors.luma_connector import LumaConnector
 from app.db import Document, DocumentType, SearchSourceConnectorType
+from app.services.embedding_service import embedding_executor
 from app.services.llm_service import get_user_long_context_llm
 from app.services.task_logging_service import TaskLoggingService
 from app.utils.document_converters import (
+    compute_token_counts,
     create_document_chunks,
     generate_content_hash,
     generate_document_summary,
@@ -306,7 +307,10 @@ async def index_luma_events(
                                 summary_content,
                                 summary_embedding,
                             ) = await generate_document_summary(
-                                event_markdown, user_llm, document_metadata
+                                event_markdown,
+                                user_llm,
+                                document_metadata,
+                                session=session,
                             )
                         else:
                             summary_content = f"Luma Event: {event_name}\n\n"
@@ -327,16 +331,23 @@ async def index_luma_events(
                                 if len(description) > 1000:
                                     desc_preview += "..."
                                 summary_content += f"Description: {desc_preview}\n"
-                            summary_embedding = config.embedding_model_instance.embed(
+                            summary_embedding = await embedding_executor.embed(
                                 summary_content
                             )
 
                         # Process chunks
-                        chunks = await create_document_chunks(event_markdown)
+                        chunks = await create_document_chunks(
+                            event_markdown,
+                            session=session,
+                            existing_chunks=existing_document.chunks,
+                        )
 
                         # Update existing document
                         existing_document.title = f"Luma Event - {event_name}"
                         existing_document.content = summary_content
+                        existing_document.token_counts = await compute_token_counts(
+                            summary_content
+                        )
                         existing_document.content_hash = content_hash
                         existing_document.embedding = summary_embedding
                         existing_document.document_metadata = {
@@ -381,7 +392,7 @@ async def index_luma_events(
                         summary_content,
                         summary_embedding,
                     ) = await generate_document_summary(
-                        event_markdown, user_llm, document_metadata
+                        event_markdown, user_llm, document_metadata, session=session
                     )
                 else:
                     # Fallback to simple summary if no LLM configured
@@ -404,11 +415,9 @@ async def index_luma_events(
                             desc_preview += "..."
                         summary_content += f"Description: {desc_preview}\n"
 
-                    summary_embedding = config.embedding_model_instance.embed(
-                        summary_content
-                    )
+                    summary_embedding = await embedding_executor.embed(summary_content)
 
-                chunks = await create_document_chunks(event_markdown)
+                chunks = await create_document_chunks(event_markdown, session=session)
 
                 document = Document(
                     search_space_id=search_space_id,
@@ -428,6 +437,7 @@ async def index_luma_events(
                         "indexed_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                     },
                     content=summary_content,
+                    token_counts=await compute_token_counts(summary_content),
                     content_hash=content_hash,
                     unique_identifier_hash=unique_identifier_hash,
                     embedding=summary_embedding,
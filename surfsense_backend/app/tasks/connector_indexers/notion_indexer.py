@@ -12,6 +12,7 @@ from app.db import Document, DocumentType, SearchSourceConnectorType
 from app.services.llm_service import get_user_long_context_llm
 from app.services.task_logging_service import TaskLoggingService
 from app.utils.document_converters import (
+    compute_token_counts,
     create_document_chunks,
     generate_content_hash,
     generate_document_summary,
@@ -336,15 +337,25 @@ async def index_notion_pages(
                             summary_content,
                             summary_embedding,
                         ) = await generate_document_summary(
-                            markdown_content, user_llm, document_metadata
+                            markdown_content,
+                            user_llm,
+                            document_metadata,
+                            session=session,
                         )
 
                         # Process chunks
-                        chunks = await create_document_chunks(markdown_content)
+                        chunks = await create_document_chunks(
+                            markdown_content,
+                            session=session,
+                            existing_chunks=existing_document.chunks,
+                        )
 
                         # Update existing document
                         existing_document.title = f"Notion - {page_title}"
                         existing_document.content = summary_content
+                        existing_document.token_counts = await compute_token_counts(
+                            summary_content
+                        )
                         existing_document.content_hash = content_hash
                         existing_document.embedding = summary_embedding
                         existing_document.document_metadata = {
@@ -386,12 +397,12 @@ async def index_notion_pages(
                     "connector_type": "Notion",
                 }
                 summary_content, summary_embedding = await generate_document_summary(
-                    markdown_content, user_llm, document_metadata
+                    markdown_content, user_llm, document_metadata, session=session
                 )
 
                 # Process chunks
                 logger.debug(f"Chunking content for page {page_title}")
-                chunks = await create_document_chunks(markdown_content)
+                chunks = await create_document_chunks(markdown_content, session=session)
 
                 # Create and store new document
                 document = Document(
@@ -404,6 +415,7 @@ async def index_notion_pages(
                         "indexed_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                     },
                     content=summary_content,
+                    token_counts=await compute_token_counts(summary_content),
                     content_hash=content_hash,
                     unique_identifier_hash=unique_identifier_hash,
                     embedding=summary_embedding,
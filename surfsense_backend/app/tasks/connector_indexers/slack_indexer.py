@@ -8,11 +8,12 @@ from slack_sdk.errors import SlackApiError
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.config import config
 from app.connectors.slack_history import SlackHistory
 from app.db import Document, DocumentType, SearchSourceConnectorType
+from app.services.embedding_service import embedding_executor
 from app.services.task_logging_service import TaskLoggingService
 from app.utils.document_converters import (
+    compute_token_counts,
     create_document_chunks,
     generate_content_hash,
     generate_unique_identifier_hash,
@@ -296,14 +297,19 @@ async def index_slack_messages(
 
                             # Update chunks and embedding
                             chunks = await create_document_chunks(
-                                combined_document_string
+                                combined_document_string,
+                                session=session,
+                                existing_chunks=existing_document.chunks,
                             )
-                            doc_embedding = config.embedding_model_instance.embed(
+                            doc_embedding = await embedding_executor.embed(
                                 combined_document_string
                             )
 
                             # Update existing document
                             existing_document.content = combined_document_string
+                            existing_document.token_counts = await compute_token_counts(
+                                combined_document_string
+                            )
                             existing_document.content_hash = content_hash
                             existing_document.embedding = doc_embedding
                             existing_document.document_metadata = {
@@ -326,8 +332,10 @@ async def index_slack_messages(
 
                     # Document doesn't exist - create new one
                     # Process chunks
-                    chunks = await create_document_chunks(combined_document_string)
-                    doc_embedding = config.embedding_model_instance.embed(
+                    chunks = await create_document_chunks(
+                        combined_document_string, session=session
+                    )
+                    doc_embedding = await embedding_executor.embed(
                         combined_document_string
                     )
 
@@ -345,6 +353,9 @@ async def index_slack_messages(
                             "indexed_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                         },
                         content=combined_document_string,
+                        token_counts=await compute_token_counts(
+                            combined_document_string
+                        ),
                         embedding=doc_embedding,
                         chunks=chunks,
                         content_hash=content_hash,
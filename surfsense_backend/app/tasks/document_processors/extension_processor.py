@@ -12,6 +12,7 @@ from app.schemas import ExtensionDocumentContent
 from app.services.llm_service import get_user_long_context_llm
 from app.services.task_logging_service import TaskLoggingService
 from app.utils.document_converters import (
+    compute_token_counts,
     create_document_chunks,
     generate_content_hash,
     generate_document_summary,
@@ -139,17 +140,22 @@ async def add_extension_received_document(
             "document_type": "Browser Extension Capture",
         }
         summary_content, summary_embedding = await generate_document_summary(
-            combined_document_string, user_llm, document_metadata
+            combined_document_string, user_llm, document_metadata, session=session
         )
 
         # Process chunks
-        chunks = await create_document_chunks(content.pageContent)
+        chunks = await create_document_chunks(
+            content.pageContent,
+            session=session,
+            existing_chunks=existing_document.chunks if existing_document else None,
+        )
 
         # Update or create document
         if existing_document:
             # Update existing document
             existing_document.title = content.metadata.VisitedWebPageTitle
             existing_document.content = summary_content
+            existing_document.token_counts = await compute_token_counts(summary_content)
             existing_document.content_hash = content_hash
             existing_document.embedding = summary_embedding
             existing_document.document_metadata = content.metadata.model_dump()
@@ -166,6 +172,7 @@ async def add_extension_received_document(
                 document_type=DocumentType.EXTENSION,
                 document_metadata=content.metadata.model_dump(),
                 content=summary_content,
+                token_counts=await compute_token_counts(summary_content),
                 embedding=summary_embedding,
                 chunks=chunks,
                 content_hash=content_hash,
@@ -15,9 +15,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import config as app_config
 from app.db import Document, DocumentType, Log
+from app.services.embedding_service import embedding_executor
 from app.services.llm_service import get_user_long_context_llm
 from app.services.task_logging_service import TaskLoggingService
 from app.utils.document_converters import (
+    compute_token_counts,
     convert_document_to_markdown,
     create_document_chunks,
     generate_content_hash,
@@ -94,17 +96,22 @@ async def add_received_file_document_using_unstructured(
             "document_type": "File Document",
         }
         summary_content, summary_embedding = await generate_document_summary(
-            file_in_markdown, user_llm, document_metadata
+            file_in_markdown, user_llm, document_metadata, session=session
         )
 
         # Process chunks
-        chunks = await create_document_chunks(file_in_markdown)
+        chunks = await create_document_chunks(
+            file_in_markdown,
+            session=session,
+            existing_chunks=existing_document.chunks if existing_document else None,
+        )
 
         # Update or create document
         if existing_document:
             # Update existing document
             existing_document.title = file_name
             existing_document.content = summary_content
+            existing_document.token_counts = await compute_token_counts(summary_content)
             existing_document.content_hash = content_hash
             existing_document.embedding = summary_embedding
             existing_document.document_metadata = {
@@ -127,6 +134,7 @@ async def add_received_file_document_using_unstructured(
                     "ETL_SERVICE": "UNSTRUCTURED",
                 },
                 content=summary_content,
+                token_counts=await compute_token_counts(summary_content),
                 embedding=summary_embedding,
                 chunks=chunks,
                 content_hash=content_hash,
@@ -208,17 +216,22 @@ async def add_received_file_document_using_llamacloud(
             "document_type": "File Document",
         }
         summary_content, summary_embedding = await generate_document_summary(
-            file_in_markdown, user_llm, document_metadata
+            file_in_markdown, user_llm, document_metadata, session=session
         )
 
         # Process chunks
-        chunks = await create_document_chunks(file_in_markdown)
+        chunks = await create_document_chunks(
+            file_in_markdown,
+            session=session,
+            existing_chunks=existing_document.chunks if existing_document else None,
+        )
 
         # Update or create document
         if existing_document:
             # Update existing document
             existing_document.title = file_name
             existing_document.content = summary_content
+            existing_document.token_counts = await compute_token_counts(summary_content)
             existing_document.content_hash = content_hash
             existing_document.embedding = summary_embedding
             existing_document.document_metadata = {
@@ -241,6 +254,7 @@ async def add_received_file_document_using_llamacloud(
                     "ETL_SERVICE": "LLAMACLOUD",
                 },
                 content=summary_content,
+                token_counts=await compute_token_counts(summary_content),
                 embedding=summary_embedding,
                 chunks=chunks,
                 content_hash=content_hash,
@@ -268,6 +282,8 @@ async def add_received_file_document_using_docling(
     docling_markdown_document: str,
     search_space_id: int,
     user_id: str,
+    task_logger: TaskLoggingService | None = None,
+    log_entry: Log | None = None,
 ) -> Document | None:
     """
     Process and store document content parsed by Docling.
@@ -278,6 +294,8 @@ async def add_received_file_document_using_docling(
         docling_markdown_document: Markdown content from Docling parsing
         search_space_id: ID of the search space
         user_id: ID of the user
+        task_logger: Optional task logger for summarization progress
+        log_entry: Log entry of the task (required with task_logger)
 
     Returns:
         Document object if successful, None if failed
@@ -322,7 +340,12 @@ async def add_received_file_document_using_docling(
         docling_service = create_docling_service()
 
         summary_content = await docling_service.process_large_document_summary(
-            content=file_in_markdown, llm=user_llm, document_title=file_name
+            content=file_in_markdown,
+            llm=user_llm,
+            document_title=file_name,
+            session=session,
+            task_logger=task_logger,
+            log_entry=log_entry,
         )
 
         # Enhance summary with metadata
@@ -344,20 +367,23 @@ async def add_received_file_document_using_docling(
             f"{metadata_section}\n\n# DOCUMENT SUMMARY\n\n{summary_content}"
         )
 
-        from app.config import config
-
-        summary_embedding = config.embedding_model_instance.embed(
-            enhanced_summary_content
-        )
+        summary_embedding = await embedding_executor.embed(enhanced_summary_content)
 
         # Process chunks
-        chunks = await create_document_chunks(file_in_markdown)
+        chunks = await create_document_chunks(
+            file_in_markdown,
+            session=session,
+            existing_chunks=existing_document.chunks if existing_document else None,
+        )
 
         # Update or create document
         if existing_document:
             # Update existing document
             existing_document.title = file_name
             existing_document.content = enhanced_summary_content
+            existing_document.token_counts = await compute_token_counts(
+                enhanced_summary_content
+            )
             existing_document.content_hash = content_hash
             existing_document.embedding = summary_embedding
             existing_document.document_metadata = {
@@ -380,6 +406,7 @@ async def add_received_file_document_using_docling(
                     "ETL_SERVICE": "DOCLING",
                 },
                 content=enhanced_summary_content,
+                token_counts=await compute_token_counts(enhanced_summary_content),
                 embedding=summary_embedding,
                 chunks=chunks,
                 content_hash=content_hash,
@@ -966,6 +993,8 @@ async def process_file_in_background(
                     docling_markdown_document=result["content"],
                     search_space_id=search_space_id,
                     user_id=user_id,
+                    task_logger=task_logger,
+                    log_entry=log_entry,
                 )
 
                 if doc_result:
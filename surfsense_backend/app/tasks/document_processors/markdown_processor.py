@@ -11,6 +11,7 @@ from app.db import Document, DocumentType
 from app.services.llm_service import get_user_long_context_llm
 from app.services.task_logging_service import TaskLoggingService
 from app.utils.document_converters import (
+    compute_token_counts,
     create_document_chunks,
     generate_content_hash,
     generate_document_summary,
@@ -104,17 +105,22 @@ async def add_received_markdown_file_document(
             "document_type": "Markdown File Document",
         }
         summary_content, summary_embedding = await generate_document_summary(
-            file_in_markdown, user_llm, document_metadata
+            file_in_markdown, user_llm, document_metadata, session=session
         )
 
         # Process chunks
-        chunks = await create_document_chunks(file_in_markdown)
+        chunks = await create_document_chunks(
+            file_in_markdown,
+            session=session,
+            existing_chunks=existing_document.chunks if existing_document else None,
+        )
 
         # Update or create document
         if existing_document:
             # Update existing document
             existing_document.title = file_name
             existing_document.content = summary_content
+            existing_document.token_counts = await compute_token_counts(summary_content)
             existing_document.content_hash = content_hash
             existing_document.embedding = summary_embedding
             existing_document.document_metadata = {
@@ -135,6 +141,7 @@ async def add_received_markdown_file_document(
                     "FILE_NAME": file_name,
                 },
                 content=summary_content,
+                token_counts=await compute_token_counts(summary_content),
                 embedding=summary_embedding,
                 chunks=chunks,
                 content_hash=content_hash,
@@ -16,6 +16,7 @@ from app.db import Document, DocumentType
 from app.services.llm_service import get_user_long_context_llm
 from app.services.task_logging_service import TaskLoggingService
 from app.utils.document_converters import (
+    compute_token_counts,
     create_document_chunks,
     generate_content_hash,
     generate_document_summary,
@@ -238,7 +239,7 @@ async def add_crawled_url_document(
             "crawler_type": "FirecrawlApp" if use_firecrawl else "AsyncChromiumLoader",
         }
         summary_content, summary_embedding = await generate_document_summary(
-            combined_document_string, user_llm, document_metadata
+            combined_document_string, user_llm, document_metadata, session=session
         )
 
         # Process chunks
@@ -248,7 +249,11 @@ async def add_crawled_url_document(
             {"stage": "chunk_processing"},
         )
 
-        chunks = await create_document_chunks(content_in_markdown)
+        chunks = await create_document_chunks(
+            content_in_markdown,
+            session=session,
+            existing_chunks=existing_document.chunks if existing_document else None,
+        )
 
         # Update or create document
         if existing_document:
@@ -263,6 +268,7 @@ async def add_crawled_url_document(
                 "title", url_crawled[0].metadata.get("source", url)
             )
             existing_document.content = summary_content
+            existing_document.token_counts = await compute_token_counts(summary_content)
             existing_document.content_hash = content_hash
             existing_document.embedding = summary_embedding
             existing_document.document_metadata = url_crawled[0].metadata
@@ -285,6 +291,7 @@ async def add_crawled_url_document(
                 document_type=DocumentType.CRAWLED_URL,
                 document_metadata=url_crawled[0].metadata,
                 content=summary_content,
+                token_counts=await compute_token_counts(summary_content),
                 embedding=summary_embedding,
                 chunks=chunks,
                 content_hash=content_hash,
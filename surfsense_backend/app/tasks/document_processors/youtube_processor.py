@@ -14,6 +14,7 @@ from app.db import Document, DocumentType
 from app.services.llm_service import get_user_long_context_llm
 from app.services.task_logging_service import TaskLoggingService
 from app.utils.document_converters import (
+    compute_token_counts,
     create_document_chunks,
     generate_content_hash,
     generate_document_summary,
@@ -281,7 +282,7 @@ async def add_youtube_video_document(
             "has_transcript": "No captions available" not in transcript_text,
         }
         summary_content, summary_embedding = await generate_document_summary(
-            combined_document_string, user_llm, document_metadata
+            combined_document_string, user_llm, document_metadata, session=session
         )
 
         # Process chunks
@@ -291,7 +292,11 @@ async def add_youtube_video_document(
             {"stage": "chunk_processing"},
         )
 
-        chunks = await create_document_chunks(combined_document_string)
+        chunks = await create_document_chunks(
+            combined_document_string,
+            session=session,
+            existing_chunks=existing_document.chunks if existing_document else None,
+        )
 
         # Update or create document
         if existing_document:
@@ -304,6 +309,7 @@ async def add_youtube_video_document(
 
             existing_document.title = video_data.get("title", "YouTube Video")
             existing_document.content = summary_content
+            existing_document.token_counts = await compute_token_counts(summary_content)
             existing_document.content_hash = content_hash
             existing_document.embedding = summary_embedding
             existing_document.document_metadata = {
@@ -337,6 +343,7 @@ async def add_youtube_video_document(
                     "thumbnail": video_data.get("thumbnail_url", ""),
                 },
                 content=summary_content,
+                token_counts=await compute_token_counts(summary_content),
                 embedding=summary_embedding,
                 chunks=chunks,
                 search_space_id=search_space_id,
@@ -84,8 +84,8 @@ async def generate_document_podcast(
             {"stage": "process_chunks", "chunk_count": len(document.chunks)},
         )
 
-        # Sort chunks by creation time to maintain proper order
-        sorted_chunks = sorted(document.chunks, key=lambda x: x.created_at)
+        # Document.chunks is loaded in document order (by chunk position)
+        sorted_chunks = document.chunks
 
         # Concatenate all chunk content
         document_content = "\n\n".join([chunk.content for chunk in sorted_chunks])
@@ -22,6 +22,8 @@ async def stream_connector_search_results(
     document_ids_to_add_in_context: list[int],
     language: str | None = None,
     top_k: int = 10,
+    ef_search: int | None = None,
+    context_window: int | None = None,
 ) -> AsyncGenerator[str, None]:
     """
     Stream connector search results to the client
@@ -46,6 +48,8 @@ async def stream_connector_search_results(
         search_mode = SearchMode.CHUNKS
     elif search_mode_str == "DOCUMENTS":
         search_mode = SearchMode.DOCUMENTS
+    elif search_mode_str == "HIERARCHICAL":
+        search_mode = SearchMode.HIERARCHICAL
 
     # Sample configuration
     config = {
@@ -58,6 +62,8 @@ async def stream_connector_search_results(
             "document_ids_to_add_in_context": document_ids_to_add_in_context,
             "language": language,  # Add language to the configuration
             "top_k": top_k,  # Add top_k to the configuration
+            "ef_search": ef_search,  # Optional HNSW ef_search override
+            "context_window": context_window,  # Optional neighboring chunk window
         }
     }
     # print(f"Researcher configuration: {config['configurable']}")  # Debug print
@@ -1,10 +1,28 @@
+import asyncio
+import bisect
 import hashlib
+import logging
+from typing import Any
 
-from litellm import get_model_info, token_counter
+from litellm import get_model_info
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import config
 from app.db import Chunk, DocumentType
 from app.prompts import SUMMARY_PROMPT_TEMPLATE
+from app.services.embedding_service import (
+    embed_texts,
+    embed_texts_cached,
+    embedding_executor,
+)
+from app.services.summary_cache import summary_cache
+from app.services.tokenizer_service import count_tokens_by_family, get_tokenizer
+
+logger = logging.getLogger(__name__)
+
+# Spacing of the positions of a newly chunked document, so chunks added to it
+# later fit between the existing ones without moving them
+CHUNK_POSITION_GAP = 1024
 
 
 def get_model_context_window(model_name: str) -> int:
@@ -24,7 +42,10 @@ def optimize_content_for_context_window(
     content: str, document_metadata: dict | None, model_name: str
 ) -> str:
     """
-    Optimize content length to fit within model context window using binary search.
+    Optimize content length to fit within model context window.
+
+    The content is tokenized once and cut at the token offset that fits the
+    available budget.
 
     Args:
         content: Original document content
@@ -39,6 +60,7 @@ def optimize_content_for_context_window(
 
     # Get model context window
     context_window = get_model_context_window(model_name)
+    tokenizer = get_tokenizer(model_name)
 
     # Reserve tokens for: system prompt, metadata, template overhead, and output
     # Conservative estimate: 2000 tokens for prompt + metadata + output buffer
@@ -50,10 +72,7 @@ def optimize_content_for_context_window(
         metadata_text = (
             f"<DOCUMENT_METADATA>\n\n{document_metadata}\n\n</DOCUMENT_METADATA>"
         )
-        metadata_tokens = token_counter(
-            messages=[{"role": "user", "content": metadata_text}], model=model_name
-        )
-        reserved_tokens += metadata_tokens
+        reserved_tokens += tokenizer.count_message_tokens(metadata_text)
 
     available_tokens = context_window - reserved_tokens
 
@@ -61,29 +80,15 @@ def optimize_content_for_context_window(
         print(f"Warning: Very limited tokens available for content: {available_tokens}")
         return content[:500]  # Fallback to first 500 chars
 
-    # Binary search to find optimal content length
-    left, right = 0, len(content)
-    optimal_length = 0
-
-    while left <= right:
-        mid = (left + right) // 2
-        test_content = content[:mid]
-
-        # Test token count for this content length
-        test_document = f"<DOCUMENT_CONTENT>\n\n{test_content}\n\n</DOCUMENT_CONTENT>"
-        test_tokens = token_counter(
-            messages=[{"role": "user", "content": test_document}], model=model_name
-        )
-
-        if test_tokens <= available_tokens:
-            optimal_length = mid
-            left = mid + 1
-        else:
-            right = mid - 1
-
-    optimized_content = (
-        content[:optimal_length] if optimal_length > 0 else content[:500]
+    # The <DOCUMENT_CONTENT> wrapper counts against the budget as well
+    wrapper_tokens = tokenizer.count_message_tokens(
+        "<DOCUMENT_CONTENT>\n\n\n\n</DOCUMENT_CONTENT>"
     )
+    tokenized_content = tokenizer.tokenize(content)
+    truncated_content = tokenized_content.truncate(available_tokens - wrapper_tokens)
+    optimal_length = len(truncated_content)
+
+    optimized_content = truncated_content if optimal_length > 0 else content[:500]
 
     if optimal_length < len(content):
         print(
@@ -98,14 +103,21 @@ async def generate_document_summary(
     content: str,
     user_llm,
     document_metadata: dict | None = None,
+    session: AsyncSession | None = None,
 ) -> tuple[str, list[float]]:
     """
     Generate summary and embedding for document content with metadata.
 
+    With a session (and SUMMARY_CACHE_ENABLED), a summary generated before by
+    the same model for the same prompt input is reused instead of calling the
+    LLM again.
+
     Args:
         content: Document content
         user_llm: User's LLM instance
         document_metadata: Optional metadata dictionary to include in summary
+        session: Optional session used to look up and store the summary in the
+            summary cache
 
     Returns:
         Tuple of (enhanced_summary_content, summary_embedding)
@@ -118,10 +130,24 @@ async def generate_document_summary(
         content, document_metadata, model_name
     )
 
-    summary_chain = SUMMARY_PROMPT_TEMPLATE | user_llm
     content_with_metadata = f"<DOCUMENT><DOCUMENT_METADATA>\n\n{document_metadata}\n\n</DOCUMENT_METADATA>\n\n<DOCUMENT_CONTENT>\n\n{optimized_content}\n\n</DOCUMENT_CONTENT></DOCUMENT>"
-    summary_result = await summary_chain.ainvoke({"document": content_with_metadata})
-    summary_content = summary_result.content
+
+    summary_content = None
+    if session is not None:
+        cache_model = summary_cache.model_id(user_llm)
+        cache_key = summary_cache.make_key(
+            "document_summary", SUMMARY_PROMPT_TEMPLATE.template, content_with_metadata
+        )
+        summary_content = await summary_cache.get(session, cache_model, cache_key)
+
+    if summary_content is None:
+        summary_chain = SUMMARY_PROMPT_TEMPLATE | user_llm
+        summary_result = await summary_chain.ainvoke(
+            {"document": content_with_metadata}
+        )
+        summary_content = summary_result.content
+        if session is not None:
+            await summary_cache.put(session, cache_model, cache_key, summary_content)
 
     # Combine summary with metadata if provided
     if document_metadata:
@@ -140,28 +166,204 @@ async def generate_document_summary(
     else:
         enhanced_summary_content = summary_content
 
-    summary_embedding = config.embedding_model_instance.embed(enhanced_summary_content)
+    summary_embedding = await embedding_executor.embed(enhanced_summary_content)
 
     return enhanced_summary_content, summary_embedding
 
 
-async def create_document_chunks(content: str) -> list[Chunk]:
+async def create_document_chunks(
+    content: str,
+    chunker=None,
+    session: AsyncSession | None = None,
+    existing_chunks: list[Chunk] | None = None,
+) -> list[Chunk]:
     """
     Create chunks from document content.
 
+    The chunk texts are embedded together with embed_texts, so the embedding
+    model receives full batches instead of one chunk per call. With a session
+    (and EMBEDDING_CACHE_ENABLED), texts embedded before by the same model
+    reuse the stored embedding.
+
+    Each chunk records its position (a sort key within the document, see
+    CHUNK_POSITION_GAP) and the character offset where it starts, so
+    retrieval can expand a hit to its neighboring chunks.
+
+    When updating a document, pass its current chunks as existing_chunks.
+    Chunks whose text is unchanged are then reused as they are, keeping their
+    IDs (and so citations), embeddings and, as long as they stay in order,
+    positions; new chunks get positions in the gaps between them. Only new
+    texts are embedded. Assigning the result to document.chunks deletes the
+    chunks that were not reused (delete-orphan cascade), so an update writes
+    only the rows that actually differ (plus HOT updates of start_offset).
+
     Args:
         content: Document content to chunk
+        chunker: Optional chunker to use instead of config.chunker_instance
+        session: Optional session used to reuse and store chunk embeddings in
+            the embedding cache
+        existing_chunks: Optional current chunks of the document being updated
 
     Returns:
-        List of Chunk objects with embeddings
+        List of Chunk objects with embeddings and token counts
     """
-    return [
-        Chunk(
-            content=chunk.text,
-            embedding=config.embedding_model_instance.embed(chunk.text),
-        )
-        for chunk in config.chunker_instance.chunk(content)
+    chunker = chunker or config.chunker_instance
+    pieces = chunker.chunk(content)
+
+    # Existing chunks by text, in document order, so repeated texts are
+    # matched to the existing chunks in the order they appeared
+    reusable: dict[str, list[Chunk]] = {}
+    for chunk in sorted(
+        existing_chunks or [],
+        key=lambda chunk: (chunk.position is None, chunk.position or 0, chunk.id or 0),
+    ):
+        reusable.setdefault(chunk.content, []).append(chunk)
+
+    matched = []
+    for piece in pieces:
+        candidates = reusable.get(piece.text)
+        matched.append(candidates.pop(0) if candidates else None)
+
+    new_texts = [
+        piece.text
+        for piece, chunk in zip(pieces, matched, strict=True)
+        if chunk is None
     ]
+    embeddings = iter(await _embed_chunk_texts(new_texts, session))
+    token_counts = iter(await _count_texts_tokens(new_texts))
+
+    positions = _chunk_positions(
+        [chunk.position if chunk is not None else None for chunk in matched]
+    )
+
+    chunks = []
+    for position, piece, chunk in zip(positions, pieces, matched, strict=True):
+        if chunk is None:
+            chunk = Chunk(
+                content=piece.text,
+                embedding=next(embeddings),
+                token_counts=next(token_counts),
+            )
+        # Only assigned when it changes: position is in the (document_id,
+        # position) index, so changing it makes the update non-HOT and gives
+        # the row new entries in every index, HNSW and GIN included
+        if chunk.position != position:
+            chunk.position = position
+        chunk.start_offset = getattr(piece, "start_index", None)
+        chunks.append(chunk)
+
+    return chunks
+
+
+def _chunk_positions(current: list[int | None]) -> list[int]:
+    """
+    Assign positions to the chunks of an updated document, in document order.
+
+    current holds the position of each reused chunk (None for new chunks).
+    Reused chunks in the longest run that is still in increasing order keep
+    their positions; the other chunks get evenly spaced positions in the gaps
+    between them. Only if a gap is too small is the whole document renumbered
+    with CHUNK_POSITION_GAP spacing (e.g. once for chunks with the consecutive
+    positions of migration 42).
+    """
+    keep = _longest_increasing(current)
+    positions: list[int | None] = [
+        position if index in keep else None for index, position in enumerate(current)
+    ]
+
+    index = 0
+    while index < len(positions):
+        if positions[index] is not None:
+            index += 1
+            continue
+        end = index
+        while end < len(positions) and positions[end] is None:
+            end += 1
+        count = end - index
+        lower = positions[index - 1] if index > 0 else None
+        upper = positions[end] if end < len(positions) else None
+        if lower is None and upper is None:
+            lower = -CHUNK_POSITION_GAP
+        if lower is None:
+            lower = upper - (count + 1) * CHUNK_POSITION_GAP
+        step = CHUNK_POSITION_GAP if upper is None else (upper - lower) // (count + 1)
+        if step < 1:
+            return [index * CHUNK_POSITION_GAP for index in range(len(current))]
+        for offset in range(count):
+            positions[index + offset] = lower + step * (offset + 1)
+        index = end
+
+    return positions
+
+
+def _longest_increasing(positions: list[int | None]) -> set[int]:
+    """Indexes of a longest strictly increasing subsequence of the non-None positions."""
+    tail_values: list[int] = []
+    tail_indexes: list[int] = []
+    previous: dict[int, int | None] = {}
+    for index, position in enumerate(positions):
+        if position is None:
+            continue
+        length = bisect.bisect_left(tail_values, position)
+        previous[index] = tail_indexes[length - 1] if length else None
+        if length == len(tail_values):
+            tail_values.append(position)
+            tail_indexes.append(index)
+        else:
+            tail_values[length] = position
+            tail_indexes[length] = index
+
+    keep = set()
+    index = tail_indexes[-1] if tail_indexes else None
+    while index is not None:
+        keep.add(index)
+        index = previous[index]
+    return keep
+
+
+async def _embed_chunk_texts(
+    texts: list[str], session: AsyncSession | None
+) -> list[Any]:
+    """Embed chunk texts, through the embedding cache when a session is given."""
+    if not texts:
+        return []
+    if session is not None and config.EMBEDDING_CACHE_ENABLED:
+        return await embed_texts_cached(session, texts)
+    return await embed_texts(texts)
+
+
+def _count_tokens_by_family(texts: list[str]) -> list[dict[str, int] | None]:
+    try:
+        return [count_tokens_by_family(text) for text in texts]
+    except Exception as e:
+        # Left for scripts/backfill_token_counts.py (e.g. a tokenizer that
+        # cannot be downloaded)
+        logger.warning(f"Could not count tokens: {e!s}")
+        return [None] * len(texts)
+
+
+async def compute_token_counts(content: str) -> dict[str, int] | None:
+    """
+    Count the tokens of document content per tokenizer family, off the event loop.
+
+    Ingest code stores the result in Document.token_counts, so the flush-time
+    count_content_tokens listener does not tokenize on the event loop.
+
+    Args:
+        content: Content to count
+
+    Returns:
+        Dictionary mapping tokenizer family to token count, or None if a
+        tokenizer failed
+    """
+    return (await asyncio.to_thread(_count_tokens_by_family, [content or ""]))[0]
+
+
+async def _count_texts_tokens(texts: list[str]) -> list[dict[str, int] | None]:
+    """Count the tokens of chunk texts in one worker thread call."""
+    if not texts:
+        return []
+    return await asyncio.to_thread(_count_tokens_by_family, texts)
 
 
 async def convert_element_to_markdown(element) -> str:
@@ -232,7 +232,7 @@ def validate_search_mode(search_mode: Any) -> str:
     if not normalized_mode:
         raise HTTPException(status_code=400, detail="search_mode cannot be empty")
 
-    valid_modes = ["CHUNKS", "DOCUMENTS"]
+    valid_modes = ["CHUNKS", "DOCUMENTS", "HIERARCHICAL"]
     if normalized_mode not in valid_modes:
         raise HTTPException(
             status_code=400,
@@ -295,6 +295,49 @@ def validate_top_k(top_k: Any) -> int:
     )
 
 
+def validate_ef_search(ef_search: Any) -> int | None:
+    """
+    Validate and convert the optional HNSW ef_search override.
+
+    Args:
+        ef_search: The ef_search value to validate
+
+    Returns:
+        int | None: Validated ef_search value (None uses the server default)
+
+    Raises:
+        HTTPException: If validation fails
+    """
+    if ef_search is None:
+        return None
+
+    if isinstance(ef_search, bool):
+        raise HTTPException(
+            status_code=400, detail="ef_search must be an integer, not a boolean"
+        )
+
+    if isinstance(ef_search, str):
+        if not re.match(r"^[1-9]\d*$", ef_search.strip()):
+            raise HTTPException(
+                status_code=400, detail="ef_search must be a valid positive integer"
+            )
+        ef_search = int(ef_search.strip())
+
+    if not isinstance(ef_search, int):
+        raise HTTPException(
+            status_code=400,
+            detail="ef_search must be an integer or string representation of an integer",
+        )
+
+    if ef_search <= 0:
+        raise HTTPException(
+            status_code=400, detail="ef_search must be a positive integer"
+        )
+    if ef_search > 1000:
+        raise HTTPException(status_code=400, detail="ef_search must not exceed 1000")
+    return ef_search
+
+
 def validate_messages(messages: Any) -> list[dict]:
     """
     Validate messages structure.
@@ -589,3 +632,47 @@ def validate_connector_config(
                 raise ValueError(f"{key} cannot be empty")
 
     return config
+
+
+def validate_context_window(context_window: Any) -> int | None:
+    """
+    Validate and convert the optional chunk context window override.
+
+    Args:
+        context_window: Number of neighboring chunks to add on each side of a hit
+
+    Returns:
+        int | None: Validated context window (None uses the server default)
+
+    Raises:
+        HTTPException: If validation fails
+    """
+    if context_window is None:
+        return None
+
+    if isinstance(context_window, bool):
+        raise HTTPException(
+            status_code=400, detail="context_window must be an integer, not a boolean"
+        )
+
+    if isinstance(context_window, str):
+        if not re.match(r"^\d+$", context_window.strip()):
+            raise HTTPException(
+                status_code=400,
+                detail="context_window must be a valid non-negative integer",
+            )
+        context_window = int(context_window.strip())
+
+    if not isinstance(context_window, int):
+        raise HTTPException(
+            status_code=400,
+            detail="context_window must be an integer or string representation of an integer",
+        )
+
+    if context_window < 0:
+        raise HTTPException(
+            status_code=400, detail="context_window must be a non-negative integer"
+        )
+    if context_window > 10:
+        raise HTTPException(status_code=400, detail="context_window must not exceed 10")
+    return context_window
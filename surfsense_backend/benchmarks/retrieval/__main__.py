@@ -0,0 +1,140 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+from benchmarks.retrieval.corpus import (
+    DOCUMENT_TYPES,
+    SEARCH_SPACE_DISTRIBUTIONS,
+    CorpusSpec,
+)
+from benchmarks.retrieval.environment import configure
+from benchmarks.retrieval.run import METHODS, SEARCH_MODES, TARGETS, VECTOR_METHODS
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.retrieval",
+        description="Seed synthetic corpora and benchmark hybrid retrieval",
+    )
+    parser.add_argument(
+        "--database-url",
+        default=os.getenv("BENCHMARK_DATABASE_URL"),
+        help="Dedicated benchmark database (defaults to BENCHMARK_DATABASE_URL)",
+    )
+    parser.add_argument("--dimension", type=int, default=384)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    seed = subparsers.add_parser("seed", help="Load a synthetic corpus")
+    seed.add_argument("--chunks", type=int, default=10_000)
+    seed.add_argument("--chunks-per-document", type=int, default=10)
+    seed.add_argument("--search-spaces", type=int, default=10)
+    seed.add_argument(
+        "--distribution", choices=SEARCH_SPACE_DISTRIBUTIONS, default="uniform"
+    )
+    seed.add_argument("--vocabulary-size", type=int, default=20_000)
+    seed.add_argument("--topics", type=int, default=200)
+    seed.add_argument("--words-per-chunk", type=int, default=60)
+    seed.add_argument("--seed", type=int, default=42)
+    seed.add_argument(
+        "--reset", action="store_true", help="Drop and recreate all tables first"
+    )
+
+    run = subparsers.add_parser("run", help="Benchmark the retrievers")
+    run.add_argument("--modes", nargs="+", choices=SEARCH_MODES, default=SEARCH_MODES)
+    run.add_argument("--methods", nargs="+", choices=METHODS, default=METHODS)
+    run.add_argument(
+        "--targets", nargs="+", choices=TARGETS, default=["largest", "smallest"]
+    )
+    run.add_argument(
+        "--document-type",
+        choices=DOCUMENT_TYPES,
+        default=DOCUMENT_TYPES[0],
+        help="Document type every search filters on, as in the application",
+    )
+    run.add_argument("--queries", type=int, default=100)
+    run.add_argument("--top-k", type=int, default=10)
+    run.add_argument("--seed", type=int, default=42)
+    run.add_argument(
+        "--explain", action="store_true", help="Collect EXPLAIN ANALYZE plans"
+    )
+    run.add_argument("--json", dest="json_path", help="Also write the report here")
+
+    check = subparsers.add_parser(
+        "check-plans",
+        help="Fail unless vector and hybrid searches scan an HNSW index",
+    )
+    check.add_argument("--modes", nargs="+", choices=SEARCH_MODES, default=SEARCH_MODES)
+    check.add_argument(
+        "--methods", nargs="+", choices=VECTOR_METHODS, default=VECTOR_METHODS
+    )
+    check.add_argument("--targets", nargs="+", choices=TARGETS, default=["largest"])
+    check.add_argument(
+        "--document-type", choices=DOCUMENT_TYPES, default=DOCUMENT_TYPES[0]
+    )
+    check.add_argument("--queries", type=int, default=5)
+    check.add_argument("--top-k", type=int, default=10)
+    check.add_argument("--seed", type=int, default=42)
+
+    args = parser.parse_args()
+    if not args.database_url:
+        parser.error("--database-url or BENCHMARK_DATABASE_URL is required")
+
+    # Before anything imports app.db
+    configure(args.database_url, args.dimension)
+
+    if args.command == "seed":
+        from benchmarks.retrieval.seed import seed as seed_corpus
+
+        spec = CorpusSpec(
+            chunks=args.chunks,
+            chunks_per_document=args.chunks_per_document,
+            search_spaces=args.search_spaces,
+            distribution=args.distribution,
+            vocabulary_size=args.vocabulary_size,
+            topics=args.topics,
+            words_per_chunk=args.words_per_chunk,
+            seed=args.seed,
+        )
+        print(json.dumps(asyncio.run(seed_corpus(spec, reset=args.reset)), indent=2))
+    elif args.command == "check-plans":
+        from benchmarks.retrieval.run import check_plans, print_plan_check
+
+        results = asyncio.run(
+            check_plans(
+                modes=args.modes,
+                methods=args.methods,
+                target_names=args.targets,
+                query_count=args.queries,
+                top_k=args.top_k,
+                document_type=args.document_type,
+                seed=args.seed,
+            )
+        )
+        print_plan_check(results)
+        if any(result["failures"] for result in results):
+            sys.exit(1)
+    else:
+        from benchmarks.retrieval.run import print_report, run as run_benchmark
+
+        report = asyncio.run(
+            run_benchmark(
+                modes=args.modes,
+                methods=args.methods,
+                target_names=args.targets,
+                query_count=args.queries,
+                top_k=args.top_k,
+                document_type=args.document_type,
+                explain=args.explain,
+                seed=args.seed,
+            )
+        )
+        print_report(report)
+        if args.json_path:
+            Path(args.json_path).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import math
+import random
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+SEARCH_SPACE_DISTRIBUTIONS = ("uniform", "skewed", "single")
+
+# Document types the synthetic documents are spread over
+DOCUMENT_TYPES = (
+    "FILE",
+    "CRAWLED_URL",
+    "SLACK_CONNECTOR",
+    "NOTION_CONNECTOR",
+    "GITHUB_CONNECTOR",
+)
+
+_SYLLABLES = [consonant + vowel for consonant in "bdfgklmnprstvz" for vowel in "aeiou"]
+
+
+@dataclass
+class CorpusSpec:
+    """Shape of a synthetic corpus; the same spec always yields the same corpus."""
+
+    chunks: int = 10_000
+    chunks_per_document: int = 10
+    search_spaces: int = 10
+    # uniform: equal-sized spaces; skewed: Zipf-sized spaces; single: one space
+    distribution: str = "uniform"
+    vocabulary_size: int = 20_000
+    topics: int = 200
+    words_per_topic: int = 100
+    words_per_chunk: int = 60
+    # Share of chunk words drawn from the document's topic (the rest is noise)
+    topic_word_ratio: float = 0.8
+    seed: int = 42
+
+    @property
+    def documents(self) -> int:
+        return math.ceil(self.chunks / self.chunks_per_document)
+
+
+@dataclass
+class SyntheticDocument:
+    index: int
+    search_space_index: int
+    document_type: str
+    title: str
+    chunks: list[str]
+
+
+def vocabulary(size: int) -> list[str]:
+    """Build size distinct pronounceable words (e.g. "bakelo")."""
+    words = []
+    for index in range(size):
+        syllables = []
+        value = index
+        # At least three syllables so words are not real short English words
+        for _ in range(3):
+            value, syllable = divmod(value, len(_SYLLABLES))
+            syllables.append(_SYLLABLES[syllable])
+        while value:
+            value, syllable = divmod(value, len(_SYLLABLES))
+            syllables.append(_SYLLABLES[syllable])
+        words.append("".join(syllables))
+    return words
+
+
+def search_space_weights(spec: CorpusSpec) -> list[float]:
+    """Relative number of documents per search space."""
+    if spec.distribution == "single":
+        return [1.0]
+    if spec.distribution == "uniform":
+        return [1.0] * spec.search_spaces
+    if spec.distribution == "skewed":
+        # Zipf: the largest space holds most documents, the smallest very few
+        return [1.0 / (rank + 1) ** 1.2 for rank in range(spec.search_spaces)]
+    raise ValueError(
+        f"Invalid distribution {spec.distribution!r}; "
+        f"expected one of {', '.join(SEARCH_SPACE_DISTRIBUTIONS)}"
+    )
+
+
+def generate_documents(spec: CorpusSpec) -> Iterator[SyntheticDocument]:
+    """
+    Generate the corpus documents one at a time.
+
+    Each document belongs to one topic; its chunks mostly use that topic's
+    words, so queries built from a chunk have clear semantic and keyword
+    neighbours.
+    """
+    rng = random.Random(spec.seed)
+    words = vocabulary(spec.vocabulary_size)
+    topic_words = [
+        random.Random(spec.seed * 1_000_003 + topic).sample(
+            words, min(spec.words_per_topic, len(words))
+        )
+        for topic in range(spec.topics)
+    ]
+    weights = search_space_weights(spec)
+    space_indexes = list(range(len(weights)))
+
+    remaining_chunks = spec.chunks
+    for index in range(spec.documents):
+        topic = rng.randrange(spec.topics)
+        chunk_count = min(spec.chunks_per_document, remaining_chunks)
+        remaining_chunks -= chunk_count
+
+        chunks = []
+        for _ in range(chunk_count):
+            chunk_words = [
+                rng.choice(topic_words[topic])
+                if rng.random() < spec.topic_word_ratio
+                else rng.choice(words)
+                for _ in range(spec.words_per_chunk)
+            ]
+            chunks.append(" ".join(chunk_words))
+
+        yield SyntheticDocument(
+            index=index,
+            search_space_index=rng.choices(space_indexes, weights)[0],
+            document_type=rng.choice(DOCUMENT_TYPES),
+            title=f"Synthetic document {index} ({' '.join(topic_words[topic][:3])})",
+            chunks=chunks,
+        )
@@ -0,0 +1,51 @@
+import hashlib
+
+import numpy as np
+
+
+class DeterministicEmbeddingModel:
+    """
+    Bag-of-words embedding model for benchmarks.
+
+    Each token maps to a fixed standard-normal vector seeded by its SHA-256,
+    and a text embeds to the normalized sum of its token vectors. Texts that
+    share words are therefore close, which gives vector and keyword search
+    related ground truth, and the same text always gets the same vector.
+
+    Implements the parts of the embedding model interface the application
+    uses: dimension, embed() and embed_batch().
+    """
+
+    def __init__(self, dimension: int = 384):
+        """
+        Initialize the model.
+
+        Args:
+            dimension: Embedding dimension
+        """
+        self.dimension = dimension
+        self._token_vectors: dict[str, np.ndarray] = {}
+
+    def token_vector(self, token: str) -> np.ndarray:
+        """Return the fixed vector of a token."""
+        vector = self._token_vectors.get(token)
+        if vector is None:
+            seed = int.from_bytes(hashlib.sha256(token.encode()).digest()[:8], "little")
+            vector = (
+                np.random.default_rng(seed)
+                .standard_normal(self.dimension)
+                .astype(np.float32)
+            )
+            self._token_vectors[token] = vector
+        return vector
+
+    def embed(self, text: str) -> np.ndarray:
+        """Embed a text as the normalized sum of its token vectors."""
+        # An empty text still gets a (non-zero) vector so cosine distance is defined
+        tokens = text.lower().split() or [""]
+        vector = np.sum([self.token_vector(token) for token in tokens], axis=0)
+        return vector / np.linalg.norm(vector)
+
+    def embed_batch(self, texts: list[str]) -> list[np.ndarray]:
+        """Embed several texts."""
+        return [self.embed(text) for text in texts]
@@ -0,0 +1,26 @@
+BENCHMARK_EMBEDDING_MODEL = "benchmark/deterministic-bag-of-words"
+
+
+def configure(database_url: str, dimension: int) -> None:
+    """
+    Point the application at the benchmark database and embedding model.
+
+    Must run before app.db is imported: the engine URL and the vector column
+    dimension are read from the config at import time.
+
+    Args:
+        database_url: SQLAlchemy URL of the benchmark database
+        dimension: Embedding dimension of the synthetic corpus
+    """
+    from app.config import config
+    from benchmarks.retrieval.embeddings import DeterministicEmbeddingModel
+
+    if database_url == config.DATABASE_URL:
+        raise SystemExit(
+            "Refusing to benchmark against DATABASE_URL; use a dedicated database"
+        )
+
+    config.DATABASE_URL = database_url
+    config.EMBEDDING_MODEL = BENCHMARK_EMBEDDING_MODEL
+    config.embedding_model_instance = DeterministicEmbeddingModel(dimension)
+    config.embedding_dimension = dimension
@@ -0,0 +1,411 @@
+import json
+import random
+import statistics
+import time
+from contextlib import contextmanager
+
+from benchmarks.retrieval.seed import BENCHMARK_USER_EMAIL
+
+SEARCH_MODES = ("chunks", "documents")
+METHODS = ("vector", "keyword", "hybrid")
+TARGETS = ("largest", "smallest", "all")
+# Methods whose plans must use an HNSW index (check-plans)
+VECTOR_METHODS = ("vector", "hybrid")
+
+# Statements issued by the retrievers that are not worth an EXPLAIN
+_SETTINGS_STATEMENT_PREFIXES = ("SELECT set_config", "SELECT extversion")
+
+
+@contextmanager
+def _capture_statements(engine, statements: list):
+    """Record (statement, parameters) for every statement sent to the database."""
+    from sqlalchemy import event
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        if not statement.lstrip().startswith(_SETTINGS_STATEMENT_PREFIXES):
+            statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+async def _explain(session, statements: list) -> list[str]:
+    """EXPLAIN ANALYZE captured statements in the current transaction."""
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    plans = []
+    for statement, parameters in statements:
+        rows = await raw_connection.driver_connection.fetch(
+            f"EXPLAIN (ANALYZE, BUFFERS) {statement}", *(parameters or ())
+        )
+        plans.append("\n".join(row[0] for row in rows))
+    return plans
+
+
+async def _plan_index_names(session, statements: list) -> set[str]:
+    """EXPLAIN captured statements and collect the indexes their plans scan."""
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    index_names = set()
+    for statement, parameters in statements:
+        plan = await raw_connection.driver_connection.fetchval(
+            f"EXPLAIN (FORMAT JSON) {statement}", *(parameters or ())
+        )
+        # SQLAlchemy registers a json codec on its asyncpg connections, so the
+        # plan usually arrives decoded
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        nodes = [plan[0]["Plan"]]
+        while nodes:
+            node = nodes.pop()
+            if "Index Name" in node:
+                index_names.add(node["Index Name"])
+            nodes.extend(node.get("Plans", []))
+    return index_names
+
+
+def _result_ids(mode: str, method: str, results: list) -> list[int]:
+    """Extract comparable ids from retriever results."""
+    if method != "hybrid":
+        # vector_search and full_text_search return ORM objects
+        return [result.id for result in results]
+    if mode == "chunks":
+        return [result["chunk_id"] for result in results]
+    # Document results are expanded into chunks; document_id holds the chunk id
+    return [result["document_id"] for result in results]
+
+
+async def _search(
+    session,
+    mode: str,
+    method: str,
+    query: str,
+    top_k: int,
+    target,
+    document_type: str,
+):
+    from app.retriver.chunks_hybrid_search import ChucksHybridSearchRetriever
+    from app.retriver.documents_hybrid_search import DocumentHybridSearchRetriever
+
+    retriever = (
+        ChucksHybridSearchRetriever(session)
+        if mode == "chunks"
+        else DocumentHybridSearchRetriever(session)
+    )
+    search = {
+        "vector": retriever.vector_search,
+        "keyword": retriever.full_text_search,
+        "hybrid": retriever.hybrid_search,
+    }[method]
+    return await search(
+        query_text=query,
+        top_k=top_k,
+        user_id=target["user_id"],
+        search_space_id=target["search_space_id"],
+        document_type=document_type,
+    )
+
+
+async def _targets(session, names: list[str]) -> list[dict]:
+    """Resolve target names to search spaces of the benchmark user."""
+    from sqlalchemy import text
+
+    result = await session.execute(
+        text(
+            "SELECT s.id, s.user_id, COUNT(c.id) AS chunks "
+            'FROM searchspaces s JOIN "user" u ON u.id = s.user_id '
+            "LEFT JOIN chunks c ON c.search_space_id = s.id "
+            "WHERE u.email = :email GROUP BY s.id, s.user_id ORDER BY chunks DESC"
+        ),
+        {"email": BENCHMARK_USER_EMAIL},
+    )
+    spaces = [row for row in result.all() if row.chunks]
+    if not spaces:
+        raise SystemExit("No benchmark corpus found; run the seed command first")
+
+    targets = []
+    for name in names:
+        if name == "all":
+            targets.append(
+                {
+                    "name": name,
+                    "search_space_id": None,
+                    "user_id": str(spaces[0].user_id),
+                    "chunks": sum(space.chunks for space in spaces),
+                }
+            )
+        else:
+            space = spaces[0] if name == "largest" else spaces[-1]
+            targets.append(
+                {
+                    "name": name,
+                    "search_space_id": space.id,
+                    "user_id": str(space.user_id),
+                    "chunks": space.chunks,
+                }
+            )
+    return targets
+
+
+async def _queries(
+    session, target: dict, document_type: str, count: int, seed: int
+) -> list[str]:
+    """
+    Build queries from a deterministic sample of the target's chunks of
+    document_type.
+
+    Each query is a few words of one chunk, so it has both keyword matches and
+    close vectors.
+    """
+    from sqlalchemy import text
+
+    conditions = "WHERE c.document_type = CAST(:document_type AS documenttype)"
+    parameters = {"seed": str(seed), "count": count, "document_type": document_type}
+    if target["search_space_id"] is not None:
+        conditions += " AND c.search_space_id = :search_space_id"
+        parameters["search_space_id"] = target["search_space_id"]
+    result = await session.execute(
+        text(
+            f"SELECT c.content FROM chunks c {conditions} "
+            "ORDER BY md5(c.id::text || :seed) LIMIT :count"
+        ),
+        parameters,
+    )
+    rng = random.Random(seed)
+    queries = []
+    for (content,) in result.all():
+        words = content.split()
+        queries.append(" ".join(rng.sample(words, min(4, len(words)))))
+    return queries
+
+
+def _percentile(latencies: list[float], percentile: int) -> float:
+    if len(latencies) == 1:
+        return latencies[0]
+    return statistics.quantiles(latencies, n=100, method="inclusive")[percentile - 1]
+
+
+async def run(
+    modes: list[str],
+    methods: list[str],
+    target_names: list[str],
+    query_count: int,
+    top_k: int,
+    document_type: str,
+    explain: bool = False,
+    seed: int = 42,
+) -> dict:
+    """
+    Run every search mode and method against each target and collect metrics.
+
+    Searches filter on document_type, as every search of the application does.
+
+    Recall@top_k compares each result with the same search run as a
+    brute-force scan (index scans disabled for the transaction).
+
+    Returns:
+        Report dictionary (see _print_report for the layout)
+    """
+    from sqlalchemy import text
+
+    from app.config import config
+    from app.db import async_session_maker, engine
+    from app.retriver.vector_search_settings import candidate_fill_stats
+
+    report = {
+        "settings": {
+            "top_k": top_k,
+            "queries": query_count,
+            "hnsw_ef_search": config.HNSW_EF_SEARCH,
+            "hnsw_iterative_scan": config.HNSW_ITERATIVE_SCAN,
+            "vector_storage_mode": config.VECTOR_STORAGE_MODE,
+            "document_type": document_type,
+        },
+        "results": [],
+    }
+
+    async with async_session_maker() as session:
+        targets = await _targets(session, target_names)
+
+        for target in targets:
+            queries = await _queries(session, target, document_type, query_count, seed)
+            for mode in modes:
+                for method in methods:
+                    latencies = []
+                    recalls = []
+                    plans = []
+                    for query_index, query in enumerate(queries):
+                        # Brute force: the same search without index scans
+                        await session.execute(text("SET LOCAL enable_indexscan = off"))
+                        await session.execute(text("SET LOCAL enable_bitmapscan = off"))
+                        exact = await _search(
+                            session, mode, method, query, top_k, target, document_type
+                        )
+                        # Before the rollback expires the returned ORM objects
+                        exact_ids = set(_result_ids(mode, method, exact))
+                        await session.rollback()
+
+                        statements = []
+                        with _capture_statements(engine, statements):
+                            started = time.perf_counter()
+                            results = await _search(
+                                session,
+                                mode,
+                                method,
+                                query,
+                                top_k,
+                                target,
+                                document_type,
+                            )
+                            latencies.append((time.perf_counter() - started) * 1000)
+                        found_ids = set(_result_ids(mode, method, results))
+                        if explain and query_index == 0:
+                            plans = await _explain(session, statements)
+                        await session.rollback()
+
+                        if exact_ids:
+                            recalls.append(len(found_ids & exact_ids) / len(exact_ids))
+
+                    report["results"].append(
+                        {
+                            "target": target["name"],
+                            "search_space_id": target["search_space_id"],
+                            "target_chunks": target["chunks"],
+                            "mode": mode,
+                            "method": method,
+                            "queries": len(latencies),
+                            "p50_ms": _percentile(latencies, 50),
+                            "p95_ms": _percentile(latencies, 95),
+                            "p99_ms": _percentile(latencies, 99),
+                            "recall": statistics.fmean(recalls) if recalls else None,
+                            "explain": plans,
+                        }
+                    )
+
+    report["candidate_fill_stats"] = candidate_fill_stats.get_stats()
+    return report
+
+
+async def check_plans(
+    modes: list[str],
+    methods: list[str],
+    target_names: list[str],
+    query_count: int,
+    top_k: int,
+    document_type: str,
+    seed: int = 42,
+) -> list[dict]:
+    """
+    Check that vector and hybrid searches are served by the HNSW indexes.
+
+    Every query of every target, search mode and method (filtered on
+    document_type) is planned with EXPLAIN; a query passes when one of its
+    statements scans an HNSW index of the configured storage mode
+    (VECTOR_STORAGE_MODE).
+
+    Returns:
+        One result per target, mode and method, with the failing queries
+    """
+    from app.config import config
+    from app.db import DocumentType, async_session_maker, engine
+    from app.retriver.vector_storage import (
+        get_vector_storage_mode,
+        vector_index_statements,
+    )
+
+    hnsw_indexes = {
+        name
+        for name, _ in vector_index_statements(
+            get_vector_storage_mode(),
+            config.embedding_dimension,
+            [document_type.value for document_type in DocumentType],
+        )
+    }
+
+    results = []
+    async with async_session_maker() as session:
+        targets = await _targets(session, target_names)
+
+        for target in targets:
+            queries = await _queries(session, target, document_type, query_count, seed)
+            for mode in modes:
+                for method in methods:
+                    failures = []
+                    for query in queries:
+                        statements = []
+                        with _capture_statements(engine, statements):
+                            await _search(
+                                session,
+                                mode,
+                                method,
+                                query,
+                                top_k,
+                                target,
+                                document_type,
+                            )
+                        index_names = await _plan_index_names(session, statements)
+                        await session.rollback()
+                        if not index_names & hnsw_indexes:
+                            failures.append(
+                                {"query": query, "indexes": sorted(index_names)}
+                            )
+
+                    results.append(
+                        {
+                            "target": target["name"],
+                            "target_chunks": target["chunks"],
+                            "mode": mode,
+                            "method": method,
+                            "queries": len(queries),
+                            "failures": failures,
+                        }
+                    )
+
+    return results
+
+
+def print_plan_check(results: list[dict]) -> None:
+    """Print one line per checked search and the indexes of failing queries."""
+    for result in results:
+        status = "FAIL" if result["failures"] else "ok"
+        print(
+            f"{status:<6}{result['target']:<10}{result['target_chunks']:>12,}"
+            f"{result['mode']:>11}{result['method']:>9}"
+            f"  {result['queries'] - len(result['failures'])}/{result['queries']}"
+            " queries use an HNSW index"
+        )
+        for failure in result["failures"]:
+            indexes = ", ".join(failure["indexes"]) or "no index"
+            print(f"        {failure['query']!r}: {indexes}")
+
+
+def print_report(report: dict) -> None:
+    """Print the report as a table (plans are only printed when collected)."""
+    settings = report["settings"]
+    print(
+        f"\nRecall@{settings['top_k']} and latency over {settings['queries']} queries "
+        f"(ef_search={settings['hnsw_ef_search']}, "
+        f"iterative_scan={settings['hnsw_iterative_scan']}, "
+        f"storage={settings['vector_storage_mode']}, "
+        f"document_type={settings['document_type']})\n"
+    )
+    print(
+        f"{'target':<10}{'chunks':>12}{'mode':>11}{'method':>9}"
+        f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'recall':>8}"
+    )
+    for result in report["results"]:
+        recall = "-" if result["recall"] is None else f"{result['recall']:.3f}"
+        print(
+            f"{result['target']:<10}{result['target_chunks']:>12,}"
+            f"{result['mode']:>11}{result['method']:>9}"
+            f"{result['p50_ms']:>9.1f}{result['p95_ms']:>9.1f}"
+            f"{result['p99_ms']:>9.1f}{recall:>8}"
+        )
+
+    for result in report["results"]:
+        for plan in result["explain"]:
+            print(f"\n-- {result['target']} / {result['mode']} / {result['method']}")
+            print(plan)
@@ -0,0 +1,207 @@
+import json
+import time
+import uuid
+from datetime import UTC, datetime
+
+from benchmarks.retrieval.corpus import CorpusSpec, generate_documents
+
+BENCHMARK_USER_EMAIL = "retrieval-benchmark@example.com"
+# Documents written per COPY batch
+BATCH_DOCUMENTS = 1000
+
+
+async def _create_schema(reset: bool) -> None:
+    from sqlalchemy import text
+
+    from app.db import Base, engine, setup_triggers
+
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        if reset:
+            await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+        existing = await conn.execute(text("SELECT EXISTS (SELECT 1 FROM chunks)"))
+        if existing.scalar():
+            raise SystemExit("The benchmark database is not empty; pass --reset")
+
+    # Triggers fill search_vector and the denormalized chunk columns during COPY
+    await setup_triggers()
+
+
+async def _create_search_spaces(conn, spec: CorpusSpec) -> tuple[uuid.UUID, list[int]]:
+    from sqlalchemy import text
+
+    user_id = uuid.UUID(int=spec.seed)
+    await conn.execute(
+        text(
+            'INSERT INTO "user" (id, email, hashed_password, is_active, '
+            "is_superuser, is_verified, pages_limit, pages_used) "
+            "VALUES (:id, :email, '', true, false, true, 0, 0)"
+        ),
+        {"id": user_id, "email": BENCHMARK_USER_EMAIL},
+    )
+
+    space_count = 1 if spec.distribution == "single" else spec.search_spaces
+    search_space_ids = []
+    for index in range(space_count):
+        result = await conn.execute(
+            text(
+                "INSERT INTO searchspaces (name, description, citations_enabled, "
+                "qna_custom_instructions, user_id, created_at) "
+                "VALUES (:name, :description, true, '', :user_id, now()) RETURNING id"
+            ),
+            {
+                "name": f"benchmark-{spec.distribution}-{index}",
+                "description": f"{spec.chunks} chunks, {spec.distribution} spaces",
+                "user_id": user_id,
+            },
+        )
+        search_space_ids.append(result.scalar())
+
+    return user_id, search_space_ids
+
+
+async def _copy_batch(driver_connection, model, documents, search_space_ids, ids):
+    """COPY one batch of documents and their chunks."""
+    now = datetime.now(UTC)
+    document_records = []
+    chunk_records = []
+
+    for document in documents:
+        document_id = ids["document"] = ids["document"] + 1
+        content = "\n\n".join(document.chunks)
+        document_records.append(
+            (
+                document_id,
+                document.title,
+                document.document_type,
+                json.dumps({"benchmark": True, "index": document.index}),
+                content,
+                f"benchmark-{document.index}",
+                model.embed(content),
+                search_space_ids[document.search_space_index],
+                now,
+            )
+        )
+        start_offset = 0
+        for position, (chunk_content, embedding) in enumerate(
+            zip(document.chunks, model.embed_batch(document.chunks), strict=True)
+        ):
+            chunk_id = ids["chunk"] = ids["chunk"] + 1
+            chunk_records.append(
+                (
+                    chunk_id,
+                    chunk_content,
+                    embedding,
+                    document_id,
+                    position,
+                    start_offset,
+                    now,
+                )
+            )
+            start_offset += len(chunk_content) + 2
+
+    await driver_connection.copy_records_to_table(
+        "documents",
+        records=document_records,
+        columns=[
+            "id",
+            "title",
+            "document_type",
+            "document_metadata",
+            "content",
+            "content_hash",
+            "embedding",
+            "search_space_id",
+            "created_at",
+        ],
+    )
+    await driver_connection.copy_records_to_table(
+        "chunks",
+        records=chunk_records,
+        columns=[
+            "id",
+            "content",
+            "embedding",
+            "document_id",
+            "position",
+            "start_offset",
+            "created_at",
+        ],
+    )
+    return len(document_records), len(chunk_records)
+
+
+async def seed(spec: CorpusSpec, reset: bool = False) -> dict:
+    """
+    Create the schema, load a synthetic corpus and build the search indexes.
+
+    Rows are loaded with COPY before the indexes exist; the HNSW and GIN
+    indexes are then built once over the full corpus.
+
+    Args:
+        spec: Shape of the corpus
+        reset: Drop and recreate all tables first
+
+    Returns:
+        Dictionary with row counts and load/index timings
+    """
+    from pgvector.asyncpg import register_vector
+    from sqlalchemy import text
+
+    from app.config import config
+    from app.db import engine, setup_indexes
+
+    await _create_schema(reset)
+    model = config.embedding_model_instance
+
+    started = time.perf_counter()
+    async with engine.begin() as conn:
+        user_id, search_space_ids = await _create_search_spaces(conn, spec)
+
+        raw_connection = await conn.get_raw_connection()
+        driver_connection = raw_connection.driver_connection
+        await register_vector(driver_connection)
+
+        ids = {"document": 0, "chunk": 0}
+        batch = []
+        for document in generate_documents(spec):
+            batch.append(document)
+            if len(batch) == BATCH_DOCUMENTS:
+                await _copy_batch(
+                    driver_connection, model, batch, search_space_ids, ids
+                )
+                batch = []
+                print(f"  {ids['chunk']:,}/{spec.chunks:,} chunks loaded", end="\r")
+        if batch:
+            await _copy_batch(driver_connection, model, batch, search_space_ids, ids)
+
+        # Explicit ids were copied, so move the sequences past them
+        for table in ("documents", "chunks"):
+            await conn.execute(
+                text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                    f"(SELECT COALESCE(MAX(id), 1) FROM {table}))"
+                )
+            )
+    load_seconds = time.perf_counter() - started
+    print(f"\nLoaded {ids['chunk']:,} chunks in {load_seconds:.1f}s")
+
+    started = time.perf_counter()
+    await setup_indexes()
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("ANALYZE documents"))
+        await conn.execute(text("ANALYZE chunks"))
+    index_seconds = time.perf_counter() - started
+    print(f"Built indexes in {index_seconds:.1f}s")
+
+    return {
+        "user_id": str(user_id),
+        "search_space_ids": search_space_ids,
+        "documents": ids["document"],
+        "chunks": ids["chunk"],
+        "load_seconds": load_seconds,
+        "index_seconds": index_seconds,
+    }
@@ -0,0 +1,45 @@
+"""
+Embedding server startup script.
+
+Holds one copy of the embedding model for all API and Celery worker processes
+on this host, which then run with EMBEDDING_BACKEND=server.
+
+    python embedding_server.py --port 8002
+    python embedding_server.py --uds /run/surfsense/embeddings.sock
+"""
+
+import argparse
+import logging
+import os
+
+import uvicorn
+from dotenv import load_dotenv
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+
+load_dotenv()
+
+# This process loads the model itself, whatever the shared .env says
+os.environ["EMBEDDING_BACKEND"] = "local"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the SurfSense embedding server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8002)
+    parser.add_argument("--uds", help="Listen on this Unix socket instead of TCP")
+    args = parser.parse_args()
+
+    from app.services.embedding_server import create_embedding_server_app
+
+    # A single process: the point is to hold one model copy
+    uvicorn.run(
+        create_embedding_server_app(),
+        host=args.host,
+        port=args.port,
+        uds=args.uds,
+        workers=1,
+    )
@@ -0,0 +1,108 @@
+"""
+Fill in stored token counts for documents and chunks written before they
+were computed at ingest, or after TOKEN_COUNT_MODELS gained a new tokenizer
+family.
+
+Usage (from surfsense_backend/):
+
+    python scripts/backfill_token_counts.py
+    python scripts/backfill_token_counts.py --batch-size 500 --tables chunks
+
+Rows are processed in primary-key order in batches, each batch in its own
+transaction, so the script can be stopped and restarted at any time.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.dialects.postgresql import array
+
+# app.config loads .env on import
+from app.config import config
+from app.db import Chunk, Document, async_session_maker
+from app.services.tokenizer_service import get_tokenizer
+
+MODELS_BY_TABLE = {"documents": Document, "chunks": Chunk}
+
+
+def _families_to_models() -> dict[str, str]:
+    """Map each tokenizer family of TOKEN_COUNT_MODELS to one model using it."""
+    families = {}
+    for model_name in config.TOKEN_COUNT_MODELS:
+        families.setdefault(get_tokenizer(model_name).family, model_name)
+    return families
+
+
+async def backfill_table(model, batch_size: int) -> int:
+    """Add the missing tokenizer families to token_counts of one table."""
+    families = _families_to_models()
+    missing = or_(
+        model.token_counts.is_(None),
+        ~model.token_counts.has_all(array(list(families))),
+    )
+
+    updated = 0
+    last_id = 0
+    while True:
+        async with async_session_maker() as session:
+            result = await session.execute(
+                select(model.id, model.content, model.token_counts)
+                .where(model.id > last_id, missing)
+                .order_by(model.id)
+                .limit(batch_size)
+            )
+            rows = result.all()
+            if not rows:
+                return updated
+
+            values = []
+            for row_id, content, token_counts in rows:
+                token_counts = dict(token_counts or {})
+                for family, model_name in families.items():
+                    if family not in token_counts:
+                        token_counts[family] = get_tokenizer(model_name).count_tokens(
+                            content or ""
+                        )
+                values.append({"id": row_id, "token_counts": token_counts})
+
+            # Bulk UPDATE by primary key (no ORM flush events)
+            await session.execute(update(model), values)
+            await session.commit()
+
+        updated += len(rows)
+        last_id = rows[-1].id
+        print(f"  {model.__tablename__}: {updated} rows up to id {last_id}")
+
+
+async def backfill(tables: list[str], batch_size: int) -> None:
+    for table in tables:
+        print(f"Backfilling {table}...")
+        started = time.perf_counter()
+        updated = await backfill_table(MODELS_BY_TABLE[table], batch_size)
+        print(f"  {updated} rows in {time.perf_counter() - started:.1f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Backfill stored token counts of documents and chunks"
+    )
+    parser.add_argument(
+        "--tables",
+        nargs="+",
+        choices=list(MODELS_BY_TABLE),
+        default=list(MODELS_BY_TABLE),
+    )
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    asyncio.run(backfill(args.tables, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""
+Build compressed HNSW indexes and compare their recall against exact search.
+
+Usage (from surfsense_backend/):
+
+    # Build halfvec (or binary) expression indexes concurrently
+    python scripts/vector_storage.py build-indexes --mode halfvec
+
+    # Compare recall@k of each mode against an exact scan (chunk searches
+    # filter on one document type, as the application's do)
+    python scripts/vector_storage.py recall-report --modes full halfvec binary \
+        --document-type FILE
+
+    # Once VECTOR_STORAGE_MODE is switched, drop the indexes of other modes
+    python scripts/vector_storage.py drop-indexes --keep halfvec
+
+Set VECTOR_STORAGE_MODE only after the indexes for that mode exist; until
+then the application keeps using (and recreating) the current mode's indexes.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import bindparam, select, text
+
+# app.config loads .env on import
+from app.config import config
+from app.db import Chunk, DocumentType, async_session_maker, engine
+from app.retriver.vector_storage import (
+    VECTOR_STORAGE_MODES,
+    candidate_scan_size,
+    rank_by_embedding,
+    vector_index_statements,
+)
+
+
+def _index_statements(mode: str) -> list[tuple[str, str]]:
+    return vector_index_statements(
+        mode,
+        config.embedding_dimension,
+        [document_type.value for document_type in DocumentType],
+        concurrently=True,
+    )
+
+
+async def build_indexes(mode: str) -> None:
+    """Create the HNSW indexes of a storage mode without blocking writes."""
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for name, statement in _index_statements(mode):
+            print(f"Building {name}...")
+            started = time.perf_counter()
+            await conn.execute(text(statement))
+            print(f"  done in {time.perf_counter() - started:.1f}s")
+
+
+async def drop_indexes(keep: str) -> None:
+    """Drop the HNSW indexes of every storage mode except keep."""
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for mode in VECTOR_STORAGE_MODES:
+            if mode == keep:
+                continue
+            for name, _ in _index_statements(mode):
+                print(f"Dropping {name}...")
+                await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+
+
+async def _index_sizes() -> dict[str, int]:
+    async with engine.connect() as conn:
+        result = await conn.execute(
+            text(
+                "SELECT indexrelname, pg_relation_size(indexrelid) "
+                "FROM pg_stat_user_indexes "
+                "WHERE relname IN ('chunks', 'documents')"
+            )
+        )
+        return dict(result.all())
+
+
+async def recall_report(
+    modes: list[str],
+    sample_size: int,
+    top_k: int,
+    ef_search: int,
+    search_space_id: int | None,
+    document_type: str,
+) -> dict:
+    """
+    Measure recall@top_k and latency of each mode against an exact scan.
+
+    Query vectors are the embeddings of randomly sampled chunks of
+    document_type, so the report reflects the data actually stored in this
+    database. Searches filter on document_type like the application's, which
+    lets them use that type's partial HNSW index.
+    """
+    # Inline, so the partial index predicate matches
+    conditions = [
+        Chunk.document_type
+        == bindparam(
+            None, document_type, type_=Chunk.document_type.type, literal_execute=True
+        )
+    ]
+    if search_space_id is not None:
+        conditions.append(Chunk.search_space_id == search_space_id)
+
+    async with async_session_maker() as session:
+        result = await session.execute(
+            select(Chunk.embedding)
+            .where(*conditions)
+            .order_by(text("random()"))
+            .limit(sample_size)
+        )
+        query_embeddings = [row[0] for row in result.all()]
+
+    if not query_embeddings:
+        raise SystemExit("No chunks found to sample query vectors from")
+
+    def nearest_query(query_embedding, mode):
+        return rank_by_embedding(
+            select(Chunk.id).where(*conditions),
+            Chunk.embedding,
+            query_embedding,
+            top_k,
+            mode=mode,
+        )
+
+    recalls = {mode: [] for mode in modes}
+    latencies = {mode: [] for mode in modes}
+
+    for query_embedding in query_embeddings:
+        async with async_session_maker() as session:
+            # Ground truth: exact distances with index scans disabled
+            await session.execute(text("SET LOCAL enable_indexscan = off"))
+            result = await session.execute(nearest_query(query_embedding, "full"))
+            exact_ids = {row.id for row in result.all()}
+            await session.rollback()
+
+            for mode in modes:
+                await session.execute(
+                    text("SELECT set_config('hnsw.ef_search', :ef_search, true)"),
+                    {
+                        "ef_search": str(
+                            max(ef_search, candidate_scan_size(top_k, mode))
+                        )
+                    },
+                )
+                started = time.perf_counter()
+                result = await session.execute(nearest_query(query_embedding, mode))
+                latencies[mode].append((time.perf_counter() - started) * 1000)
+                found_ids = {row.id for row in result.all()}
+                await session.rollback()
+
+                if exact_ids:
+                    recalls[mode].append(len(found_ids & exact_ids) / len(exact_ids))
+
+    index_sizes = await _index_sizes()
+    report = {
+        "document_type": document_type,
+        "queries": len(query_embeddings),
+        "top_k": top_k,
+        "ef_search": ef_search,
+        "rescore_factor": config.VECTOR_RESCORE_FACTOR,
+        "modes": {},
+    }
+    for mode in modes:
+        index_names = {name for name, _ in _index_statements(mode)}
+        report["modes"][mode] = {
+            "recall": statistics.fmean(recalls[mode]) if recalls[mode] else 0.0,
+            "p50_ms": statistics.median(latencies[mode]),
+            "p95_ms": statistics.quantiles(latencies[mode], n=20)[-1]
+            if len(latencies[mode]) > 1
+            else latencies[mode][0],
+            "index_bytes": sum(
+                size for name, size in index_sizes.items() if name in index_names
+            ),
+        }
+    return report
+
+
+def _print_report(report: dict) -> None:
+    print(
+        f"\nRecall@{report['top_k']} over {report['queries']} "
+        f"{report['document_type']} queries "
+        f"(ef_search={report['ef_search']}, "
+        f"rescore_factor={report['rescore_factor']})\n"
+    )
+    print(f"{'mode':<10}{'recall':>10}{'p50 ms':>10}{'p95 ms':>10}{'index MB':>12}")
+    for mode, stats in report["modes"].items():
+        print(
+            f"{mode:<10}{stats['recall']:>10.3f}{stats['p50_ms']:>10.1f}"
+            f"{stats['p95_ms']:>10.1f}{stats['index_bytes'] / 1024 / 1024:>12.1f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Manage compressed HNSW vector indexes"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build = subparsers.add_parser("build-indexes", help="Build a mode's indexes")
+    build.add_argument("--mode", choices=VECTOR_STORAGE_MODES, required=True)
+
+    drop = subparsers.add_parser(
+        "drop-indexes", help="Drop the indexes of all other modes"
+    )
+    drop.add_argument("--keep", choices=VECTOR_STORAGE_MODES, required=True)
+
+    report = subparsers.add_parser("recall-report", help="Compare recall per mode")
+    report.add_argument(
+        "--modes", nargs="+", choices=VECTOR_STORAGE_MODES, default=["full"]
+    )
+    report.add_argument("--sample-size", type=int, default=100)
+    report.add_argument("--top-k", type=int, default=20)
+    report.add_argument("--ef-search", type=int, default=config.HNSW_EF_SEARCH)
+    report.add_argument("--search-space-id", type=int, default=None)
+    report.add_argument(
+        "--document-type",
+        choices=[document_type.value for document_type in DocumentType],
+        default=DocumentType.FILE.value,
+    )
+    report.add_argument("--json", dest="json_path", help="Also write the report here")
+
+    args = parser.parse_args()
+
+    if args.command == "build-indexes":
+        asyncio.run(build_indexes(args.mode))
+    elif args.command == "drop-indexes":
+        asyncio.run(drop_indexes(args.keep))
+    else:
+        result = asyncio.run(
+            recall_report(
+                args.modes,
+                args.sample_size,
+                args.top_k,
+                args.ef_search,
+                args.search_space_id,
+                args.document_type,
+            )
+        )
+        _print_report(result)
+        if args.json_path:
+            Path(args.json_path).write_text(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()